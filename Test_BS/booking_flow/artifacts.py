@@ -0,0 +1,87 @@
+import gzip
+import json
+import logging
+import os
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium.common import WebDriverException
+
+log = logging.getLogger(__name__)
+
+
+def _safe(name, length=80):
+    return re.sub(r"[^\w.-]+", "_", name or "no-step").strip("_")[:length]
+
+
+class ArtifactStore:
+    """Screenshots, page sources and console logs of failed (or sampled) steps.
+
+    Only the browser reads happen on the caller's thread; compressing and writing
+    them is left to one background thread, so a capture costs the test a few
+    WebDriver commands. Each capture goes to `<directory>/<test>/<n>-<step>/` with a
+    meta.json naming the step, helper method and locator it belongs to. Failures and
+    samples are capped separately per test, so sampled steps never crowd out a failure.
+    """
+
+    def __init__(self, directory, sample_rate=0.0, max_per_test=5, max_samples_per_test=50):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.max_per_test = max_per_test
+        self.max_samples_per_test = max_samples_per_test
+        # Own generator, so sampling does not shift the seeded `random` picks of the flow
+        self._random = random.Random()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifacts")
+        # Captures per (test, sample), and directories numbered per test
+        self._counts = {}
+        self._numbers = {}
+
+    def sampled(self):
+        return self._random.random() < self.sample_rate
+
+    def capture(self, driver, test, reason, step=None, method=None, locator=None, error=None, sample=False):
+        """Read the browser's state now and write it in the background; returns the directory, or None."""
+        count = self._counts.get((test, sample), 0)
+        if count >= (self.max_samples_per_test if sample else self.max_per_test):
+            return None
+        self._counts[(test, sample)] = count + 1
+        number = self._numbers[test] = self._numbers.get(test, 0) + 1
+        reads = {
+            "url": lambda: driver.current_url,
+            "screenshot.png": driver.get_screenshot_as_png,
+            "page.html.gz": lambda: driver.page_source,
+        }
+        # Local Chromium drivers only: webdriver.Remote has no get_log, BrowserStack keeps them with consoleLogs set
+        if hasattr(driver, "get_log"):
+            reads["console.json.gz"] = lambda: driver.get_log("browser")
+        snapshot = {}
+        for name, read in reads.items():
+            try:
+                snapshot[name] = read()
+            except WebDriverException as e:
+                log.warning("Could not capture %s for %s: %s", name, test, e.msg)
+        meta = {"test": test, "reason": reason, "sample": sample, "step": step, "method": method, "locator": locator,
+                "error": None if error is None else str(error), "url": snapshot.pop("url", None), "time": time.time()}
+        path = os.path.join(self.directory, _safe(test, 160), f"{number:02d}-{_safe(step)}")
+        self._executor.submit(self._write, path, snapshot, meta)
+        return path
+
+    def _write(self, path, snapshot, meta):
+        try:
+            os.makedirs(path, exist_ok=True)
+            for name, content in snapshot.items():
+                if name.endswith(".gz"):
+                    text = content if isinstance(content, str) else json.dumps(content, indent=2)
+                    content = gzip.compress(text.encode(), compresslevel=6)
+                with open(os.path.join(path, name), "wb") as artifact:
+                    artifact.write(content)
+            with open(os.path.join(path, "meta.json"), "w") as artifact:
+                json.dump(meta, artifact, indent=2)
+        except OSError as e:
+            log.error("Could not write artifacts to %s: %s", path, e)
+
+    def close(self):
+        # Waits for the pending writes
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,137 @@
+"""Run many booking flows from one process and one asyncio event loop.
+
+The event loop only orchestrates: there is no async helper API. Selenium's client
+blocks on every command, so each flow runs test_main's own synchronous steps on a
+thread of a bounded pool, driving its own pooled browser. A flow stuck in a long
+loader wait only holds its own thread, and one process serves every flow.
+Run from Test_BS:
+
+    python -m booking_flow.async_flows --concurrency 4 --route-matrix --mock-site --headless
+"""
+import argparse
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import flow_log
+from .booking import book
+from .driver_pool import DriverPool, create_chrome_driver
+from .mock_server import MockBookingSite
+from .passenger_data import generate_booking
+from .routes import BOOKING_CASES, DEFAULT_CASE, LIVE_BOOKING_URL
+from .run_history import RunHistory
+
+
+def _book_case(pool, helper_class, flow, booking_case, booking_url, booking_data, configure):
+    # One whole flow on an executor thread; failures, starting the browser included, become the case's result
+    started = time.monotonic()
+    helper = None
+    try:
+        driver = pool.acquire()
+    except Exception as e:
+        return booking_case.case_id, e, time.monotonic() - started, helper
+    try:
+        helper = helper_class(driver)
+        if configure is not None:
+            configure(helper)
+        flow(helper, booking_case, booking_url, booking_data)
+        error = None
+    except Exception as e:
+        error = e
+        if helper is not None:
+            helper.recorder.fail(e)
+    finally:
+        if helper is not None:
+            helper.recorder.end_step()
+            helper.command_trace.detach()
+        pool.release(driver)
+    return booking_case.case_id, error, time.monotonic() - started, helper
+
+
+async def run_flows(cases, booking_url, helper_class, flow, concurrency, headless=False, configure=None,
+                    page_load_strategy="normal", data_seed=0):
+    """Book every case with at most `concurrency` browsers at once.
+
+    `flow(helper, booking_case, booking_url, booking_data)` is the synchronous flow
+    test_main runs, e.g. booking.book. Returns (case_id, error or None, seconds,
+    helper or None) per case, in the order of `cases`. `configure(helper)` can set
+    helper options before a flow starts. Passenger data is generated from
+    `data_seed` before the browsers start.
+    """
+    bookings = [generate_booking(booking_case, data_seed) for booking_case in cases]
+    loop = asyncio.get_running_loop()
+    factory = functools.partial(create_chrome_driver, headless=headless, page_load_strategy=page_load_strategy)
+    pool = DriverPool(factory=factory, max_size=concurrency)
+    # One thread per browser: a flow holds its thread from lease to release
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="booking")
+    try:
+        results = await asyncio.gather(
+            *(loop.run_in_executor(executor, _book_case, pool, helper_class, flow, booking_case, booking_url,
+                                   booking_data, configure)
+              for booking_case, booking_data in zip(cases, bookings)),
+            return_exceptions=True)
+    finally:
+        await loop.run_in_executor(executor, pool.close)
+        executor.shutdown()
+    # Only an error outside a flow's own handling is left as a bare exception
+    return [(booking_case.case_id, result, 0.0, None) if isinstance(result, BaseException) else result
+            for booking_case, result in zip(cases, results)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run booking flows concurrently from one event loop")
+    parser.add_argument("--helper", choices=("BF", "SK"), default="SK")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--route-matrix", action="store_true",
+                        help="Book every route and passenger mix in routes.py instead of the single BOG-MGA case")
+    parser.add_argument("--mock-site", action="store_true", help="Book on the local mock site")
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument("--batch-form-fill", action="store_true")
+    parser.add_argument("--angular-waits", action="store_true")
+    parser.add_argument("--data-seed", type=int, default=0, help="Seed of the generated passenger data (default: 0)")
+    parser.add_argument("--page-load-strategy", choices=("normal", "eager", "none"), default="normal")
+    parser.add_argument("--log-dir", default=None, help="Write the JSON-lines helper logs to this directory")
+    parser.add_argument("--log-console", action="store_true", help="Write the helper logs to stderr")
+    parser.add_argument("--history-db", default=None, help="Also record the flows in this SQLite run history")
+    args = parser.parse_args()
+    flow_logging = flow_log.configure(args.log_dir, console=args.log_console)
+
+    if args.helper == "BF":
+        from .test_BF import SeleniumHelper
+    else:
+        from .test_SK import SeleniumHelper
+    cases = BOOKING_CASES if args.route_matrix else [DEFAULT_CASE]
+
+    def configure(helper):
+        helper.batch_form_fill = args.batch_form_fill
+        helper.angular_waits = args.angular_waits
+
+    started = time.monotonic()
+    if args.mock_site:
+        with MockBookingSite() as site:
+            results = asyncio.run(run_flows(cases, site.url, SeleniumHelper, book, args.concurrency, args.headless,
+                                            configure, args.page_load_strategy, args.data_seed))
+    else:
+        results = asyncio.run(run_flows(cases, LIVE_BOOKING_URL, SeleniumHelper, book, args.concurrency,
+                                        args.headless, configure, args.page_load_strategy, args.data_seed))
+    wall = time.monotonic() - started
+    flow_logging.stop()
+
+    if args.history_db:
+        history = RunHistory(args.history_db)
+        try:
+            for case_id, error, seconds, helper in results:
+                # No helper when the browser did not start
+                history.record_run(f"book_{args.helper}[{case_id}]", "passed" if error is None else "failed",
+                                   seconds, helper.recorder.records if helper else [], case_id, "async")
+        finally:
+            history.close()
+
+    for case_id, error, seconds, _ in results:
+        print(f"{case_id:24} {seconds:8.1f}s {'ok' if error is None else f'FAILED: {error}'}")
+    print(f"{len(results)} flows in {wall:.1f}s wall time, {sum(r[2] for r in results):.1f}s of flow time")
+
+
+if __name__ == "__main__":
+    main()
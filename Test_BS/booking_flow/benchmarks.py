@@ -0,0 +1,168 @@
+"""Micro-benchmarks of the SeleniumHelper primitives of test_BF.py and test_SK.py.
+
+Each primitive runs many times against an in-process FakeWebDriver with a fixed
+per-command latency (or against a headless Chrome on the mock site with --browser),
+next to the raw driver calls it wraps. Run from Test_BS:
+
+    python -m booking_flow.benchmarks --latency-ms 5 --iterations 200
+"""
+import argparse
+import json
+import random
+import time
+from collections import Counter
+
+from selenium.webdriver.common.by import By
+
+from . import flow_log, locators
+from .fake_webdriver import FakeWebDriver
+from .loader_stats import percentile
+from .locators import SELECTOR_MAPPING
+from .test_BF import SeleniumHelper as BFHelper
+from .test_SK import SeleniumHelper as SKHelper
+
+HELPERS = {"BF": BFHelper, "SK": SKHelper}
+
+# Passenger counter rows of the search form, visible once the passenger selector is open
+PASSENGER_ROWS = "//ul[contains(@attr.aria-labelledby,'ibeSearchPaxControlLabel')]/li"
+
+
+def _find(driver, locator):
+    return driver.find_element(SELECTOR_MAPPING[locator.by_selector], locator.value)
+
+
+def _type(driver):
+    element = _find(driver, locators.ORIGIN_INPUT)
+    element.clear()
+    element.send_keys("BOG")
+
+
+# (name, helper call, raw driver calls doing the same work)
+PRIMITIVES = [
+    ("click_element",
+     lambda helper: helper.click_element(*locators.PASSENGER_SELECTOR),
+     lambda driver: _find(driver, locators.PASSENGER_SELECTOR).click()),
+    ("type_text",
+     lambda helper: helper.type_text(*locators.ORIGIN_INPUT, "BOG"),
+     _type),
+    ("get_options",
+     lambda helper: helper.get_options("xpath", PASSENGER_ROWS),
+     lambda driver: random.choice(driver.find_elements(By.XPATH, PASSENGER_ROWS)).text),
+    ("wait_for_visibility_of_element_located",
+     lambda helper: helper.wait_for_visibility_of_element_located(*locators.SEARCH_BUTTON, 5),
+     lambda driver: _find(driver, locators.SEARCH_BUTTON).is_displayed()),
+    ("wait_for_invisibility_of_element_located",
+     lambda helper: helper.wait_for_invisibility_of_element_located(*locators.LOADER, 5),
+     lambda driver: _find(driver, locators.LOADER).is_displayed()),
+    ("wait_for_visibility_of_element_located_instant",
+     lambda helper: helper.wait_for_visibility_of_element_located_instant(*locators.ORIGIN_FIELD),
+     lambda driver: _find(driver, locators.ORIGIN_FIELD).is_displayed()),
+    ("wait_for_visibility_of_element_located_instant (missing)",
+     lambda helper: helper.wait_for_visibility_of_element_located_instant(*locators.DOCUMENT_TYPE_DROPDOWN),
+     lambda driver: driver.find_elements(By.XPATH, locators.DOCUMENT_TYPE_DROPDOWN.value)),
+]
+
+
+def fake_search_page(driver):
+    # The elements of the search form the primitives touch, all visible except the loader
+    for locator in (locators.PASSENGER_SELECTOR, locators.ORIGIN_INPUT, locators.SEARCH_BUTTON,
+                    locators.ORIGIN_FIELD):
+        driver.page.add(SELECTOR_MAPPING[locator.by_selector], locator.value)
+    driver.page.add(By.XPATH, locators.LOADER.value, displayed=False)
+    driver.page.add(By.XPATH, PASSENGER_ROWS, count=4, text="Adults")
+
+
+def count_commands(driver):
+    """Count the commands `driver` sends from now on, by command name."""
+    counts = Counter()
+    execute = driver.execute
+
+    def counting_execute(driver_command, params=None):
+        counts[driver_command] += 1
+        return execute(driver_command, params)
+
+    driver.execute = counting_execute
+    return counts
+
+
+def _measure(call, target, counts, iterations):
+    samples = []
+    counts.clear()
+    for _ in range(iterations):
+        started = time.perf_counter()
+        call(target)
+        samples.append(time.perf_counter() - started)
+    return samples, sum(counts.values()) / iterations
+
+
+def run(helper_names, driver, iterations):
+    """Benchmark every primitive of each helper on `driver`, returning one result dict per pair."""
+    counts = count_commands(driver)
+    results = []
+    for name, helper_call, raw_call in PRIMITIVES:
+        raw_samples, raw_commands = _measure(raw_call, driver, counts, iterations)
+        for helper_name in helper_names:
+            helper = HELPERS[helper_name](driver)
+            samples, commands = _measure(helper_call, helper, counts, iterations)
+            helper.command_trace.detach()
+            results.append({
+                "helper": helper_name, "primitive": name, "iterations": iterations,
+                "commands": commands, "raw_commands": raw_commands,
+                "p50": percentile(samples, 0.5), "p90": percentile(samples, 0.9), "p99": percentile(samples, 0.99),
+                "raw_p50": percentile(raw_samples, 0.5),
+                "overhead": percentile(samples, 0.5) - percentile(raw_samples, 0.5),
+            })
+    return results
+
+
+def format_results(results):
+    lines = [f"{'helper':6} {'primitive':58} {'cmds':>5} {'raw':>5} {'p50 ms':>8} {'p90 ms':>8} "
+             f"{'p99 ms':>8} {'raw p50':>8} {'overhead':>9}"]
+    for r in results:
+        lines.append(f"{r['helper']:6} {r['primitive']:58} {r['commands']:5.1f} {r['raw_commands']:5.1f} "
+                     f"{r['p50'] * 1000:8.2f} {r['p90'] * 1000:8.2f} {r['p99'] * 1000:8.2f} "
+                     f"{r['raw_p50'] * 1000:8.2f} {r['overhead'] * 1000:9.2f}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SeleniumHelper primitives")
+    parser.add_argument("--helper", nargs="+", choices=sorted(HELPERS), default=sorted(HELPERS))
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="Fake driver latency per command (default: 0)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0,
+                        help="Random extra fake driver latency per command (default: 0)")
+    parser.add_argument("--browser", action="store_true",
+                        help="Use a headless Chrome on the local mock site instead of the fake driver")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results to PATH, to compare runs")
+    args = parser.parse_args()
+    # Helper records are queued and dropped as in a test run without a log directory
+    log = flow_log.configure(None)
+
+    if args.browser:
+        from .driver_pool import create_chrome_driver
+        from .mock_server import MockBookingSite
+
+        with MockBookingSite() as site:
+            driver = create_chrome_driver(headless=True)
+            try:
+                driver.get(site.url)
+                _find(driver, locators.PASSENGER_SELECTOR).click()
+                results = run(args.helper, driver, args.iterations)
+            finally:
+                driver.quit()
+    else:
+        driver = FakeWebDriver(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000)
+        fake_search_page(driver)
+        results = run(args.helper, driver, args.iterations)
+    log.stop()
+
+    print(format_results(results))
+    if args.json:
+        with open(args.json, "w") as report:
+            json.dump(results, report, indent=2)
+
+
+if __name__ == "__main__":
+    main()
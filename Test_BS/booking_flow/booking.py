@@ -0,0 +1,117 @@
+from . import locators
+
+
+DROPDOWN_METHODS = ("select_gender", "select_day", "select_month", "select_year", "select_exp_day",
+                    "select_exp_month", "select_exp_year", "select_document_type", "select_nationality")
+# WebDriver commands allowed per dropdown call: on the QA host a dropdown whose options render late
+# falls back to clicks, which takes about nine
+COMMAND_BUDGETS = {name: 12 for name in DROPDOWN_METHODS}
+# The mock site renders its options in time, so the dropdown script is one command and the rest is headroom
+MOCK_SITE_COMMAND_BUDGETS = {name: 3 for name in DROPDOWN_METHODS}
+
+
+# The booking steps, run by test_main of test_BF.py and test_SK.py and, per case on a thread of their own,
+# by async_flows and platform_scheduler
+def book(helper, booking_case, booking_url, booking_data):
+    """Execute the specified steps."""
+    # Start from a saved checkpoint with --resume-from, otherwise from the search page
+    resumed = helper.resume(booking_case.case_id)
+    if resumed is None:
+        helper.load_url(booking_url)
+
+        helper.step("1. Click on the origin field", critical=True)
+        helper.click_element(*locators.ORIGIN_FIELD)
+        helper.step("2. Enter the origin code in the origin field", critical=True)
+        helper.type_text(*locators.ORIGIN_INPUT, booking_case.origin)
+        helper.step("3. Click on the button with the origin code as ID", critical=True)
+        helper.click_element(*locators.station_button(booking_case.origin))
+        helper.step("4. Enter the destination code in the destination field", critical=True)
+        helper.type_text(*locators.DESTINATION_INPUT, booking_case.destination)
+        helper.step("5. Click on the button with the destination code as ID", critical=True)
+        helper.click_element(*locators.station_button(booking_case.destination))
+        helper.step("6. Click on the passenger selector", critical=True)
+        helper.click_element(*locators.PASSENGER_SELECTOR)
+        helper.step("7. Increase the number of adults from the default of one")
+        helper.set_passenger_count(1, booking_case.adults)
+        helper.step("8. Increase the number of youths, children and infants")
+        for row, count in ((2, booking_case.youths), (3, booking_case.children), (4, booking_case.infants)):
+            # These rows start at zero, so an empty one needs no script call
+            if count:
+                helper.set_passenger_count(row, count)
+        helper.step("9. Click on the button to confirm passengers", critical=True)
+        helper.click_element(*locators.PASSENGER_CONFIRM)
+        helper.step("10. Click on the search button", critical=True)
+        helper.click_element(*locators.SEARCH_BUTTON)
+
+        helper.step("11. Wait for the loader to disappear")
+        helper.wait_for_loader_invisibility(locators.LOADER.value, *helper.LOADER_WAITS["long"])
+        helper.step('12. Assert that the element with the class "journey-no-data" is not visible')
+        assert not helper.wait_for_visibility_of_element_located(*locators.NO_FLIGHTS, 4), "No flight(s) available"
+        helper.step('13. Assert that the element with the class "day-selector_container" is visible instantly')
+        assert helper.wait_for_visibility_of_element_located(*locators.WEEK_CALENDAR), "Week calendar was not visible"
+        helper.step("14. Wait for visibility and click on the filter button")
+        helper.wait_for_visibility_of_element_located(*locators.FILTERS_BUTTON)
+        helper.click_element(*locators.FILTERS_BUTTON)
+        helper.step("15. Click on the journey select option", critical=True)
+        helper.click_element(*locators.JOURNEY_OPTION)
+        helper.step("16. Click on the fare control options", critical=True)
+        helper.click_element(*locators.FARE_OPTION)
+        helper.step("17. Wait for the loader to disappear")
+        helper.wait_for_loader_invisibility(locators.LOADER.value, *helper.LOADER_WAITS["short"])
+        helper.step("18. Assert again that no flight data is visible")
+        assert not helper.wait_for_visibility_of_element_located(*locators.NO_FLIGHTS, 4), "No flight(s) available"
+        helper.step("19. Click again on the journey select option", critical=True)
+        helper.click_element(*locators.JOURNEY_OPTION)
+        helper.step("20. Click on the fare control options again", critical=True)
+        helper.click_element(*locators.FARE_OPTION)
+        helper.step("21. Wait for the loader to disappear")
+        helper.wait_for_loader_invisibility(locators.LOADER.value, *helper.LOADER_WAITS["short"])
+        helper.step("22. Click on the page button", critical=True)
+        helper.click_element(*locators.CONTINUE_BUTTON)
+        helper.step("23. Wait for the loader to disappear again")
+        helper.wait_for_loader_invisibility(locators.LOADER.value, *helper.LOADER_WAITS["long"])
+        helper.save_checkpoint(booking_case.case_id, "passengers")
+
+    if resumed != "contact":
+        # The while loop starts here
+        helper.step("Passenger forms")
+        passengers = iter(booking_data["passengers"])
+        while helper.wait_for_visibility_of_element_located(*locators.NATIONALITY_DROPDOWN, 2):
+            helper.prevent_inactivity()
+            # Blocks beyond the generated passengers (none expected) get random options
+            passenger = next(passengers, {"first_name": "firstName", "last_name": "lastName",
+                                          "document_number": "123456789"})
+            if helper.batch_form_fill:
+                helper.fill_passenger(passenger)
+                continue
+            # Dropdowns take the passenger's exact option text, or its position in the list (see passenger_data)
+            picks = passenger.get("picks", {})
+            helper.select_gender(passenger.get("gender"), picks.get("gender"))
+            helper.type_first_name(passenger["first_name"])
+            helper.type_last_name(passenger["last_name"])
+            helper.select_year(passenger.get("birth_year"), picks.get("birth_year"))
+            helper.select_month(passenger.get("birth_month"), picks.get("birth_month"))
+            helper.select_day(passenger.get("birth_day"), picks.get("birth_day"))
+            if helper.look_for_document_type():
+                helper.select_document_type(passenger.get("document_type"), picks.get("document_type"))
+                helper.type_document_number(passenger["document_number"])
+                if helper.look_for_exp_day():
+                    helper.select_exp_year(passenger.get("exp_year"), picks.get("exp_year"))
+                    helper.select_exp_month(passenger.get("exp_month"), picks.get("exp_month"))
+                    helper.select_exp_day(passenger.get("exp_day"), picks.get("exp_day"))
+            helper.select_nationality(passenger.get("nationality"), picks.get("nationality"))
+
+        helper.step("Confirm passengers", critical=True)
+        helper.click_element(*locators.MODAL_CONFIRM)
+        helper.save_checkpoint(booking_case.case_id, "contact")
+
+    helper.step("24. Type the phone number")
+    contact = booking_data["contact"]
+    helper.type_text(*locators.PHONE_NUMBER_INPUT, contact["phone_number"])
+
+    helper.step("25. Click and scroll on the phone prefix selector")
+    helper.select_from_dropdown(locators.PHONE_PREFIX_DROPDOWN.value, locators.NATIONALITY_OPTIONS.value,
+                                pick=contact["picks"]["phone_prefix"])
+
+    helper.step("26. Type the email")
+    helper.type_text(*locators.EMAIL_INPUT, contact["email"])
@@ -0,0 +1,94 @@
+import json
+import logging
+import os
+import time
+from urllib.parse import urlsplit
+
+from selenium.common import WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from . import locators
+
+log = logging.getLogger(__name__)
+
+# Checkpoints in flow order, with the element that shows a restored page is usable
+CHECKPOINTS = {
+    "passengers": locators.NATIONALITY_DROPDOWN,
+    "contact": locators.PHONE_NUMBER_INPUT,
+}
+# Older checkpoints are ignored, the QA host's booking session has expired by then
+MAX_AGE_SECONDS = 30 * 60
+
+READ_STORAGE_SCRIPT = """
+var dump = function (storage) {
+    var items = {};
+    for (var i = 0; i < storage.length; i++) { items[storage.key(i)] = storage.getItem(storage.key(i)); }
+    return items;
+};
+return {local: dump(window.localStorage), session: dump(window.sessionStorage)};
+"""
+
+WRITE_STORAGE_SCRIPT = """
+var write = function (storage, items) {
+    storage.clear();
+    Object.keys(items).forEach(function (key) { storage.setItem(key, items[key]); });
+};
+write(window.localStorage, arguments[0]);
+write(window.sessionStorage, arguments[1]);
+"""
+
+
+def capture_state(driver):
+    """URL, cookies and web storage of the current page."""
+    storage = driver.execute_script(READ_STORAGE_SCRIPT)
+    return {"url": driver.current_url, "cookies": driver.get_cookies(), "local_storage": storage["local"],
+            "session_storage": storage["session"], "saved_at": time.time()}
+
+
+def prime_state(driver, state):
+    """Put a state's cookies and web storage into the browser, without opening its URL yet.
+
+    Storage and cookies can only be set from a page of the same origin, so this opens a
+    static resource of that origin first; the caller then loads the URL itself.
+    """
+    parts = urlsplit(state["url"])
+    driver.get(f"{parts.scheme}://{parts.netloc}/favicon.ico")
+    # With the "none" page-load strategy driver.get does not wait for the origin to change
+    WebDriverWait(driver, 10).until(lambda d: d.execute_script("return location.host;") == parts.netloc)
+    driver.execute_script(WRITE_STORAGE_SCRIPT, state["local_storage"], state["session_storage"])
+    driver.delete_all_cookies()
+    for cookie in state["cookies"]:
+        try:
+            driver.add_cookie(cookie)
+        except WebDriverException as e:
+            # Cookies of other domains (analytics, CDN) cannot be set from this page
+            log.warning("Skipping cookie %s of %s: %s", cookie.get("name"), cookie.get("domain"), e.msg)
+
+
+class CheckpointStore:
+    """Browser states saved after named steps, one JSON file per booking case and checkpoint."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, key, name):
+        return os.path.join(self.directory, key, f"{name}.json")
+
+    def save(self, key, name, state):
+        path = self._path(key, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as checkpoint:
+            json.dump(state, checkpoint, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+    def load(self, key, name, max_age=MAX_AGE_SECONDS):
+        try:
+            with open(self._path(key, name)) as checkpoint:
+                state = json.load(checkpoint)
+        except (OSError, ValueError):
+            return None
+        if time.time() - state.get("saved_at", 0) > max_age:
+            return None
+        return state
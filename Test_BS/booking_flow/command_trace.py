@@ -0,0 +1,80 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+
+class CommandBudgetExceeded(AssertionError):
+    pass
+
+
+class CommandTrace:
+    """Logs every WebDriver command of a helper with its latency, helper method and step.
+
+    It wraps `driver.execute` on the instance rather than proxying the driver, since
+    WebElements send their commands through the driver they were found with.
+    `budgets` maps a step name, or a helper method name (per call), to the most
+    commands it may use.
+    """
+
+    def __init__(self, driver, recorder, budgets=None):
+        self.driver = driver
+        self.recorder = recorder
+        self.budgets = budgets or {}
+        self.commands = []
+        self._checked = 0
+        self._paused = False
+        self._previous = driver.__dict__.get("execute")
+        self._execute = driver.execute
+        driver.execute = self._traced_execute
+
+    def _traced_execute(self, driver_command, params=None):
+        if self._paused:
+            return self._execute(driver_command, params)
+        started = time.monotonic()
+        try:
+            return self._execute(driver_command, params)
+        finally:
+            self.commands.append({"command": driver_command, "step": self.recorder.current_step,
+                                  "method": self.recorder.current_method, "duration": time.monotonic() - started})
+            self.recorder.add_command()
+
+        # Commands sent inside are neither logged nor counted against budgets, e.g. diagnostics of a failure
+
+    @contextmanager
+    def paused(self):
+        self._paused = True
+        try:
+            yield
+        finally:
+            self._paused = False
+
+        # Give the driver its own execute back, so a pooled driver is not wrapped once per test
+
+    def detach(self):
+        if self.driver.__dict__.get("execute") != self._traced_execute:
+            return
+        if self._previous is None:
+            del self.driver.execute
+        else:
+            self.driver.execute = self._previous
+
+    def counts(self, step=None):
+        return Counter(entry["command"] for entry in self.commands if step is None or entry["step"] == step)
+
+        # Steps and helper calls finished since the last check that went over their budget
+
+    def violations(self):
+        records = self.recorder.records[self._checked:]
+        self._checked = len(self.recorder.records)
+        found = []
+        for record in records:
+            name = record["step"] if record["kind"] == "step" else record["method"]
+            limit = self.budgets.get(name)
+            if limit is not None and record["commands"] > limit:
+                found.append(f"{name} used {record['commands']} commands (budget {limit}) in step {record['step']}")
+        return found
+
+    def check(self):
+        found = self.violations()
+        if found:
+            raise CommandBudgetExceeded("Command budget exceeded:\n  " + "\n  ".join(found))
@@ -0,0 +1,370 @@
+import logging
+import os
+import random
+import re
+import time
+from collections import Counter
+from functools import partial
+
+import pytest
+
+from . import flow_log
+from .artifacts import ArtifactStore
+from .checkpoints import CheckpointStore
+from .driver_pool import DriverPool, create_chrome_driver
+from .fake_webdriver import FakeWebDriver
+from .loader_stats import LoaderStats
+from .mock_server import MockBookingSite
+from .network_filter import PROFILES, ResourceSizes, block_patterns
+from .passenger_data import generate_booking, load_bookings
+from .retry_policy import RetryPolicy
+from .routes import BOOKING_CASES, DEFAULT_CASE, LIVE_BOOKING_URL
+from .run_history import RunHistory
+from .sharding import estimate_duration, load_durations, record_duration, save_durations, shard
+
+log = logging.getLogger(__name__)
+
+# Durations of the tests that passed in this session, keyed by node id
+_finished = {}
+# Prebuilt bookings handed out per case by this worker, so a repeated case gets the next record
+_prebuilt_used = Counter()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("booking_flow")
+    group.addoption("--driver-pool-size", type=int, default=1,
+                    help="Number of warm browsers kept per worker (default: 1)")
+    group.addoption("--batch-form-fill", action="store_true", default=False,
+                    help="Fill each passenger block with a single script call")
+    group.addoption("--wait-engine", choices=("polling", "observer"), default="polling",
+                    help="Wait through WebDriverWait polling or an in-page MutationObserver")
+    group.addoption("--route-matrix", action="store_true", default=False,
+                    help="Run the booking flow over every route and passenger mix in routes.py")
+    group.addoption("--durations-file", default=".booking_durations.json",
+                    help="History of test durations used to balance shards (default: .booking_durations.json)")
+    group.addoption("--shard-count", type=int, default=1,
+                    help="Split the tests into N shards balanced by historical duration")
+    group.addoption("--shard-index", type=int, default=0,
+                    help="Shard to run (0-based) when --shard-count is above 1")
+    group.addoption("--perf-report", default=None, metavar="DIR",
+                    help="Write per-test step and helper timings (JSON and CSV) into DIR and log a summary")
+    group.addoption("--adaptive-waits", action="store_true", default=False,
+                    help="Derive loader wait budgets from observed durations per step")
+    group.addoption("--loader-stats-file", default=".loader_stats.json",
+                    help="History of loader durations for --adaptive-waits (default: .loader_stats.json)")
+    group.addoption("--retry-attempts", type=int, default=3,
+                    help="Attempts per helper action on stale or intercepted elements (default: 3)")
+    group.addoption("--retry-budget", type=float, default=15.0,
+                    help="Seconds one helper action may spend retrying (default: 15)")
+    group.addoption("--strict-actions", action="store_true", default=False,
+                    help="Raise HelperActionError from a failed helper action instead of printing it")
+    group.addoption("--circuit-breaker", action="store_true", default=False,
+                    help="Fail at the next step once an action of a critical step failed")
+    group.addoption("--save-checkpoints", action="store_true", default=False,
+                    help="Save browser state (URL, cookies, storage) when the passenger and contact pages are reached")
+    group.addoption("--resume-from", choices=("passengers", "contact"), default=None,
+                    help="Start from a checkpoint saved by an earlier run of the same booking case")
+    group.addoption("--checkpoint-dir", default=".checkpoints",
+                    help="Directory of the saved checkpoints (default: .checkpoints)")
+    group.addoption("--block-profile", choices=sorted(PROFILES), default=None,
+                    help="Block trackers ('trackers'), or trackers, fonts and media ('lean'); 'off' only measures")
+    group.addoption("--block-url", action="append", default=[], metavar="PATTERN",
+                    help="Also block URLs matching PATTERN (CDP wildcards), repeatable")
+    group.addoption("--allow-url", action="append", default=[], metavar="PATTERN",
+                    help="Remove PATTERN from the profile's block list, repeatable")
+    group.addoption("--resource-sizes-file", default=".resource_sizes.json",
+                    help="Sizes of resources seen unblocked, to estimate the bytes blocking saves")
+    group.addoption("--page-load-strategy", choices=("normal", "eager", "none"), default="normal",
+                    help="Return from navigation on the load event (normal), on DOMContentLoaded (eager) or at once "
+                         "(none); eager and none then wait until the page's first element is clickable")
+    group.addoption("--angular-waits", action="store_true", default=False,
+                    help="Wait for Angular to be stable (whenStable) after each click and before loader checks")
+    group.addoption("--data-seed", type=int, default=None,
+                    help="Seed of the generated passenger and contact data (default: a new seed, printed per test)")
+    group.addoption("--passenger-data", default=None, metavar="FILE",
+                    help="Use the bookings prebuilt by python -m booking_flow.passenger_data instead of generating "
+                         "them; --data-seed picks the first record of each case, each repeat of a case the next one")
+    group.addoption("--flow-log-dir", default=".logs",
+                    help="Directory of the JSON-lines helper logs, one <worker>.jsonl per process (default: .logs)")
+    group.addoption("--flow-log-level", default="INFO", choices=("DEBUG", "INFO", "WARNING", "ERROR"),
+                    help="Lowest level logged; DEBUG adds every click, typed text and visible element")
+    group.addoption("--flow-log-console", action="store_true", default=False,
+                    help="Also write the helper logs to stderr, e.g. with pytest -s")
+    group.addoption("--artifacts-dir", default=".artifacts",
+                    help="Where screenshots, page sources and console logs of failed steps go (default: .artifacts)")
+    group.addoption("--artifact-sample-rate", type=float, default=0.0,
+                    help="Fraction of tests that capture artifacts at the end of every step, failed or not")
+    group.addoption("--no-artifacts", action="store_true", default=False,
+                    help="Capture nothing, even on failure")
+    group.addoption("--history-db", default=".run_history.sqlite",
+                    help="SQLite run history fed by every test, see python -m booking_flow.run_history "
+                         "(default: .run_history.sqlite)")
+    group.addoption("--no-history", action="store_true", default=False,
+                    help="Record nothing in the run history")
+    group.addoption("--headless", action="store_true", default=False,
+                    help="Run Chrome headless with a 1920x1080 viewport")
+    group.addoption("--mock-site", action="store_true", default=False,
+                    help="Run the flow against the local mock site in mock_site/ instead of the QA host")
+    group.addoption("--mock-loader-ms", type=int, default=500,
+                    help="How long the mock site's loading overlays stay up, in ms (default: 500)")
+    group.addoption("--mock-jitter-ms", type=int, default=0,
+                    help="Random extra delay added to each mock loader, in ms (default: 0)")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "test: booking flow end-to-end test")
+    config.addinivalue_line("markers", "command_budget(budgets, mock_site=None): most WebDriver commands per step "
+                                       "name or per helper method call, the test fails above them; mock_site "
+                                       "replaces the budgets with --mock-site")
+
+
+def pytest_generate_tests(metafunc):
+    if "booking_case" in metafunc.fixturenames:
+        cases = BOOKING_CASES if metafunc.config.getoption("route_matrix") else [DEFAULT_CASE]
+        metafunc.parametrize("booking_case", cases, ids=[case.case_id for case in cases])
+
+
+def _durations_path(config):
+    return os.path.join(str(config.rootpath), config.getoption("durations_file"))
+
+
+def _history_key(nodeid):
+    # xdist appends "@<group>" to the node ids of grouped tests
+    return nodeid.split("@")[0]
+
+
+# Runs before xdist's own hook, which rewrites node ids of grouped tests
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config, items):
+    durations = load_durations(_durations_path(config))
+    costs = {}
+    for item in items:
+        callspec = getattr(item, "callspec", None)
+        case = callspec.params.get("booking_case") if callspec else None
+        costs[item.nodeid] = estimate_duration(durations, item.nodeid, case.passengers if case else 0)
+    # Longest first, so the slow passenger-heavy cases never start last
+    items.sort(key=lambda item: -costs[item.nodeid])
+
+    shard_count = config.getoption("shard_count")
+    if shard_count > 1:
+        assignment = shard(costs, shard_count)
+        shard_index = config.getoption("shard_index")
+        deselected = [item for item in items if assignment[item.nodeid] != shard_index]
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = [item for item in items if assignment[item.nodeid] == shard_index]
+
+    # With `-n N --dist loadgroup`, hand each xdist worker one balanced group
+    worker_count = int(os.environ.get("PYTEST_XDIST_WORKER_COUNT", 0))
+    if worker_count > 1 and config.getoption("dist", "no") == "loadgroup":
+        assignment = shard({item.nodeid: costs[item.nodeid] for item in items}, worker_count)
+        for item in items:
+            item.add_marker(pytest.mark.xdist_group(f"shard{assignment[item.nodeid]}"))
+
+
+def pytest_runtest_logreport(report):
+    if report.when == "call" and report.passed:
+        _finished[_history_key(report.nodeid)] = report.duration
+
+
+def pytest_sessionfinish(session):
+    # Only the xdist controller (or a plain run) writes the history, workers report to it
+    if hasattr(session.config, "workerinput") or not _finished:
+        return
+    path = _durations_path(session.config)
+    durations = load_durations(path)
+    for key, seconds in _finished.items():
+        record_duration(durations, key, seconds)
+    save_durations(path, durations)
+
+
+# Budgets of the test's command_budget marker for the target it runs on, the mock site or the QA host
+def _command_budgets(item, mock_site):
+    marker = item.get_closest_marker("command_budget")
+    if marker is None:
+        return {}
+    if mock_site and marker.kwargs.get("mock_site") is not None:
+        return marker.kwargs["mock_site"]
+    return marker.args[0]
+
+
+# Check command budgets once the test body passed, so going over one fails the test rather than its teardown
+@pytest.hookimpl(trylast=True)
+def pytest_runtest_call(item):
+    helper = getattr(item, "funcargs", {}).get("helper")
+    if helper is None:
+        return
+    # The last step only counts its commands once it ends
+    helper.recorder.end_step()
+    helper.command_trace.check()
+
+
+# Queued JSON-lines logging for the whole session of this worker
+@pytest.fixture(scope="session", autouse=True)
+def flow_logging(pytestconfig):
+    flow_logs = flow_log.configure(os.path.join(str(pytestconfig.rootpath), pytestconfig.getoption("flow_log_dir")),
+                                   pytestconfig.getoption("flow_log_level"), pytestconfig.getoption("flow_log_console"))
+    yield
+    flow_logs.stop()
+
+
+# Test outcome on the item, so fixtures can tell a failed test apart in their teardown
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    setattr(item, f"rep_{report.when}", report)
+
+
+# Failure artifacts of this worker, written from a background thread
+@pytest.fixture(scope="session")
+def artifact_store(pytestconfig):
+    if pytestconfig.getoption("no_artifacts"):
+        yield None
+        return
+    store = ArtifactStore(os.path.join(str(pytestconfig.rootpath), pytestconfig.getoption("artifacts_dir")),
+                          sample_rate=pytestconfig.getoption("artifact_sample_rate"))
+    yield store
+    store.close()
+
+
+# Run history of this worker's tests, one SQLite connection per worker
+@pytest.fixture(scope="session")
+def run_history(pytestconfig):
+    if pytestconfig.getoption("no_history"):
+        yield None
+        return
+    history = RunHistory(os.path.join(str(pytestconfig.rootpath), pytestconfig.getoption("history_db")))
+    yield history
+    history.close()
+
+
+# Session-scoped pool, so every xdist worker keeps its own warm browsers
+@pytest.fixture(scope="session")
+def driver_pool(pytestconfig):
+    profile = pytestconfig.getoption("block_profile")
+    blocked_urls = None
+    if profile is not None:
+        blocked_urls = block_patterns(profile, pytestconfig.getoption("block_url"), pytestconfig.getoption("allow_url"))
+    factory = partial(create_chrome_driver, headless=pytestconfig.getoption("headless"), blocked_urls=blocked_urls,
+                      page_load_strategy=pytestconfig.getoption("page_load_strategy"))
+    pool = DriverPool(factory=factory, max_size=pytestconfig.getoption("driver_pool_size"))
+    yield pool
+    pool.close()
+
+
+# Loader durations shared by the tests of one worker, merged into the history file at the end
+@pytest.fixture(scope="session")
+def loader_stats(pytestconfig):
+    if not pytestconfig.getoption("adaptive_waits"):
+        yield None
+        return
+    stats = LoaderStats(os.path.join(str(pytestconfig.rootpath), pytestconfig.getoption("loader_stats_file")))
+    yield stats
+    stats.save()
+
+
+# Resource sizes shared by the tests of one worker, None unless a block profile is given
+@pytest.fixture(scope="session")
+def resource_sizes(pytestconfig):
+    if pytestconfig.getoption("block_profile") is None:
+        yield None
+        return
+    sizes = ResourceSizes(os.path.join(str(pytestconfig.rootpath), pytestconfig.getoption("resource_sizes_file")))
+    yield sizes
+    sizes.save()
+
+
+# Prebuilt bookings by case id, or None to generate them per test
+@pytest.fixture(scope="session")
+def prebuilt_bookings(pytestconfig):
+    path = pytestconfig.getoption("passenger_data")
+    return load_bookings(path) if path else None
+
+
+# Passengers and contact details for the test's booking case, reproducible from the printed seed
+@pytest.fixture
+def booking_data(booking_case, prebuilt_bookings, pytestconfig):
+    seed = pytestconfig.getoption("data_seed")
+    if seed is None:
+        seed = random.randrange(10 ** 6)
+    if prebuilt_bookings is not None and booking_case.case_id in prebuilt_bookings:
+        records = prebuilt_bookings[booking_case.case_id]
+        index = (seed + _prebuilt_used[booking_case.case_id]) % len(records)
+        _prebuilt_used[booking_case.case_id] += 1
+        log.info("Prebuilt booking %s of %s for %s (first of the case with --data-seed %s)", index + 1, len(records),
+                 booking_case.case_id, seed)
+        return records[index]
+    log.info("Passenger data seed: %s (replay with --data-seed %s)", seed, seed)
+    return generate_booking(booking_case, seed)
+
+
+# Where test_main starts: the QA host, or a mock site served by this worker
+@pytest.fixture(scope="session")
+def booking_url(pytestconfig):
+    if not pytestconfig.getoption("mock_site"):
+        yield LIVE_BOOKING_URL
+        return
+    with MockBookingSite(loader_ms=pytestconfig.getoption("mock_loader_ms"),
+                         jitter_ms=pytestconfig.getoption("mock_jitter_ms")) as site:
+        yield site.url
+
+
+# The SeleniumHelper of each test module on an in-process FakeWebDriver, for the unit tests
+@pytest.fixture(params=["BF", "SK"])
+def fake_helper(request):
+    from .test_BF import SeleniumHelper as BFHelper
+    from .test_SK import SeleniumHelper as SKHelper
+    helper = {"BF": BFHelper, "SK": SKHelper}[request.param](FakeWebDriver())
+    yield helper
+    helper.command_trace.detach()
+
+
+# Fixture para usar SeleniumHelper en pruebas, con la clase del módulo de prueba
+@pytest.fixture
+def helper(helper_class, driver_pool, loader_stats, resource_sizes, artifact_store, run_history, pytestconfig, request):
+    started = time.monotonic()
+    with driver_pool.lease() as driver:
+        helper = helper_class(driver)
+        helper.recorder.add_step("Driver lease", time.monotonic() - started)
+        helper.batch_form_fill = pytestconfig.getoption("batch_form_fill")
+        helper.wait_engine = pytestconfig.getoption("wait_engine")
+        helper.angular_waits = pytestconfig.getoption("angular_waits")
+        helper.loader_stats = loader_stats
+        helper.strict = pytestconfig.getoption("strict_actions")
+        helper.breaker.enabled = pytestconfig.getoption("circuit_breaker")
+        if pytestconfig.getoption("save_checkpoints") or pytestconfig.getoption("resume_from"):
+            helper.checkpoints = CheckpointStore(os.path.join(str(pytestconfig.rootpath),
+                                                              pytestconfig.getoption("checkpoint_dir")))
+        helper.resume_from = pytestconfig.getoption("resume_from")
+        helper.retry_policy = RetryPolicy(max_attempts=pytestconfig.getoption("retry_attempts"),
+                                          budget=pytestconfig.getoption("retry_budget"))
+        helper.command_trace.budgets = _command_budgets(request.node, pytestconfig.getoption("mock_site"))
+        helper.artifacts = artifact_store
+        # The node id, since test_BF and test_SK both have a test_main[<case>]
+        helper.test_name = _history_key(request.node.nodeid)
+        helper._sampled = artifact_store is not None and artifact_store.sampled()
+        yield helper
+        report = getattr(request.node, "rep_call", None)
+        if report is not None and report.failed and helper._captured_step != helper.recorder.current_step:
+            # Unless an action of the same step already captured its state
+            crash = getattr(report.longrepr, "reprcrash", None)
+            helper.capture_artifacts("test failed", error=crash.message if crash else report.longreprtext)
+        if report is not None and report.failed:
+            # Charge the failure to the step it happened in, even if no helper action reported it
+            helper.recorder.fail()
+        helper.recorder.end_step()
+        helper.command_trace.detach()
+        if resource_sizes is not None:
+            helper.report_network(resource_sizes)
+        if run_history is not None:
+            outcome = report.outcome if report is not None else "error"
+            callspec = getattr(request.node, "callspec", None)
+            booking_case = callspec.params.get("booking_case") if callspec else None
+            run_history.record_run(_history_key(request.node.nodeid), outcome, time.monotonic() - started,
+                                   helper.recorder.records, booking_case.case_id if booking_case else None,
+                                   flow_log.worker_name())
+        report_dir = pytestconfig.getoption("perf_report")
+        if report_dir:
+            log.info("Perf summary of %s:\n%s", request.node.nodeid, helper.recorder.summary())
+            helper.recorder.write_report(report_dir, re.sub(r"[^\w.-]+", "_", request.node.nodeid))
@@ -0,0 +1,71 @@
+# How long the script waits for the counter to show the requested value
+COUNTER_TIMEOUT_MS = 5000
+
+# Sets an ibe-minus-plus counter to `target` in one async round trip: reads the
+# current value, clicks plus or minus once per missing step (each click waits for
+# the previous one to render) and resolves with the value it ended on.
+SET_COUNTER_SCRIPT = """
+var xpath = arguments[0], target = arguments[1], timeoutMs = arguments[2];
+var done = arguments[arguments.length - 1];
+
+var control = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (!control) {
+    done({error: 'counter not found', clicks: 0});
+    return;
+}
+var buttons = control.querySelectorAll('button');
+var minus = buttons[0], plus = buttons[buttons.length - 1];
+
+function read() {
+    var input = control.querySelector('input');
+    if (input) { return parseInt(input.value, 10); }
+    var text = '';
+    var walker = document.createTreeWalker(control, NodeFilter.SHOW_TEXT);
+    while (walker.nextNode()) {
+        if (!walker.currentNode.parentElement.closest('button')) { text += walker.currentNode.textContent; }
+    }
+    var digits = text.match(/\\d+/);
+    return digits ? parseInt(digits[0], 10) : NaN;
+}
+
+var before = read(), clicks = 0, clickedAt = null;
+var deadline = Date.now() + timeoutMs;
+if (isNaN(before) || !plus) {
+    done({error: 'counter value not readable', clicks: 0});
+    return;
+}
+(function step() {
+    var current = read();
+    if (current === target) {
+        done({before: before, after: current, clicks: clicks});
+        return;
+    }
+    if (Date.now() > deadline) {
+        done({error: 'counter stuck at ' + current, clicks: clicks});
+        return;
+    }
+    if (current === clickedAt) {
+        // The last click has not been rendered yet
+        setTimeout(step, 20);
+        return;
+    }
+    var button = current < target ? plus : minus;
+    if (button.disabled) {
+        done({error: 'counter limit reached at ' + current, clicks: clicks});
+        return;
+    }
+    button.click();
+    clicks++;
+    clickedAt = current;
+    setTimeout(step, 0);
+})();
+"""
+
+
+def set_counter(driver, counter_locator, count):
+    """Set the ibe-minus-plus counter at an XPath to `count` in one call.
+
+    Returns {before, after, clicks}, or {error, clicks} when the counter could not
+    be set; `clicks` tells whether the page was changed before the error.
+    """
+    return driver.execute_async_script(SET_COUNTER_SCRIPT, counter_locator, count, COUNTER_TIMEOUT_MS)
@@ -0,0 +1,139 @@
+import logging
+
+from selenium.common import JavascriptException, TimeoutException
+
+log = logging.getLogger(__name__)
+
+# Headroom between the in-page timeout and WebDriver's script timeout
+SCRIPT_TIMEOUT_MARGIN = 5
+# In-page re-check for changes that do not mutate the DOM (CSS transitions)
+RECHECK_INTERVAL_MS = 250
+# Loader budget left once Angular is stable: the loader goes with the requests it was waiting on
+STABLE_LOADER_GRACE = 5
+# angular_stable() result for a page without Angular's testability API, as opposed to a wait that failed
+NO_ANGULAR = "no-angular"
+
+# Resolves when the first element matching the locator becomes visible or
+# invisible (mirrors visibility_of / invisibility_of_element_located), driven by a
+# MutationObserver instead of remote polling. `by` takes Selenium's By values.
+OBSERVE_SCRIPT = """
+var by = arguments[0], selector = arguments[1], condition = arguments[2];
+var timeoutMs = arguments[3], recheckMs = arguments[4];
+var done = arguments[arguments.length - 1];
+
+function find() {
+    try {
+        switch (by) {
+            case 'xpath':
+                return document.evaluate(selector, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+            case 'id':
+                return document.getElementById(selector);
+            case 'css selector':
+                return document.querySelector(selector);
+            case 'class name':
+                return document.getElementsByClassName(selector)[0] || null;
+        }
+    } catch (e) {}
+    return null;
+}
+function isVisible(el) {
+    if (!el || !el.isConnected) { return false; }
+    for (var node = el; node && node.nodeType === 1; node = node.parentElement) {
+        var style = window.getComputedStyle(node);
+        if (style.display === 'none' || parseFloat(style.opacity) === 0) { return false; }
+    }
+    if (window.getComputedStyle(el).visibility === 'hidden') { return false; }
+    return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+}
+function satisfied() {
+    var visible = isVisible(find());
+    return condition === 'visible' ? visible : !visible;
+}
+
+if (satisfied()) {
+    done(true);
+    return;
+}
+var observer, recheck, timer, finished = false;
+function finish(result) {
+    if (finished) { return; }
+    finished = true;
+    observer.disconnect();
+    clearInterval(recheck);
+    clearTimeout(timer);
+    done(result);
+}
+function check() {
+    if (satisfied()) { finish(true); }
+}
+observer = new MutationObserver(check);
+observer.observe(document.documentElement, {subtree: true, childList: true, attributes: true, characterData: true});
+recheck = setInterval(check, recheckMs);
+timer = setTimeout(function () { finish(false); }, timeoutMs);
+"""
+
+# Resolves true once every Angular app on the page has no pending macrotasks or HTTP
+# requests, false on timeout, and null when the page exposes no testability API.
+ANGULAR_STABLE_SCRIPT = """
+var timeoutMs = arguments[0];
+var done = arguments[arguments.length - 1];
+
+if (typeof window.getAllAngularTestabilities !== 'function') {
+    done('no-angular');
+    return;
+}
+var testabilities = window.getAllAngularTestabilities();
+if (!testabilities.length) {
+    done('no-angular');
+    return;
+}
+var pending = testabilities.length, finished = false;
+var timer = setTimeout(function () { finish(false); }, timeoutMs);
+function finish(result) {
+    if (finished) { return; }
+    finished = true;
+    clearTimeout(timer);
+    done(result);
+}
+testabilities.forEach(function (testability) {
+    testability.whenStable(function () {
+        if (--pending === 0) { finish(true); }
+    });
+});
+"""
+
+
+class ObserverWaits:
+    """Blocks on a single execute_async_script until a visibility condition holds."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self._script_timeout = None
+
+    def _allow(self, timeout):
+        needed = timeout + SCRIPT_TIMEOUT_MARGIN
+        if self._script_timeout is None or self._script_timeout < needed:
+            self.driver.set_script_timeout(needed)
+            self._script_timeout = needed
+
+    def wait(self, by, selector, condition, timeout):
+        # True/False once the page settled the condition, None if the script could not
+        # run to completion (e.g. the page navigated away) and the caller should poll
+        self._allow(timeout)
+        try:
+            return bool(self.driver.execute_async_script(
+                OBSERVE_SCRIPT, by, selector, condition, int(timeout * 1000), RECHECK_INTERVAL_MS
+            ))
+        except (JavascriptException, TimeoutException) as e:
+            log.warning("Observer wait interrupted, falling back to polling: %s", e.msg)
+            return None
+
+    def angular_stable(self, timeout):
+        # True once Angular reports the page stable, False on timeout, NO_ANGULAR without Angular testability,
+        # None if the script could not finish (e.g. a click navigated away) and this call should be skipped
+        self._allow(timeout)
+        try:
+            return self.driver.execute_async_script(ANGULAR_STABLE_SCRIPT, int(timeout * 1000))
+        except (JavascriptException, TimeoutException) as e:
+            log.warning("Angular stability wait interrupted: %s", e.msg)
+            return None
@@ -0,0 +1,135 @@
+import logging
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common import WebDriverException
+from selenium.webdriver.chrome.service import Service
+
+from .driver_resolver import resolve_chromedriver
+from .network_filter import apply_blocking
+
+log = logging.getLogger(__name__)
+
+# Seconds acquire waits for a leased driver to come back before giving up
+ACQUIRE_TIMEOUT = 300
+
+
+def create_chrome_driver(headless=False, blocked_urls=None, page_load_strategy="normal"):
+    # Driver configuration; blocked_urls (even empty) also turns on the performance log for network stats
+    service = Service(resolve_chromedriver())
+    options = webdriver.ChromeOptions()
+    options.page_load_strategy = page_load_strategy
+    if headless:
+        # Headless windows cannot be maximized, so give them a desktop-sized viewport
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1920,1080")
+    # Browser console messages for the failure artifacts
+    logging_prefs = {"browser": "ALL"}
+    if blocked_urls is not None:
+        logging_prefs["performance"] = "ALL"
+    options.set_capability("goog:loggingPrefs", logging_prefs)
+    driver = webdriver.Chrome(service=service, options=options)
+    if not headless:
+        driver.maximize_window()
+    if blocked_urls:
+        apply_blocking(driver, blocked_urls)
+    return driver
+
+
+class DriverPool:
+    """Keeps warm browsers for the whole session and leases them to tests."""
+
+    def __init__(self, factory=create_chrome_driver, max_size=1):
+        self.factory = factory
+        self.max_size = max_size
+        # Idle drivers, the most recently released last
+        self._idle = []
+        self._drivers = []
+        # Slots reserved for browsers still starting, which happens outside the lock
+        self._starting = 0
+        self._available = threading.Condition()
+
+        # Borrow a driver, starting a new browser only if the pool is not full yet
+
+    def acquire(self, timeout=ACQUIRE_TIMEOUT):
+        with self._available:
+            if not self._available.wait_for(
+                    lambda: self._idle or len(self._drivers) + self._starting < self.max_size, timeout):
+                raise TimeoutError(f"No driver came back to the pool within {timeout}s; "
+                                   f"all {self.max_size} are leased and may have leaked")
+            if self._idle:
+                return self._idle.pop()
+            self._starting += 1
+        # Starting a browser takes seconds, so other threads can take and return idle drivers meanwhile
+        try:
+            driver = self.factory()
+        except BaseException:
+            with self._available:
+                self._starting -= 1
+                self._available.notify()
+            raise
+        with self._available:
+            self._starting -= 1
+            self._drivers.append(driver)
+        return driver
+
+        # Give a driver back, replacing it with a new browser on the next acquire if it cannot be reset
+
+    def release(self, driver):
+        try:
+            self.reset(driver)
+        except Exception as e:
+            log.warning("Discarding driver that failed to reset: %s", e)
+            self.discard(driver)
+        else:
+            with self._available:
+                self._idle.append(driver)
+                self._available.notify()
+
+    def discard(self, driver):
+        with self._available:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+            # Its slot is free for a new browser
+            self._available.notify()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @contextmanager
+    def lease(self, timeout=ACQUIRE_TIMEOUT):
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+        # Bring a browser back to a clean state: one window, no cookies or storage, blank page
+
+    def reset(self, driver):
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.execute_script(
+            "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+        )
+        if hasattr(driver, "execute_cdp_cmd"):
+            # Clears cookies of every domain, not only the current one
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        else:
+            driver.delete_all_cookies()
+        driver.get("about:blank")
+
+    def close(self):
+        with self._available:
+            drivers, self._drivers, self._idle = self._drivers, [], []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass
+        log.info("Driver pool closed.")
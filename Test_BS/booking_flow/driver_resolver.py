@@ -0,0 +1,149 @@
+import json
+import logging
+import os
+import platform
+import time
+from contextlib import contextmanager
+
+from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.core.os_manager import ChromeType, OperationSystemManager
+
+log = logging.getLogger(__name__)
+
+# A pinned binary skips resolution entirely (offline agents)
+PINNED_DRIVER_ENV = "CHROMEDRIVER_PATH"
+MANIFEST_ENV = "DRIVER_MANIFEST"
+DEFAULT_MANIFEST = os.path.join(os.path.expanduser("~"), ".cache", "booking_flow", "drivers.json")
+
+LOCK_POLL_INTERVAL = 0.2
+# A lock this old belongs to a crashed process: well past the longest driver download
+LOCK_STALE_AFTER = 600
+# Waiters outlast the stale threshold, so they can take over a crashed holder's lock
+LOCK_TIMEOUT = LOCK_STALE_AFTER + 60
+
+# Paths already resolved by this process, keyed like the manifest
+_resolved = {}
+# Chrome version detected by this process; detecting it runs a subprocess
+_chrome_version = None
+
+
+def manifest_path():
+    return os.environ.get(MANIFEST_ENV, DEFAULT_MANIFEST)
+
+
+def get_chrome_version():
+    global _chrome_version
+    if _chrome_version is None:
+        try:
+            _chrome_version = OperationSystemManager().get_browser_version_from_os(ChromeType.GOOGLE)
+        except Exception as e:
+            log.error("Unable to detect Chrome version: %s", e)
+    return _chrome_version
+
+
+def manifest_key(browser_version):
+    return f"{platform.system()}-{platform.machine()}-chrome-{browser_version or 'unknown'}"
+
+
+def read_manifest(path):
+    try:
+        with open(path) as manifest:
+            return json.load(manifest)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_manifest(path, entries):
+    # Write to a temporary file first so readers never see a partial manifest
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as manifest:
+        json.dump(entries, manifest, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def file_lock(lock_path, timeout=LOCK_TIMEOUT):
+    # Lock file shared by pytest workers; portable across Windows and POSIX
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > LOCK_STALE_AFTER:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Timed out waiting for driver lock: {lock_path}")
+            time.sleep(LOCK_POLL_INTERVAL)
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        yield
+    finally:
+        os.close(fd)
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
+
+
+def _existing(path):
+    return path if path and os.path.isfile(path) else None
+
+
+def _version_order(version):
+    # Numeric, so 131.0 sorts above 99.0; "unknown" and other non-numeric versions sort last
+    try:
+        return tuple(int(part) for part in version.split("."))
+    except ValueError:
+        return ()
+
+
+def _any_known_driver(entries):
+    # Offline fallback: the newest driver previously resolved on this machine and platform
+    prefix = f"{platform.system()}-{platform.machine()}-chrome-"
+    versions = {key[len(prefix):]: path for key, path in entries.items() if key.startswith(prefix)}
+    for version in sorted(versions, key=_version_order, reverse=True):
+        if _existing(versions[version]):
+            return versions[version]
+    return None
+
+
+def resolve_chromedriver():
+    """Return a chromedriver path, downloading it at most once per machine and Chrome version."""
+    pinned = _existing(os.environ.get(PINNED_DRIVER_ENV))
+    if pinned:
+        return pinned
+
+    key = manifest_key(get_chrome_version())
+    if _existing(_resolved.get(key)):
+        return _resolved[key]
+
+    path = manifest_path()
+    cached = _existing(read_manifest(path).get(key))
+    if cached:
+        _resolved[key] = cached
+        return cached
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with file_lock(f"{path}.lock"):
+        # Another worker may have resolved it while we were waiting for the lock
+        entries = read_manifest(path)
+        cached = _existing(entries.get(key))
+        if not cached:
+            try:
+                cached = ChromeDriverManager().install()
+            except Exception as e:
+                cached = _any_known_driver(entries)
+                if not cached:
+                    raise
+                log.warning("Driver download failed (%s), using cached driver: %s", e, cached)
+            else:
+                entries[key] = cached
+                write_manifest(path, entries)
+                log.debug("Driver resolved and cached: %s", cached)
+    _resolved[key] = cached
+    return cached
@@ -0,0 +1,96 @@
+import logging
+import random
+
+from .locators import DROPDOWN_OPTIONS
+
+log = logging.getLogger(__name__)
+
+# How long the script waits for the option list to render after opening
+OPTIONS_TIMEOUT_MS = 2000
+
+# Shared by the dropdown and passenger form scripts: the option whose text equals `value`,
+# otherwise the one at fraction `pick` of the list. Only exact matches count, since
+# "Male" is part of "Female" and "1" of "10"
+CHOOSE_OPTION_JS = """
+function chooseOption(options, value, pick) {
+    if (value === null || value === undefined) {
+        if (pick === null || pick === undefined) { pick = Math.random(); }
+        return options[Math.min(Math.floor(pick * options.length), options.length - 1)];
+    }
+    value = String(value).trim();
+    return options.find(function (o) { return o.textContent.trim() === value; }) || null;
+}
+"""
+
+# Opens the dropdown, waits for its options, picks one and clicks it, all in one
+# async round trip. Closes the dropdown again when nothing could be selected.
+SELECT_OPTION_SCRIPT = CHOOSE_OPTION_JS + """
+var triggerXpath = arguments[0], optionsXpath = arguments[1], value = arguments[2];
+var pick = arguments[3], timeoutMs = arguments[4];
+var done = arguments[arguments.length - 1];
+
+function snapshot(xpath) {
+    var nodes = [];
+    var found = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (var i = 0; i < found.snapshotLength; i++) { nodes.push(found.snapshotItem(i)); }
+    return nodes;
+}
+function visible(el) {
+    return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+}
+
+var trigger = snapshot(triggerXpath).filter(visible)[0];
+if (!trigger) {
+    done({error: 'dropdown not found'});
+    return;
+}
+trigger.scrollIntoView({block: 'center'});
+trigger.click();
+var deadline = Date.now() + timeoutMs;
+(function attempt() {
+    var options = snapshot(optionsXpath).filter(visible);
+    if (!options.length) {
+        if (Date.now() > deadline) {
+            trigger.click();
+            done({error: 'no options rendered'});
+        } else {
+            setTimeout(attempt, 50);
+        }
+        return;
+    }
+    var chosen = chooseOption(options, value, pick);
+    if (!chosen) {
+        trigger.click();
+        done({error: 'option not found: ' + value});
+        return;
+    }
+    var text = chosen.textContent.trim();
+    chosen.click();
+    done({selected: text});
+})();
+"""
+
+
+def choose_option(options, pick=None):
+    """The option at fraction `pick` of the list, like the scripts' chooseOption, or a random one."""
+    if pick is None:
+        return random.choice(options)
+    return options[min(int(pick * len(options)), len(options) - 1)]
+
+
+def select_option(driver, trigger_locator, options_locator=DROPDOWN_OPTIONS.value, value=None, pick=None):
+    """Open an XPath dropdown and select `value`, or a random option, in one call.
+
+    `pick` chooses the option at that fraction of the list instead of a random one;
+    otherwise the random pick comes from the `random` module so seeding it makes
+    runs reproducible. Returns the selected text, or None when nothing was selected.
+    """
+    if pick is None:
+        pick = random.random()
+    result = driver.execute_async_script(
+        SELECT_OPTION_SCRIPT, trigger_locator, options_locator, value, pick, OPTIONS_TIMEOUT_MS
+    )
+    if "error" in result:
+        log.warning("Dropdown selection failed for %s: %s", trigger_locator, result["error"])
+        return None
+    return result["selected"]
@@ -0,0 +1,171 @@
+import itertools
+import random
+import time
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.webdriver import WebDriver as RemoteWebDriver
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+
+def w3c_locator(by, value):
+    # Same rewrite the remote driver applies before sending a find command
+    if by == By.ID:
+        return By.CSS_SELECTOR, f'[id="{value}"]'
+    if by == By.CLASS_NAME:
+        return By.CSS_SELECTOR, f".{value}"
+    if by == By.NAME:
+        return By.CSS_SELECTOR, f'[name="{value}"]'
+    return by, value
+
+
+class FakeElement:
+    """An element of a FakePage, optionally appearing or vanishing some time after it was added."""
+
+    def __init__(self, element_id, displayed=True, enabled=True, text="", appear_after=None, vanish_after=None):
+        self.id = element_id
+        self.enabled = enabled
+        self.text = text
+        self.value = ""
+        self.clicks = 0
+        self.stale = False
+        self._displayed = displayed
+        self._added = time.monotonic()
+        self._appear_after = appear_after
+        self._vanish_after = vanish_after
+
+    @property
+    def displayed(self):
+        elapsed = time.monotonic() - self._added
+        if self._vanish_after is not None and elapsed >= self._vanish_after:
+            return False
+        if self._appear_after is not None:
+            return elapsed >= self._appear_after
+        return self._displayed
+
+
+class FakePage:
+    """Elements keyed by locator, as the remote end would find them."""
+
+    def __init__(self):
+        self._locators = {}
+        self._elements = {}
+        self._ids = itertools.count(1)
+        # (script substring, result or callable(args)) for execute_script calls
+        self.scripts = []
+
+    def add(self, by, value, count=1, **state):
+        elements = [FakeElement(f"fake-{next(self._ids)}", **state) for _ in range(count)]
+        self._locators.setdefault(w3c_locator(by, value), []).extend(elements)
+        self._elements.update((element.id, element) for element in elements)
+        return elements
+
+    def answer(self, fragment, result):
+        """Answer scripts containing `fragment` with `result`, or result(args); returns the arguments of each call."""
+        calls = []
+
+        def call(args):
+            calls.append(args)
+            return result(args) if callable(result) else result
+
+        self.scripts.append((fragment, call))
+        return calls
+
+    def remove(self, by, value):
+        # Removed elements stay known by id, so old handles raise StaleElementReferenceException
+        for element in self._locators.pop(w3c_locator(by, value), []):
+            element.stale = True
+
+    def find(self, using, value):
+        return self._locators.get((using, value), [])
+
+    def element(self, element_id):
+        return self._elements.get(element_id)
+
+
+class FakeCommandExecutor:
+    """Answers WebDriver commands from a FakePage, sleeping `latency` (+ up to `jitter`) seconds each."""
+
+    def __init__(self, page, latency=0.0, jitter=0.0):
+        self.page = page
+        self.latency = latency
+        self.jitter = jitter
+
+    def close(self):
+        pass
+
+    def execute(self, command, params):
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+        try:
+            return {"value": self._answer(command, params or {})}
+        except _CommandError as e:
+            return {"status": e.error, "value": {"error": e.error, "message": e.message, "stacktrace": ""}}
+
+    def _answer(self, command, params):
+        if command == Command.NEW_SESSION:
+            return {"sessionId": "fake-session", "capabilities": {"browserName": "fake"}}
+        if command in (Command.FIND_ELEMENT, Command.FIND_CHILD_ELEMENT):
+            elements = self.page.find(params["using"], params["value"])
+            if not elements:
+                raise _CommandError("no such element", f"Unable to locate element: {params['value']}")
+            return {ELEMENT_KEY: elements[0].id}
+        if command in (Command.FIND_ELEMENTS, Command.FIND_CHILD_ELEMENTS):
+            return [{ELEMENT_KEY: element.id} for element in self.page.find(params["using"], params["value"])]
+        if command in (Command.W3C_EXECUTE_SCRIPT, Command.W3C_EXECUTE_SCRIPT_ASYNC):
+            return self._script(params["script"], params.get("args", []))
+        if "id" in params:
+            return self._element_command(command, self._element(params["id"]), params)
+        return None
+
+    def _element(self, element_id):
+        element = self.page.element(element_id)
+        if element is None or element.stale:
+            raise _CommandError("stale element reference", f"Element {element_id} is no longer attached to the DOM")
+        return element
+
+    def _element_command(self, command, element, params):
+        if command == Command.IS_ELEMENT_ENABLED:
+            return element.enabled
+        if command == Command.GET_ELEMENT_TEXT:
+            return element.text
+        if command == Command.CLICK_ELEMENT:
+            if not element.displayed:
+                raise _CommandError("element not interactable", "Element is not visible")
+            element.clicks += 1
+        elif command == Command.CLEAR_ELEMENT:
+            element.value = ""
+        elif command == Command.SEND_KEYS_TO_ELEMENT:
+            element.value += params.get("text", "")
+        return None
+
+    def _script(self, script, args):
+        elements = [self._element(arg[ELEMENT_KEY]) for arg in args if isinstance(arg, dict) and ELEMENT_KEY in arg]
+        # WebElement.is_displayed runs the isDisplayed atom through execute_script
+        if script.startswith("/* isDisplayed */"):
+            return elements[0].displayed
+        for fragment, result in self.page.scripts:
+            if fragment in script:
+                return result(args) if callable(result) else result
+        return None
+
+
+class _CommandError(Exception):
+    def __init__(self, error, message):
+        super().__init__(message)
+        self.error = error
+        self.message = message
+
+
+class FakeWebDriver(RemoteWebDriver):
+    """In-process WebDriver for benchmarks: real selenium client code, a FakePage instead of a browser.
+
+    Only the commands the helpers use are modelled; everything else answers None.
+    """
+
+    def __init__(self, page=None, latency=0.0, jitter=0.0):
+        self.page = page if page is not None else FakePage()
+        super().__init__(command_executor=FakeCommandExecutor(self.page, latency, jitter),
+                         options=webdriver.ChromeOptions())
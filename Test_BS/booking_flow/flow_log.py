@@ -0,0 +1,136 @@
+"""JSON-lines logging for the booking flow, written off the test thread.
+
+Each process logs to its own `<worker>.jsonl`. Records are queued as they are
+made, and are formatted and written by a listener thread. Messages use %-style
+arguments, so a record below the configured level costs one level check. Merge
+the files of all xdist workers afterwards:
+
+    python -m booking_flow.flow_log .logs/*.jsonl > run.jsonl
+"""
+import argparse
+import heapq
+import json
+import logging
+import os
+import queue
+import sys
+import time
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
+
+# The package logger: every module logs to a child of it through logging.getLogger(__name__)
+PACKAGE = __name__.rpartition(".")[0] or __name__
+# Records kept in memory by the listener before a write, unless one is a warning or worse
+BUFFER_RECORDS = 256
+CONSOLE_FORMAT = "%(asctime)s %(levelname)-7s [%(step)s] %(message)s"
+
+
+def worker_name():
+    return os.environ.get("PYTEST_XDIST_WORKER", "main")
+
+
+class StepLogger(logging.LoggerAdapter):
+    """Adds the recorder's current step to each record of a helper."""
+
+    def __init__(self, logger, recorder):
+        super().__init__(logger, {})
+        self.recorder = recorder
+
+    def process(self, msg, kwargs):
+        # Only called for records that pass the level check
+        kwargs.setdefault("extra", {})["step"] = self.recorder.current_step or ""
+        return msg, kwargs
+
+
+class _Context(logging.Filter):
+    # Runs in the thread that logs, so `mono` is comparable with the perf report's timings
+    def filter(self, record):
+        record.mono = time.monotonic()
+        record.worker = worker_name()
+        if not hasattr(record, "step"):
+            record.step = ""
+        return True
+
+
+class _LazyQueueHandler(QueueHandler):
+    # The record goes to an in-process queue, so it is formatted by the listener instead of here
+    def prepare(self, record):
+        return record
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record):
+        line = {"ts": record.created, "mono": record.mono, "worker": record.worker, "pid": record.process,
+                "logger": record.name, "level": record.levelname, "step": record.step,
+                "msg": record.getMessage()}
+        if record.exc_info:
+            line["exc"] = self.formatException(record.exc_info)
+        return json.dumps(line)
+
+
+class FlowLog:
+    """The queue, listener and handlers set up by configure(); stop() flushes them."""
+
+    def __init__(self, listener, handlers, queue_handler):
+        self.listener = listener
+        self.handlers = handlers
+        self.queue_handler = queue_handler
+
+    def stop(self):
+        self.listener.stop()
+        logger = logging.getLogger(PACKAGE)
+        logger.removeHandler(self.queue_handler)
+        # Records go back to the root logger once no flow log is left
+        if not any(isinstance(handler, _LazyQueueHandler) for handler in logger.handlers):
+            logger.propagate = True
+        for handler in self.handlers:
+            handler.close()
+
+
+def configure(log_dir=None, level="INFO", console=False):
+    """Send the package's records to `log_dir/<worker>.jsonl` and, if `console`, to stderr."""
+    handlers = []
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+        file_handler = logging.FileHandler(os.path.join(log_dir, f"{worker_name()}.jsonl"), mode="a")
+        file_handler.setFormatter(JsonLinesFormatter())
+        handlers += [MemoryHandler(BUFFER_RECORDS, flushLevel=logging.WARNING, target=file_handler), file_handler]
+    if console:
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        handlers.append(console_handler)
+    # The file handler is only reached through its buffer
+    listener = QueueListener(queue.SimpleQueue(), *[h for h in handlers if not isinstance(h, logging.FileHandler)])
+    queue_handler = _LazyQueueHandler(listener.queue)
+    queue_handler.addFilter(_Context())
+
+    logger = logging.getLogger(PACKAGE)
+    logger.setLevel(level)
+    logger.addHandler(queue_handler)
+    # Kept out of the root logger, so pytest's own capture does not format every record
+    logger.propagate = False
+    listener.start()
+    return FlowLog(listener, handlers, queue_handler)
+
+
+def merge(paths, out=None):
+    """Interleave per-worker JSON-lines files by wall-clock time."""
+    out = out or sys.stdout
+    files = [open(path) for path in paths]
+    try:
+        streams = [(line for line in log_file if line.strip()) for log_file in files]
+        for line in heapq.merge(*streams, key=lambda line: json.loads(line)["ts"]):
+            out.write(line if line.endswith("\n") else line + "\n")
+    finally:
+        for log_file in files:
+            log_file.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge the JSON-lines logs of several workers by time")
+    parser.add_argument("paths", nargs="+")
+    args = parser.parse_args()
+    merge(args.paths)
+
+
+if __name__ == "__main__":
+    main()
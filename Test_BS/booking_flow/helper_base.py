@@ -0,0 +1,471 @@
+import logging
+import time
+
+from selenium.common import TimeoutException, WebDriverException, NoSuchElementException, StaleElementReferenceException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from . import locators
+from .dom_waits import NO_ANGULAR, ObserverWaits
+from .driver_pool import create_chrome_driver
+from .checkpoints import CHECKPOINTS, capture_state, prime_state
+from .command_trace import CommandTrace
+from .counters import set_counter
+from .dropdowns import select_option
+from .flow_log import StepLogger
+from .locators import SELECTOR_MAPPING, ElementCache, lookup
+from .network_filter import network_stats
+from .passenger_form import fill_passenger
+from .retry_policy import RetryPolicy
+from .strict import CircuitBreaker, HelperActionError
+from .timing import PerfRecorder, timed
+
+# What each wait condition asks of an element already found, so a cached handle meets the same condition
+CACHED_ELEMENT_CHECKS = {
+    EC.visibility_of_element_located: lambda element: element.is_displayed(),
+    EC.element_to_be_clickable: lambda element: element.is_displayed() and element.is_enabled(),
+}
+
+
+class SeleniumHelperBase:
+    """WebDriver helpers shared by the SeleniumHelper of test_BF.py and test_SK.py.
+
+    Subclasses provide click_element, type_text, get_options and
+    wait_for_loader_invisibility, where the two flows differ, and LOADER_WAITS,
+    the loader budgets `book` passes for long and short loads.
+    """
+
+    LOADER_WAITS = {}
+
+    def __init__(self, driver=None, headless=False):
+        # Driver configuration, unless a warm driver is handed in from the pool
+        self.driver = driver if driver is not None else create_chrome_driver(headless)
+        # Fill each passenger block with one script call instead of per-field commands
+        self.batch_form_fill = False
+        # "polling" uses WebDriverWait, "observer" waits on an in-page MutationObserver
+        self.wait_engine = "polling"
+        self.observer_waits = ObserverWaits(self.driver)
+        # Handles of stable elements, dropped on navigation
+        self.element_cache = ElementCache()
+        # Step and helper call timings for the performance report
+        self.recorder = PerfRecorder()
+        # Records tagged with the current step; see flow_log for where they go
+        self.log = StepLogger(logging.getLogger(type(self).__module__), self.recorder)
+        # WebDriver commands per step and helper call, checked against the test's budgets
+        self.command_trace = CommandTrace(self.driver, self.recorder)
+        # Bounded retries of stale or covered elements, counted on the recorder
+        self.retry_policy = RetryPolicy()
+        # Raise HelperActionError from failed actions instead of printing and carrying on
+        self.strict = False
+        # Stops the flow at the next step once an action of a critical step failed
+        self.breaker = CircuitBreaker(enabled=False)
+        # CheckpointStore for saving browser states after named steps, and the checkpoint to start from
+        self.checkpoints = None
+        self.resume_from = None
+        # Learned loader budgets; None keeps the fixed budgets passed by the test
+        self.loader_stats = None
+        # With the eager or none page-load strategy, load_url waits for its readiness condition instead
+        self.page_load_strategy = self.driver.capabilities.get("pageLoadStrategy", "normal")
+        self.ready_timeout = 30
+        # ArtifactStore for failure diagnostics, the test they are filed under, and whether every step is captured
+        self.artifacts = None
+        self.test_name = "booking_flow"
+        self._sampled = False
+        self._captured_step = None
+        # Wait for Angular to be stable after clicks and before loader checks
+        self.angular_waits = False
+        self._angular_missing = False
+
+        # Load a given URL
+
+    @timed
+    def load_url(self, url, ready=locators.ORIGIN_FIELD):
+        self.element_cache.invalidate()
+        self._angular_missing = False
+        self.driver.get(url)
+        if self.page_load_strategy != "normal":
+            # driver.get returned before the load event, so wait until the page can be used instead
+            self._wait_until_ready(ready)
+        self.log.debug("URL loaded: %s", url)
+        self._page_loaded()
+
+        # Called once a page is loaded, before the flow touches it
+
+    def _page_loaded(self):
+        pass
+
+        # Wait for a page's readiness condition: a locator to become clickable, or a callable(driver) to be truthy
+
+    def _wait_until_ready(self, ready):
+        try:
+            if callable(ready):
+                started = time.monotonic()
+                try:
+                    WebDriverWait(self.driver, self.ready_timeout).until(ready)
+                finally:
+                    self.recorder.add_wait(time.monotonic() - started)
+            else:
+                self._locate(*ready, EC.element_to_be_clickable, self.ready_timeout)
+        except TimeoutException as e:
+            self.log.warning("Page not ready after %ss: %s", self.ready_timeout, getattr(ready, 'value', ready))
+            self._action_failed("load_url", getattr(ready, "value", ready), e)
+
+        # Close the browser driver
+
+    def close(self):
+        self.driver.quit()
+        self.log.debug("Driver closed.")
+
+        # Find an element through the locator registry, reusing the cached handle of stable elements
+        # while it still meets the caller's condition; otherwise it is dropped and looked up again
+
+    def _locate(self, by_selector, selector_element, expected_condition, timeout):
+        locator = lookup(by_selector, selector_element)
+        element = self.element_cache.get(locator)
+        if element is not None:
+            check = CACHED_ELEMENT_CHECKS.get(expected_condition)
+            try:
+                if check is not None and check(element):
+                    return element
+            except StaleElementReferenceException:
+                pass
+            self.element_cache.invalidate(locator)
+        started = time.monotonic()
+        try:
+            element = WebDriverWait(self.driver, timeout).until(expected_condition(locator.strategy))
+        finally:
+            self.recorder.add_wait(time.monotonic() - started)
+        self.element_cache.put(locator, element)
+        return element
+
+        # Run an action on an element under the retry policy, looking the element up again on each attempt
+
+    def _with_retries(self, by_selector, selector_element, action):
+        locator = lookup(by_selector, selector_element)
+
+        def on_retry(kind, attempt, error):
+            self.element_cache.invalidate(locator)
+            self.recorder.add_retry()
+            self.log.info("%s element on attempt %s, retrying: %s", kind.capitalize(), attempt, selector_element)
+
+        return self.retry_policy.run(action, on_retry)
+
+        # Report a failed action: raise it in strict mode, otherwise remember it for the circuit breaker
+
+    def _action_failed(self, method, selector_element, error):
+        failure = HelperActionError(method, selector_element, self.recorder.current_step, error)
+        self.recorder.fail(error)
+        self.capture_artifacts("action failed", method, selector_element, error)
+        self.breaker.record(failure)
+        if self.strict:
+            raise failure from error
+
+        # Scroll to make an element visible
+
+    @timed
+    def scroll_element(self, by_selector, selector_element):
+        try:
+            element = self._with_retries(by_selector, selector_element, lambda: self._scroll(by_selector, selector_element))
+            self.log.debug("Element visible after scroll: %s", selector_element)
+            return element
+        except Exception as e:
+            self.log.error("Error during scrolling: %s", e)
+            self._action_failed("scroll_element", selector_element, e)
+
+    def _scroll(self, by_selector, selector_element):
+        element = self._locate(by_selector, selector_element, EC.visibility_of_element_located, 5)
+        self.driver.execute_script("arguments[0].scrollIntoView(false);", element)
+        return element
+
+        # Wait until the first matching element is visible or invisible, raising TimeoutException otherwise
+
+    def _wait_until(self, by, selector_element, condition, wait_time):
+        started = time.monotonic()
+        try:
+            if self.wait_engine == "observer":
+                satisfied = self.observer_waits.wait(by, selector_element, condition, wait_time)
+                if satisfied is not None:
+                    if not satisfied:
+                        raise TimeoutException(f"Element not {condition} after {wait_time}s: {selector_element}")
+                    return
+            expected_condition = (EC.visibility_of_element_located if condition == "visible"
+                                  else EC.invisibility_of_element_located)
+            WebDriverWait(self.driver, max(started + wait_time - time.monotonic(), 0)).until(
+                expected_condition((by, selector_element))
+            )
+        finally:
+            self.recorder.add_wait(time.monotonic() - started)
+
+        # Wait until Angular has no pending macrotasks or HTTP requests, in one async script call
+
+    @timed
+    def wait_for_angular(self, timeout=10):
+        if self._angular_missing:
+            return None
+        started = time.monotonic()
+        try:
+            stable = self.observer_waits.angular_stable(timeout)
+        finally:
+            self.recorder.add_wait(time.monotonic() - started)
+        if stable == NO_ANGULAR:
+            # Not asked again until the next page load
+            self._angular_missing = True
+            self.log.warning("No Angular testability on the page, not waiting for stability")
+            return None
+        if stable is False:
+            self.log.warning("Angular still busy after %ss", timeout)
+        return stable
+
+        # Wait for an element to become visible
+
+    @timed
+    def wait_for_visibility_of_element_located(self, by_selector, selector_element, wait_time=40):
+        try:
+            # Get the appropriate selector type
+            if by_selector not in SELECTOR_MAPPING:
+                self.log.error("Invalid selector type: %s", by_selector)
+                return False
+
+            # Wait for visibility of the element using the mapped selector
+            self._wait_until(SELECTOR_MAPPING[by_selector], selector_element, "visible", wait_time)
+            self.log.debug("Element visible: %s", selector_element)
+            return True
+        except TimeoutException:
+            self.log.info("Timeout waiting for element to be visible: %s", selector_element)
+            return False
+        except Exception as e:
+            self.log.error("Error occurred while waiting for visibility of %s: %s", selector_element, e)
+            return False
+
+        # Wait for an element to become invisible
+
+    @timed
+    def wait_for_invisibility_of_element_located(self, by_selector, selector_element, wait_time=40):
+        try:
+            # Get the appropriate selector type
+            if by_selector not in SELECTOR_MAPPING:
+                self.log.error("Invalid selector type: %s", by_selector)
+                return False
+
+            # Wait for invisibility of the element using the mapped selector
+            self._wait_until(SELECTOR_MAPPING[by_selector], selector_element, "invisible", wait_time)
+            self.log.debug("Element invisible: %s", selector_element)
+            return True
+        except TimeoutException:
+            self.log.info("Timeout waiting for element to be invisible: %s", selector_element)
+            return False
+        except Exception as e:
+            self.log.error("Error occurred while waiting for invisibility of %s: %s", selector_element, e)
+            return False
+
+
+    @timed
+    def wait_for_visibility_of_element_located_instant(self, by_selector, selector_element):
+        try:
+            # Find element immediately and verify its visibility
+            if by_selector in SELECTOR_MAPPING:
+                displayed = self._with_retries(by_selector, selector_element, lambda: self.driver.find_element(
+                    SELECTOR_MAPPING[by_selector], selector_element).is_displayed())
+            else:
+                self.log.error("Invalid selector type: %s", by_selector)
+                return False
+
+            if displayed:
+                self.log.debug("Element visible: %s", selector_element)
+                return True
+            else:
+                self.log.debug("Element found but not visible: %s", selector_element)
+                return False
+
+        except NoSuchElementException:
+            self.log.debug("Element not found: %s", selector_element)
+            return False
+        except StaleElementReferenceException:
+            self.log.warning("Element is stale and no longer attached to the DOM: %s", selector_element)
+            return False
+        except Exception as e:
+            self.log.error("Error occurred while checking element visibility: %s", e)
+            return False
+
+    # Open a dropdown and pick an option (the exact `value`, else the one at fraction `pick`, else a random one)
+    # in one script call, falling back to the click / get_options / click sequence if the script cannot select
+
+    @timed(xpath_argument=True)
+    def select_from_dropdown(self, trigger_locator, options_locator=locators.DROPDOWN_OPTIONS.value, value=None,
+                             pick=None):
+        try:
+            selected_value = select_option(self.driver, trigger_locator, options_locator, value, pick)
+        except WebDriverException as e:
+            self.log.warning("Dropdown script failed: %s", e.msg)
+            selected_value = None
+        if selected_value is not None:
+            self.log.debug("Selected option: %s", selected_value)
+            return selected_value
+
+        self.click_element('xpath', trigger_locator)
+        selected_value = value or self.get_options('xpath', options_locator, pick)
+        if selected_value:
+            self.click_element('xpath', f"//li[starts-with(@class,'ui-dropdown_item') and normalize-space(.)='{selected_value}']")
+        return selected_value
+
+    @timed
+    def set_passenger_count(self, row, count):
+        counter = locators.passenger_counter(row).value
+        try:
+            result = set_counter(self.driver, counter, count)
+        except WebDriverException as e:
+            result = {"error": e.msg, "clicks": 0}
+        if "error" not in result:
+            self.log.debug("Passenger row %s set from %s to %s with %s clicks", row, result["before"], count,
+                           result["clicks"])
+            return result["after"]
+        self.log.warning("Could not set passenger row %s to %s: %s", row, count, result["error"])
+        if result["clicks"]:
+            # The count changed before the script gave up, so clicking from the default would miss the target
+            self._action_failed("set_passenger_count", counter, WebDriverException(result["error"]))
+            return None
+        # Click plus from the default instead: one adult, no one else
+        for _ in range(count - (1 if row == 1 else 0)):
+            self.click_element(*locators.passenger_counter_plus(row))
+        return None
+
+    @timed
+    def select_gender(self, value=None, pick=None):
+        self.select_from_dropdown(locators.GENDER_DROPDOWN.value, value=value, pick=pick)
+
+
+    def type_first_name(self, text):
+        self.type_text(*locators.FIRST_NAME_INPUT, text)
+
+    def type_last_name(self, text):
+        self.type_text(*locators.LAST_NAME_INPUT, text)
+
+    def type_first_name_av_credits(self, text):
+        self.type_text(*locators.FIRST_NAME_AV_CREDITS, text)
+
+    def type_last_name_av_credits(self, text):
+        self.wait_for_invisibility_of_element_located(*locators.FIRST_NAME_INPUT)
+        self.type_text(*locators.LAST_NAME_AV_CREDITS, text)
+
+    @timed
+    def select_day(self, value=None, pick=None):
+        self.select_from_dropdown(locators.BIRTH_DAY_DROPDOWN.value, value=value, pick=pick)
+   
+
+    @timed
+    def select_month(self, value=None, pick=None):
+        self.select_from_dropdown(locators.BIRTH_MONTH_DROPDOWN.value, value=value, pick=pick)
+
+
+    @timed
+    def select_year(self, value=None, pick=None):
+        self.select_from_dropdown(locators.BIRTH_YEAR_DROPDOWN.value, value=value, pick=pick)
+    
+
+    @timed
+    def select_exp_day(self, value=None, pick=None):
+        self.select_from_dropdown(locators.EXP_DAY_DROPDOWN.value, value=value, pick=pick)
+
+    def look_for_exp_day(self):
+        return self.wait_for_visibility_of_element_located_instant(*locators.EXP_DAY_DROPDOWN)
+
+    @timed
+    def select_exp_month(self, value=None, pick=None):
+        self.select_from_dropdown(locators.EXP_MONTH_DROPDOWN.value, value=value, pick=pick)
+
+    @timed
+    def select_exp_year(self, value=None, pick=None):
+        self.select_from_dropdown(locators.EXP_YEAR_DROPDOWN.value, value=value, pick=pick)
+
+    @timed
+    def select_document_type(self, value=None, pick=None):
+        self.select_from_dropdown(locators.DOCUMENT_TYPE_DROPDOWN.value, value=value, pick=pick)
+
+    def look_for_document_type(self):
+        return self.wait_for_visibility_of_element_located_instant(*locators.DOCUMENT_TYPE_DROPDOWN)
+
+    def type_document_number(self, text):
+        self.type_text(*locators.DOCUMENT_NUMBER_INPUT, text)
+
+    @timed
+    def select_nationality(self, value=None, pick=None):
+        self.select_from_dropdown(locators.NATIONALITY_DROPDOWN.value,
+                                  locators.NATIONALITY_OPTIONS.value, value=value, pick=pick)
+
+    def select_booking_titular(self):
+        self.click_element(*locators.BOOKING_TITULAR)
+
+    def type_phone_number(self, phone_prefix, phone_number):
+        self.click_element(*locators.PHONE_PREFIX_DROPDOWN)
+        self.type_text(*locators.PHONE_NUMBER_INPUT, phone_number)
+
+    def type_email_address(self, email):
+        self.type_text(*locators.EMAIL_INPUT, email)
+
+    def type_email_address_confirmation(self, email_confirmation):
+        self.type_text(*locators.EMAIL_CONFIRMATION_INPUT, email_confirmation)
+    
+    @timed
+    def fill_passenger(self, passenger, native_fields=()):
+        return fill_passenger(self, passenger, native_fields)
+
+        # Save the browser state under a checkpoint name once its page is usable, when checkpoints are on
+
+    def save_checkpoint(self, key, name):
+        if self.checkpoints is None:
+            return
+        if not self.wait_for_visibility_of_element_located(*CHECKPOINTS[name], 10):
+            self.log.warning("Not saving checkpoint %s, its page is not showing", name)
+            return
+        path = self.checkpoints.save(key, name, capture_state(self.driver))
+        self.log.info("Checkpoint saved: %s", path)
+
+        # Restore the resume_from checkpoint of a booking case, returning its name, or None to start from the beginning
+
+    def resume(self, key):
+        if self.checkpoints is None or self.resume_from is None:
+            return None
+        self.step(f"Resume from the {self.resume_from} checkpoint")
+        state = self.checkpoints.load(key, self.resume_from)
+        if state is None:
+            self.log.warning("No usable %s checkpoint for %s, starting from the beginning", self.resume_from, key)
+            return None
+        prime_state(self.driver, state)
+        self.load_url(state["url"], ready=CHECKPOINTS[self.resume_from])
+        if not self.wait_for_visibility_of_element_located(*CHECKPOINTS[self.resume_from], 30):
+            self.log.warning("The %s checkpoint did not restore its page, starting from the beginning", self.resume_from)
+            return None
+        return self.resume_from
+
+    def step(self, name, critical=False):
+        if self._sampled:
+            self.capture_artifacts("sample", sample=True)
+        self.breaker.enter(critical)
+        self.recorder.step(name)
+        self.command_trace.check()
+
+        # Screenshot, page source and console log of the current step, written by the artifact store's thread
+
+    def capture_artifacts(self, reason, method=None, locator=None, error=None, sample=False):
+        if self.artifacts is None or self.recorder.current_step is None:
+            return None
+        with self.command_trace.paused():
+            path = self.artifacts.capture(self.driver, self.test_name, reason, self.recorder.current_step,
+                                          method, locator, error, sample)
+        if path is not None:
+            self._captured_step = self.recorder.current_step
+            self.log.warning("Artifacts (%s) of step %s: %s", reason, self.recorder.current_step, path)
+        return path
+
+        # Print the requests this test loaded and blocked, learning the sizes of loaded resources
+
+    def report_network(self, resource_sizes):
+        stats = network_stats(self.driver)
+        resource_sizes.record(stats["sizes"])
+        saved = resource_sizes.saved_bytes(stats["blocked_urls"])
+        self.log.info("Network: %s requests, %.0f KB loaded; %s blocked, about %.0f KB saved",
+                      stats["requests"], stats["bytes"] / 1024, stats["blocked"], saved / 1024)
+        return stats
+
+    def prevent_inactivity(self):
+        self.driver.execute_script("document.body.dispatchEvent(new MouseEvent('mousemove'));")
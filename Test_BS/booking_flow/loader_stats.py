@@ -0,0 +1,103 @@
+import json
+import os
+
+from .driver_resolver import file_lock
+
+# Observations needed before a learned timeout replaces the fixed budget
+MIN_SAMPLES = 5
+# Timeout = p99 * factor + margin, never below the floor or above the fixed budget
+MARGIN_FACTOR = 1.5
+MARGIN_SECONDS = 2.0
+FLOOR_SECONDS = 2.0
+# Observations kept per step and phase, newest last
+HISTORY_LENGTH = 200
+
+# Arms a MutationObserver on the first call for a loader locator and reports how
+# many times it has been seen appearing since, and whether it is visible right now.
+# Checks are throttled to one per animation frame.
+LOADER_WATCH_SCRIPT = """
+var xpath = arguments[0];
+var watches = window.__loaderWatches = window.__loaderWatches || {};
+var watch = watches[xpath];
+var armed = !!watch;
+if (!watch) {
+    watch = watches[xpath] = {seen: 0, visible: false, scheduled: false};
+    var isVisible = function () {
+        var el = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        return !!(el && (el.offsetWidth || el.offsetHeight || el.getClientRects().length)
+            && window.getComputedStyle(el).visibility !== 'hidden');
+    };
+    var check = function () {
+        watch.scheduled = false;
+        var visible = isVisible();
+        if (visible && !watch.visible) { watch.seen++; }
+        watch.visible = visible;
+    };
+    check();
+    new MutationObserver(function () {
+        if (!watch.scheduled) {
+            watch.scheduled = true;
+            requestAnimationFrame(check);
+        }
+    }).observe(document.documentElement, {subtree: true, childList: true, attributes: true});
+}
+return {armed: armed, seen: watch.seen, visible: watch.visible};
+"""
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+class LoaderStats:
+    """Observed loader durations per step, used to derive wait budgets."""
+
+    def __init__(self, path):
+        self.path = path
+        self.samples = self._read()
+        self._new = {}
+
+    def _read(self):
+        try:
+            with open(self.path) as history:
+                return json.load(history)
+        except (OSError, ValueError):
+            return {}
+
+    def timeout(self, step, phase, budget):
+        # Learned budget for a step's "appear" or "vanish" phase, capped by the fixed one
+        samples = self.samples.get(step, {}).get(phase, [])
+        if len(samples) < MIN_SAMPLES:
+            return budget
+        learned = percentile(samples, 0.99) * MARGIN_FACTOR + MARGIN_SECONDS
+        return min(max(learned, FLOOR_SECONDS), budget)
+
+    def record(self, step, phase, seconds):
+        for store in (self.samples, self._new):
+            store.setdefault(step, {}).setdefault(phase, []).append(round(seconds, 3))
+
+    def save(self):
+        # Merge this worker's observations into the file other workers may be writing too
+        if not self._new:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with file_lock(f"{self.path}.lock"):
+            merged = self._read()
+            for step, phases in self._new.items():
+                for phase, samples in phases.items():
+                    history = merged.setdefault(step, {}).setdefault(phase, [])
+                    history.extend(samples)
+                    del history[:-HISTORY_LENGTH]
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as history:
+                json.dump(merged, history, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        self._new = {}
+
+
+def loader_state(driver, selector_element):
+    """Arm the in-page loader watch if needed and return {armed, seen, visible}."""
+    return driver.execute_script(LOADER_WATCH_SCRIPT, selector_element)
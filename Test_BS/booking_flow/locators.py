@@ -0,0 +1,122 @@
+from operator import itemgetter
+
+from selenium.webdriver.common.by import By
+
+# Selector names accepted by SeleniumHelper, mapped to Selenium strategies once
+SELECTOR_MAPPING = {
+    "xpath": By.XPATH,
+    "xpath-scroll": By.XPATH,
+    "id": By.ID,
+    "css": By.CSS_SELECTOR,
+    "class_name": By.CLASS_NAME,
+}
+
+# Every declared locator, keyed by (by_selector, value)
+REGISTRY = {}
+
+
+class Locator(tuple):
+    """A page element declared once. Unpacks to the helper's (by_selector, selector_element) arguments."""
+
+    by_selector = property(itemgetter(0))
+    value = property(itemgetter(1))
+
+    def __new__(cls, by_selector, value, stable=False):
+        locator = super().__new__(cls, (by_selector, value))
+        locator.by = SELECTOR_MAPPING[by_selector]
+        # Stable elements survive until navigation, so their handles can be cached
+        locator.stable = stable
+        return locator
+
+    @property
+    def strategy(self):
+        return self.by, self.value
+
+
+def register(by_selector, value, stable=False):
+    locator = Locator(by_selector, value, stable)
+    REGISTRY[locator] = locator
+    return locator
+
+
+def lookup(by_selector, selector_element):
+    # Registered locator for raw helper arguments, or an uncached ad-hoc one
+    return REGISTRY.get((by_selector, selector_element)) or Locator(by_selector, selector_element)
+
+
+class ElementCache:
+    """Element handles for stable locators, dropped on navigation or when they go stale."""
+
+    def __init__(self):
+        self._elements = {}
+
+    def get(self, locator):
+        return self._elements.get(locator) if locator.stable else None
+
+    def put(self, locator, element):
+        if locator.stable:
+            self._elements[locator] = element
+
+    def invalidate(self, locator=None):
+        if locator is None:
+            self._elements.clear()
+        else:
+            self._elements.pop(locator, None)
+
+
+# Search form
+ORIGIN_FIELD = register("xpath", "//div[@id='originDiv']/input | //div[@id='originDiv']/button", stable=True)
+ORIGIN_INPUT = register("css", "#originDiv input", stable=True)
+DESTINATION_INPUT = register("xpath", "//div[@id='arrivalStationInputLabel']/following-sibling::input", stable=True)
+PASSENGER_SELECTOR = register("css", "div[class='control_field_button_value']", stable=True)
+PASSENGER_CONFIRM = register("css", "[class='button control_options_selector_action_button']")
+SEARCH_BUTTON = register("css", "#searchButton:not([style*='display:none;'])", stable=True)
+
+
+def station_button(code):
+    return register("id", code)
+
+
+def passenger_counter(row):
+    # Rows of the passenger control: 1 adults, 2 youths, 3 children, 4 infants
+    return register("xpath", f"//ul[contains(@attr.aria-labelledby,'ibeSearchPaxControlLabel')]/li[{row}]/div[2]/ibe-minus-plus")
+
+
+def passenger_counter_plus(row):
+    return register("xpath", f"{passenger_counter(row).value}/div/button[2]")
+
+
+# Flight selection
+LOADER = register("xpath", "//div[contains(@class,'loading')]")
+NO_FLIGHTS = register("css", "div[class*='journey-no-data']")
+WEEK_CALENDAR = register("css", "[class='day-selector_container']")
+FILTERS_BUTTON = register("css", "div[class='filters-control_button']")
+JOURNEY_OPTION = register("xpath", "//div[2]/div[starts-with(@class,'journey-select_list ng-star-inserted')]/div/journey-control-custom/div/div/div/div[2]")
+FARE_OPTION = register("xpath", "//div[contains(@class,'fare-control')][contains(.,'light') or contains(.,'basic') or contains(.,'classic') or contains(.,'flex') or contains(.,'business')]")
+CONTINUE_BUTTON = register("css", "button[class*='page_button-primary-flow']")
+
+# Passenger form, each one matches the next field still without a value
+GENDER_DROPDOWN = register("xpath", "//button[contains(@id,'IdPaxGender') and not(contains(@class,'has-value'))]")
+FIRST_NAME_INPUT = register("xpath", "//*[contains(@id,'IdFirstName') and not(contains(@class,'has-value'))]")
+LAST_NAME_INPUT = register("xpath", "//*[contains(@id,'IdLastName') and not(contains(@class,'has-value'))]")
+FIRST_NAME_AV_CREDITS = register("xpath", "(//*[contains(@id,'IdFirstName')])[1]")
+LAST_NAME_AV_CREDITS = register("xpath", "(//*[contains(@id,'IdLastName')])[1]")
+BIRTH_DAY_DROPDOWN = register("xpath", "//*[starts-with(@id,'dateDayId_')][not(contains(@class,'has-value'))]")
+BIRTH_MONTH_DROPDOWN = register("xpath", "//*[starts-with(@id,'dateMonthId_')][not(contains(@class,'has-value'))]")
+BIRTH_YEAR_DROPDOWN = register("xpath", "//*[starts-with(@id,'dateYearId_')][not(contains(@class,'has-value'))]")
+DOCUMENT_TYPE_DROPDOWN = register("xpath", "//button[starts-with(@id,'IdDocType') and not(contains(@class,'has-value'))]")
+DOCUMENT_NUMBER_INPUT = register("xpath", "//*[starts-with(@id,'IdDocNum') and not(contains(@class,'has-value'))]")
+EXP_DAY_DROPDOWN = register("xpath", "//button[starts-with(@id,'dateDayId_IdDocExpDate') and not(contains(@class,'has-value'))]")
+EXP_MONTH_DROPDOWN = register("xpath", "//button[starts-with(@id,'dateMonthId_IdDocExpDate') and not(contains(@class,'has-value'))]")
+EXP_YEAR_DROPDOWN = register("xpath", "//button[starts-with(@id,'dateYearId_IdDocExpDate') and not(contains(@class,'has-value'))]")
+NATIONALITY_DROPDOWN = register("xpath", "//button[starts-with(@id,'IdDocNationality') and not(contains(@class,'has-value'))]")
+DROPDOWN_OPTIONS = register("xpath", "//li/button[@class='ui-dropdown_item_option']")
+NATIONALITY_OPTIONS = register("xpath", "//button[starts-with(@class,'ui-dropdown_item') and not(contains(@style,'none'))]")
+BOOKING_TITULAR = register("css", "div[class='account-passenger']")
+MODAL_CONFIRM = register("css", "button[class='button modal_footer_button-action']")
+
+# Contact details
+PHONE_PREFIX_DROPDOWN = register("xpath", "//*[@id='phone_prefixPhoneId']")
+PHONE_NUMBER_INPUT = register("id", "phone_phoneNumberId")
+EMAIL_INPUT = register("css", "#email:not([class*='has-value'])")
+EMAIL_CONFIRMATION_INPUT = register("id", "confirmEmail")
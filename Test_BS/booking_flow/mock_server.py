@@ -0,0 +1,85 @@
+import argparse
+import os
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlencode
+
+SITE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_site")
+
+
+class MockSiteHandler(SimpleHTTPRequestHandler):
+    # Single page app: every path without a file extension serves index.html
+    response_delay = 0.0
+
+    def do_GET(self):
+        if self.response_delay:
+            time.sleep(self.response_delay)
+        path = self.path.split("?", 1)[0]
+        if not os.path.splitext(path)[1]:
+            self.path = "/index.html"
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockBookingSite:
+    """Serves mock_site/ on localhost from a background thread.
+
+    `loader_ms` and `jitter_ms` set how long the site's loading overlays stay up,
+    `response_delay` adds server latency (seconds) to every request.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, loader_ms=500, jitter_ms=0, response_delay=0.0):
+        self.loader_ms = loader_ms
+        self.jitter_ms = jitter_ms
+        handler = type("Handler", (MockSiteHandler,), {"response_delay": response_delay})
+        self.server = ThreadingHTTPServer((host, port), partial(handler, directory=SITE_DIRECTORY))
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        query = urlencode({"loader_ms": self.loader_ms, "jitter_ms": self.jitter_ms})
+        return f"http://{host}:{port}/en?{query}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the mock booking site locally")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--loader-ms", type=int, default=500)
+    parser.add_argument("--jitter-ms", type=int, default=0)
+    parser.add_argument("--response-delay", type=float, default=0.0)
+    args = parser.parse_args()
+    site = MockBookingSite(port=args.port, loader_ms=args.loader_ms, jitter_ms=args.jitter_ms,
+                           response_delay=args.response_delay)
+    print(f"Mock booking site on {site.url}")
+    try:
+        site.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        site.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import json
+import logging
+import os
+
+from selenium.common import WebDriverException
+
+from .driver_resolver import file_lock
+
+log = logging.getLogger(__name__)
+
+# URL patterns (CDP wildcards) of resources the flow never asserts on
+TRACKERS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googleadservices.com*",
+    "*facebook.net*", "*facebook.com/tr*", "*hotjar.com*", "*clarity.ms*", "*newrelic.com*", "*nr-data.net*",
+    "*bing.com/action*", "*tiktok.com*", "*criteo.com*", "*optimizely.com*",
+]
+FONTS = ["*.woff", "*.woff2", "*.ttf", "*.otf", "*fonts.googleapis.com*", "*fonts.gstatic.com*"]
+MEDIA = ["*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.mp4", "*.webm"]
+
+PROFILES = {
+    "off": [],
+    "trackers": TRACKERS,
+    "lean": TRACKERS + FONTS + MEDIA,
+}
+
+
+def block_patterns(profile, block=(), allow=()):
+    """The profile's patterns plus `block`, minus any pattern listed in `allow`."""
+    patterns = [pattern for pattern in PROFILES[profile] + list(block) if pattern not in allow]
+    return list(dict.fromkeys(patterns))
+
+
+def apply_blocking(driver, patterns):
+    # Blocked requests fail in the browser before any byte is sent; needs a Chromium driver
+    if not hasattr(driver, "execute_cdp_cmd"):
+        log.warning("Network blocking needs a Chromium driver, skipping it")
+        return False
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    return True
+
+
+def network_stats(driver):
+    """Requests and bytes since the last call, from Chrome's performance log.
+
+    Returns {requests, bytes, blocked, blocked_urls, sizes}; `sizes` maps each loaded
+    URL to its transferred bytes.
+    """
+    try:
+        entries = driver.get_log("performance")
+    except WebDriverException as e:
+        log.warning("Could not read the performance log: %s", e.msg)
+        entries = []
+    urls = {}
+    stats = {"requests": 0, "bytes": 0, "blocked": 0, "blocked_urls": [], "sizes": {}}
+    for entry in entries:
+        message = json.loads(entry["message"])["message"]
+        method, params = message.get("method"), message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            urls[params["requestId"]] = params["request"]["url"]
+            stats["requests"] += 1
+        elif method == "Network.loadingFinished":
+            size = int(params.get("encodedDataLength", 0))
+            stats["bytes"] += size
+            if params["requestId"] in urls:
+                stats["sizes"][urls[params["requestId"]]] = size
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            stats["blocked"] += 1
+            stats["blocked_urls"].append(urls.get(params["requestId"], ""))
+    return stats
+
+
+class ResourceSizes:
+    """Transferred size per URL seen in unblocked loads, to estimate what blocking saves."""
+
+    def __init__(self, path):
+        self.path = path
+        self.sizes = self._read()
+        self._new = {}
+
+    def _read(self):
+        try:
+            with open(self.path) as sizes:
+                return json.load(sizes)
+        except (OSError, ValueError):
+            return {}
+
+    def record(self, sizes):
+        self.sizes.update(sizes)
+        self._new.update(sizes)
+
+    def saved_bytes(self, blocked_urls):
+        return sum(self.sizes.get(url, 0) for url in blocked_urls)
+
+    def save(self):
+        if not self._new:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with file_lock(f"{self.path}.lock"):
+            merged = self._read()
+            merged.update(self._new)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as sizes:
+                json.dump(merged, sizes, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        self._new = {}
@@ -0,0 +1,165 @@
+"""Seeded passenger, document and contact data for the booking flow.
+
+The same seed and booking case always give the same records, so a failing run can
+be replayed with its data. Records can be built in bulk ahead of time:
+
+    python -m booking_flow.passenger_data --seed 7 --runs 1000 --route-matrix --out passengers.jsonl
+"""
+import argparse
+import json
+import random
+from datetime import date, timedelta
+
+from .routes import BOOKING_CASES, DEFAULT_CASE
+
+# Passenger blocks in the order the passenger page lists them
+PASSENGER_TYPES = ("adult", "youth", "child", "infant")
+# Age in whole years on the travel date, inclusive
+AGE_RANGES = {
+    "adult": (18, 75),
+    "youth": (12, 14),
+    "child": (2, 11),
+    "infant": (0, 1),
+}
+# Infants younger than this cannot fly
+MIN_INFANT_DAYS = 30
+# Documents must still be valid this long after the travel date
+MIN_DOCUMENT_DAYS = 180
+# The flow searches the site's default departure date instead of choosing one, so the flight may leave any day
+# within this window after the travel date; ages and documents are made to hold on every day of it
+TRAVEL_WINDOW_DAYS = 30
+MAX_DOCUMENT_YEARS = 9
+
+# Gender and document type options are matched by their exact text, so "Male" never selects "Female"
+DOCUMENT_TYPE = "Passport"
+FIRST_NAMES = {
+    "Male": ["Santiago", "Mateo", "Sebastian", "Alejandro", "Nicolas", "Samuel", "Daniel", "Juan", "Andres",
+             "Carlos", "Diego", "Felipe", "Gabriel", "Julian", "Martin", "Tomas"],
+    "Female": ["Valentina", "Isabella", "Mariana", "Gabriela", "Sofia", "Camila", "Daniela", "Lucia", "Paula",
+               "Sara", "Laura", "Natalia", "Andrea", "Carolina", "Juliana", "Manuela"],
+}
+LAST_NAMES = ["Garcia", "Rodriguez", "Martinez", "Lopez", "Gonzalez", "Perez", "Sanchez", "Ramirez", "Torres",
+              "Flores", "Rivera", "Gomez", "Diaz", "Morales", "Castro", "Ortiz", "Rojas", "Vargas", "Herrera",
+              "Medina", "Suarez", "Jimenez", "Moreno", "Cardenas"]
+
+
+def _date_between(rng, start, end):
+    return start + timedelta(days=rng.randint(0, (end - start).days))
+
+
+def _shift_years(day, years):
+    try:
+        return day.replace(year=day.year + years)
+    except ValueError:
+        # 29 February in a year without one
+        return day.replace(year=day.year + years, day=28)
+
+
+def _date_fields(prefix, day):
+    return {f"{prefix}_year": str(day.year), f"{prefix}_day": str(day.day)}
+
+
+def _month_pick(day):
+    # Month lists run January to December in the site's language, so the month is its position in the list
+    return (day.month - 0.5) / 12
+
+
+def passenger_types(booking_case):
+    counts = (booking_case.adults, booking_case.youths, booking_case.children, booking_case.infants)
+    return [kind for kind, count in zip(PASSENGER_TYPES, counts) for _ in range(count)]
+
+
+def generate_passenger(rng, kind, travel_date):
+    """One passenger of `kind`, keyed by the field names of PASSENGER_FIELDS.
+
+    `picks` holds the position, as a fraction of the option list, of dropdowns whose
+    option texts differ between sites (nationality, months), so any site gets a valid
+    option.
+    """
+    youngest, oldest = AGE_RANGES[kind]
+    last_day = travel_date + timedelta(days=TRAVEL_WINDOW_DAYS)
+    # Not yet oldest + 1 on the window's last day, and already youngest on its first
+    earliest = _shift_years(last_day, -(oldest + 1)) + timedelta(days=1)
+    latest = _shift_years(travel_date, -youngest)
+    if kind == "infant":
+        latest = min(latest, travel_date - timedelta(days=MIN_INFANT_DAYS))
+    gender = rng.choice(sorted(FIRST_NAMES))
+    passenger = {
+        "type": kind,
+        "gender": gender,
+        "first_name": rng.choice(FIRST_NAMES[gender]),
+        "last_name": rng.choice(LAST_NAMES),
+        "document_type": DOCUMENT_TYPE,
+        "document_number": str(rng.randrange(10 ** 8, 10 ** 9)),
+        "picks": {"nationality": rng.random()},
+    }
+    birth = _date_between(rng, earliest, latest)
+    expiry = _date_between(rng, last_day + timedelta(days=MIN_DOCUMENT_DAYS),
+                           _shift_years(travel_date, MAX_DOCUMENT_YEARS))
+    passenger.update(_date_fields("birth", birth))
+    passenger.update(_date_fields("exp", expiry))
+    passenger["picks"].update(birth_month=_month_pick(birth), exp_month=_month_pick(expiry))
+    return passenger
+
+
+def generate_contact(rng, passenger):
+    return {
+        "phone_number": f"3{rng.randrange(10 ** 8, 10 ** 9)}",
+        "email": f"{passenger['first_name']}.{passenger['last_name']}{rng.randrange(100, 1000)}@example.com".lower(),
+        "picks": {"phone_prefix": rng.random()},
+    }
+
+
+def generate_booking(booking_case, seed, run=0, travel_date=None):
+    """Passengers in page order and the contact details for one run of a booking case.
+
+    `travel_date` is the first day the flight may leave, today by default since the
+    flow keeps the search's default departure date; see TRAVEL_WINDOW_DAYS.
+    """
+    travel_date = travel_date or date.today()
+    # String seeds are hashed the same way in every process, unlike hash() of tuples
+    rng = random.Random(f"{seed}:{booking_case.case_id}:{run}")
+    passengers = [generate_passenger(rng, kind, travel_date) for kind in passenger_types(booking_case)]
+    return {"case_id": booking_case.case_id, "seed": seed, "run": run, "passengers": passengers,
+            "contact": generate_contact(rng, passengers[0])}
+
+
+def generate_bookings(cases, seed, runs=1, travel_date=None):
+    for run in range(runs):
+        for booking_case in cases:
+            yield generate_booking(booking_case, seed, run, travel_date)
+
+
+def save_bookings(path, bookings):
+    with open(path, "w") as records:
+        for booking in bookings:
+            records.write(json.dumps(booking) + "\n")
+
+
+def load_bookings(path):
+    """Prebuilt bookings by case id, in file order."""
+    bookings = {}
+    with open(path) as records:
+        for line in records:
+            if line.strip():
+                booking = json.loads(line)
+                bookings.setdefault(booking["case_id"], []).append(booking)
+    return bookings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build seeded passenger data for the booking cases")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--runs", type=int, default=1, help="Bookings per case (default: 1)")
+    parser.add_argument("--route-matrix", action="store_true",
+                        help="Every route and passenger mix in routes.py instead of the single BOG-MGA case")
+    parser.add_argument("--out", default="passengers.jsonl")
+    args = parser.parse_args()
+
+    cases = BOOKING_CASES if args.route_matrix else [DEFAULT_CASE]
+    save_bookings(args.out, generate_bookings(cases, args.seed, args.runs))
+    print(f"{len(cases) * args.runs} bookings written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+from . import locators
+from .dropdowns import CHOOSE_OPTION_JS
+
+# Passenger block fields in the order the form expects them:
+# (field, kind, locator, options locator, optional, per-field helper method)
+PASSENGER_FIELDS = [
+    ("gender", "dropdown", locators.GENDER_DROPDOWN, locators.DROPDOWN_OPTIONS, False, "select_gender"),
+    ("first_name", "text", locators.FIRST_NAME_INPUT, None, False, "type_first_name"),
+    ("last_name", "text", locators.LAST_NAME_INPUT, None, False, "type_last_name"),
+    ("birth_year", "dropdown", locators.BIRTH_YEAR_DROPDOWN, locators.DROPDOWN_OPTIONS, False, "select_year"),
+    ("birth_month", "dropdown", locators.BIRTH_MONTH_DROPDOWN, locators.DROPDOWN_OPTIONS, False, "select_month"),
+    ("birth_day", "dropdown", locators.BIRTH_DAY_DROPDOWN, locators.DROPDOWN_OPTIONS, False, "select_day"),
+    ("document_type", "dropdown", locators.DOCUMENT_TYPE_DROPDOWN, locators.DROPDOWN_OPTIONS, True, "select_document_type"),
+    ("document_number", "text", locators.DOCUMENT_NUMBER_INPUT, None, True, "type_document_number"),
+    ("exp_year", "dropdown", locators.EXP_YEAR_DROPDOWN, locators.DROPDOWN_OPTIONS, True, "select_exp_year"),
+    ("exp_month", "dropdown", locators.EXP_MONTH_DROPDOWN, locators.DROPDOWN_OPTIONS, True, "select_exp_month"),
+    ("exp_day", "dropdown", locators.EXP_DAY_DROPDOWN, locators.DROPDOWN_OPTIONS, True, "select_exp_day"),
+    ("nationality", "dropdown", locators.NATIONALITY_DROPDOWN, locators.NATIONALITY_OPTIONS, False, "select_nationality"),
+]
+
+# Fills one passenger block in a single round trip. Dropdowns with no value get the
+# option at their `picks` fraction, or a random one like get_options does. Fields the script cannot set (options not
+# rendered, value rejected, or listed as native) come back as pending, with their dropdown closed again.
+FILL_PASSENGER_SCRIPT = CHOOSE_OPTION_JS + """
+var fields = arguments[0], passenger = arguments[1], nativeFields = arguments[2];
+var picks = passenger.picks || {};
+var touched = new Set();
+var result = {filled: {}, pending: [], missing: []};
+
+function visible(el) {
+    return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+}
+function snapshot(xpath) {
+    var nodes = [];
+    var found = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (var i = 0; i < found.snapshotLength; i++) { nodes.push(found.snapshotItem(i)); }
+    return nodes;
+}
+function firstUntouched(xpath) {
+    var nodes = snapshot(xpath);
+    for (var i = 0; i < nodes.length; i++) {
+        if (!touched.has(nodes[i])) { return nodes[i]; }
+    }
+    return null;
+}
+function typeText(el, value) {
+    var input = el.matches('input, textarea') ? el : el.querySelector('input, textarea');
+    if (!input) { return false; }
+    var setter = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(input), 'value').set;
+    input.focus();
+    setter.call(input, value);
+    input.dispatchEvent(new Event('input', {bubbles: true}));
+    input.dispatchEvent(new Event('change', {bubbles: true}));
+    input.dispatchEvent(new Event('blur'));
+    return input.value === value;
+}
+function selectOption(trigger, optionsXpath, value, pick) {
+    trigger.click();
+    var options = snapshot(optionsXpath).filter(visible);
+    var chosen = options.length ? chooseOption(options, value, pick) : null;
+    if (!chosen) {
+        // Closed again, so the per-field fallback opens it instead of toggling it shut
+        trigger.click();
+        return null;
+    }
+    var text = chosen.textContent.trim();
+    chosen.click();
+    return text;
+}
+
+fields.forEach(function (field) {
+    var name = field[0], kind = field[1], locator = field[2], optionsLocator = field[3], optional = field[4];
+    var el = firstUntouched(locator);
+    if (!el) {
+        (optional ? result.missing : result.pending).push(name);
+        return;
+    }
+    touched.add(el);
+    if (nativeFields.indexOf(name) !== -1) {
+        result.pending.push(name);
+        return;
+    }
+    var value = passenger[name];
+    if (kind === 'text') {
+        if (value === null || value === undefined || !typeText(el, String(value))) {
+            result.pending.push(name);
+            return;
+        }
+        result.filled[name] = String(value);
+    } else {
+        var selected = selectOption(el, optionsLocator, value, picks[name]);
+        if (selected === null) {
+            result.pending.push(name);
+            return;
+        }
+        result.filled[name] = selected;
+    }
+});
+return result;
+"""
+
+
+def fill_passenger(helper, passenger, native_fields=()):
+    """Fill the next empty passenger block in one script call.
+
+    `passenger` maps field names from PASSENGER_FIELDS to values, and `picks` to the
+    list positions of dropdowns given no value (see passenger_data); dropdowns left
+    out get a random option. Fields the script could not set, and `native_fields`, go
+    through the helper's per-field methods afterwards. Returns the script result.
+    """
+    fields = [[name, kind, locator.value, options and options.value, optional]
+              for name, kind, locator, options, optional, _ in PASSENGER_FIELDS]
+    result = helper.driver.execute_script(FILL_PASSENGER_SCRIPT, fields, passenger, list(native_fields))
+    helper.log.debug("Passenger filled in batch: %s", result["filled"])
+
+    methods = {field[0]: (field[1], field[5]) for field in PASSENGER_FIELDS}
+    for name in result["pending"]:
+        kind, method = methods[name]
+        helper.log.warning("Falling back to per-field fill: %s", name)
+        if kind == "text":
+            getattr(helper, method)(passenger.get(name, ""))
+        else:
+            getattr(helper, method)(passenger.get(name), passenger.get("picks", {}).get(name))
+    return result
@@ -0,0 +1,274 @@
+"""Run the booking flow over every browserstack.yml platform and booking case.
+
+Jobs start longest first from the duration history and a freed session slot is
+refilled with the next job right away, up to the plan's parallel-session limit.
+Run from Test_BS:
+
+    python -m booking_flow.platform_scheduler --parallel 5 --route-matrix
+    python -m booking_flow.platform_scheduler --parallel 2 --route-matrix --offline --time-scale 0.01
+"""
+import argparse
+import base64
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+from collections import namedtuple
+
+import yaml
+from selenium import webdriver
+from selenium.common import SessionNotCreatedException
+
+from . import flow_log
+from .booking import book
+from .passenger_data import generate_booking
+from .routes import BOOKING_CASES, DEFAULT_CASE, LIVE_BOOKING_URL
+from .sharding import estimate_duration, load_durations, record_duration, save_durations
+
+log = logging.getLogger(__name__)
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "browserstack.yml")
+BROWSERSTACK_HUB = "https://hub.browserstack.com/wd/hub"
+BROWSERSTACK_PLAN = "https://api.browserstack.com/automate/plan.json"
+# Times a job goes back to the queue when the hub refuses its session for lack of a slot
+MAX_REQUEUES = 3
+
+
+class Job(namedtuple("Job", "platform case")):
+    """One booking case on one platform; `platform` is a tuple of browserstack.yml items."""
+
+    __slots__ = ()
+
+    @property
+    def platform_name(self):
+        platform = dict(self.platform)
+        return " ".join(str(platform.get(key, "")) for key in ("os", "osVersion", "browserName", "browserVersion"))
+
+    @property
+    def key(self):
+        # Namespaced apart from the pytest node ids in the same duration history
+        return f"platform::{self.platform_name}::{self.case.case_id}"
+
+
+def load_config(path=CONFIG_PATH):
+    with open(path) as config:
+        return yaml.safe_load(config)
+
+
+def expand(platforms, cases):
+    return [Job(tuple(sorted(platform.items())), case) for platform in platforms for case in cases]
+
+
+def read_plan(username, access_key, url=BROWSERSTACK_PLAN):
+    request = urllib.request.Request(url)
+    token = base64.b64encode(f"{username}:{access_key}".encode()).decode()
+    request.add_header("Authorization", f"Basic {token}")
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.load(response)
+
+
+def free_slots(plan):
+    """Sessions the account can still start, shared with every other build running on it."""
+    return plan["parallel_sessions_max_allowed"] - plan["parallel_sessions_running"] - plan.get("queued_sessions", 0)
+
+
+def remote_options(platform, config, username=None, access_key=None):
+    platform = dict(platform)
+    options = webdriver.EdgeOptions() if platform.get("browserName", "").lower() == "edge" else webdriver.ChromeOptions()
+    options.browser_version = str(platform.get("browserVersion", "latest"))
+    bstack_options = {"os": platform.get("os"), "osVersion": str(platform.get("osVersion")),
+                      "buildName": config.get("buildName"), "projectName": config.get("projectName")}
+    if username:
+        bstack_options.update(userName=username, accessKey=access_key)
+    options.set_capability("bstack:options", bstack_options)
+    return options
+
+
+class PlatformScheduler:
+    """Runs jobs on at most `parallel_limit` sessions, longest first, refilling slots as they free up.
+
+    `run_job(job, session_started)` runs one job, calls `session_started()` once its
+    session exists and raises on failure. `free_slots()`, when given, is polled before
+    each start so sessions of other builds on the same plan are respected; the slots
+    of jobs still starting their session are held back from it.
+    """
+
+    def __init__(self, run_job, parallel_limit, free_slots=None, poll_interval=5.0):
+        self.run_job = run_job
+        self.parallel_limit = parallel_limit
+        self.free_slots = free_slots
+        self.poll_interval = poll_interval
+
+    def _wait_for_slot(self, reserved):
+        # `reserved()`: sessions this scheduler is starting, which the plan does not count yet
+        if self.free_slots is None:
+            return
+        while True:
+            try:
+                if self.free_slots() - reserved() > 0:
+                    return
+            except (OSError, KeyError, ValueError) as e:
+                log.warning("Could not read the plan's free slots, starting anyway: %s", e)
+                return
+            time.sleep(self.poll_interval)
+
+    def run(self, jobs, costs):
+        """Run every job, returning (job, error or None, seconds) in completion order."""
+        pending = sorted(jobs, key=lambda job: (-costs[job.key], job.key))
+        requeues = {}
+        results = []
+        lock = threading.Lock()
+        # Only one worker checks the plan and takes a job at a time, and the slot it took stays reserved
+        # until its session exists, so two never race for the last slot
+        start_lock = threading.Lock()
+        starting = 0
+
+        def reserved():
+            with lock:
+                return starting
+
+        def worker():
+            nonlocal starting
+            while True:
+                with start_lock:
+                    with lock:
+                        if not pending:
+                            return
+                    self._wait_for_slot(reserved)
+                    with lock:
+                        if not pending:
+                            return
+                        job = pending.pop(0)
+                        starting += 1
+                holding = [True]
+
+                def session_started():
+                    nonlocal starting
+                    with lock:
+                        if holding:
+                            holding.clear()
+                            starting -= 1
+
+                started = time.monotonic()
+                try:
+                    self.run_job(job, session_started)
+                    error = None
+                except SessionNotCreatedException as e:
+                    error = e
+                    # No slot after all (another build took it): back to the front of the queue
+                    with lock:
+                        requeues[job] = requeues.get(job, 0) + 1
+                        requeued = requeues[job] <= MAX_REQUEUES
+                        if requeued:
+                            pending.insert(0, job)
+                    if requeued:
+                        time.sleep(self.poll_interval)
+                        continue
+                except Exception as e:
+                    error = e
+                finally:
+                    # A job that failed before its session existed gives its slot back too
+                    session_started()
+                with lock:
+                    results.append((job, error, time.monotonic() - started))
+                log.info("[%s] %s %s: %s", threading.current_thread().name, job.platform_name, job.case.case_id,
+                         "ok" if error is None else f"FAILED: {error}")
+
+        workers = [threading.Thread(target=worker, name=f"slot-{index}") for index in range(self.parallel_limit)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return results
+
+
+def run_booking(job, hub_url, config, username=None, access_key=None, booking_url=LIVE_BOOKING_URL, data_seed=0,
+                session_started=None):
+    # The whole test_main flow on a remote session
+    from .test_SK import SeleniumHelper
+
+    driver = webdriver.Remote(command_executor=hub_url,
+                              options=remote_options(job.platform, config, username, access_key))
+    if session_started is not None:
+        session_started()
+    try:
+        helper = SeleniumHelper(driver)
+        try:
+            book(helper, job.case, booking_url, generate_booking(job.case, data_seed))
+        finally:
+            helper.command_trace.detach()
+    finally:
+        driver.quit()
+
+
+def run_simulated(job, hub_url, config, seconds, session_started=None):
+    # Holds a stand-in hub session for the job's expected duration
+    driver = webdriver.Remote(command_executor=hub_url, options=remote_options(job.platform, config))
+    if session_started is not None:
+        session_started()
+    try:
+        time.sleep(seconds)
+    finally:
+        driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Schedule the booking flow over the browserstack.yml platforms")
+    parser.add_argument("--parallel", type=int, default=None,
+                        help="Parallel sessions of the plan (default: the plan's limit from the BrowserStack API)")
+    parser.add_argument("--route-matrix", action="store_true",
+                        help="Every route and passenger mix in routes.py instead of the single BOG-MGA case")
+    parser.add_argument("--durations-file", default=".booking_durations.json")
+    parser.add_argument("--offline", action="store_true",
+                        help="Run against a local stand-in hub, each job holding a session for its estimated duration")
+    parser.add_argument("--time-scale", type=float, default=0.01,
+                        help="Fraction of the estimated duration an offline job lasts (default: 0.01)")
+    parser.add_argument("--log-dir", default=None, help="Write the JSON-lines helper logs to this directory")
+    parser.add_argument("--log-console", action="store_true", help="Write the helper logs to stderr")
+    args = parser.parse_args()
+    flow_logging = flow_log.configure(args.log_dir, console=args.log_console)
+
+    config = load_config()
+    cases = BOOKING_CASES if args.route_matrix else [DEFAULT_CASE]
+    jobs = expand(config["platforms"], cases)
+    durations = load_durations(args.durations_file)
+    costs = {job.key: estimate_duration(durations, job.key, job.case.passengers) for job in jobs}
+
+    started = time.monotonic()
+    if args.offline:
+        from .standin_hub import StandInHub
+
+        parallel = args.parallel or 5
+        with StandInHub(parallel) as hub:
+            scheduler = PlatformScheduler(
+                lambda job, started: run_simulated(job, hub.url, config, costs[job.key] * args.time_scale, started),
+                parallel,
+                free_slots=lambda: free_slots(read_plan("", "", hub.plan_url)), poll_interval=0.05)
+            results = scheduler.run(jobs, costs)
+            print(f"Stand-in hub: peak {hub.peak} of {parallel} sessions, {hub.refused} refused")
+    else:
+        username = os.environ.get("BROWSERSTACK_USERNAME") or config.get("userName")
+        access_key = os.environ.get("BROWSERSTACK_ACCESS_KEY") or config.get("accessKey")
+        hub_url = f"https://{username}:{access_key}@{BROWSERSTACK_HUB.split('://', 1)[1]}"
+        parallel = args.parallel or read_plan(username, access_key)["parallel_sessions_max_allowed"]
+        scheduler = PlatformScheduler(
+            lambda job, started: run_booking(job, hub_url, config, username, access_key, session_started=started),
+            parallel, free_slots=lambda: free_slots(read_plan(username, access_key)))
+        results = scheduler.run(jobs, costs)
+        for job, error, seconds in results:
+            if error is None:
+                record_duration(durations, job.key, seconds)
+        save_durations(args.durations_file, durations)
+    wall = time.monotonic() - started
+    flow_logging.stop()
+
+    busy = sum(seconds for _, _, seconds in results)
+    failed = sum(error is not None for _, error, _ in results)
+    print(f"{len(results)} jobs ({failed} failed) in {wall:.1f}s on {parallel} slots, "
+          f"slots busy {busy / (wall * parallel):.0%} of the time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import random
+import time
+
+from selenium.common import (ElementClickInterceptedException, ElementNotInteractableException,
+                             StaleElementReferenceException, TimeoutException)
+
+STALE = "stale"
+INTERCEPTED = "intercepted"
+TIMEOUT = "timeout"
+
+
+def classify(error):
+    """Kind of a WebDriver error for retrying: stale, intercepted, timeout, or None."""
+    if isinstance(error, StaleElementReferenceException):
+        return STALE
+    # Overlays and re-rendering components cover or disable the element for a moment
+    if isinstance(error, (ElementClickInterceptedException, ElementNotInteractableException)):
+        return INTERCEPTED
+    if isinstance(error, TimeoutException):
+        return TIMEOUT
+    return None
+
+
+class RetryPolicy:
+    """Runs an action again on retryable errors, in a loop bounded by attempts and total time.
+
+    Waits `backoff * 2 ** (attempt - 1)` seconds between attempts, capped at `max_backoff`
+    and reduced by up to `jitter` of itself at random. Timeouts are not retried by default,
+    since each attempt already waited its full timeout.
+    """
+
+    def __init__(self, max_attempts=3, backoff=0.25, max_backoff=2.0, jitter=0.5, budget=15.0,
+                 retry_on=(STALE, INTERCEPTED)):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.budget = budget
+        self.retry_on = retry_on
+
+    def delay(self, attempt):
+        delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+        return delay * (1 - self.jitter * random.random())
+
+    def run(self, action, on_retry=None):
+        """Return action(), calling on_retry(kind, attempt, error) before each new attempt.
+
+        The last error is raised once attempts or the time budget run out, or right away
+        when it is not a kind this policy retries.
+        """
+        started = time.monotonic()
+        attempt = 1
+        while True:
+            try:
+                return action()
+            except Exception as error:
+                kind = classify(error)
+                if kind not in self.retry_on or attempt >= self.max_attempts:
+                    raise
+                delay = self.delay(attempt)
+                if time.monotonic() - started + delay > self.budget:
+                    raise
+                if on_retry is not None:
+                    on_retry(kind, attempt, error)
+                time.sleep(delay)
+                attempt += 1
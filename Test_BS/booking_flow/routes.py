@@ -0,0 +1,40 @@
+from collections import namedtuple
+
+
+class BookingCase(namedtuple("BookingCase", "origin destination adults youths children infants")):
+    """One route and passenger mix for the booking flow."""
+
+    __slots__ = ()
+
+    @property
+    def case_id(self):
+        return f"{self.origin}-{self.destination}-{self.adults}a{self.youths}y{self.children}c{self.infants}i"
+
+    @property
+    def passengers(self):
+        return self.adults + self.youths + self.children + self.infants
+
+
+# The QA booking site the flow runs against, unless --mock-site is given
+LIVE_BOOKING_URL = "https://nuxqa2.avtest.ink/en"
+
+# The single search test_main has always run
+DEFAULT_CASE = BookingCase("BOG", "MGA", adults=9, youths=0, children=0, infants=9)
+
+ROUTES = [
+    ("BOG", "MGA"),
+    ("BOG", "MDE"),
+    ("BOG", "CTG"),
+    ("MDE", "BOG"),
+    ("BOG", "SAL"),
+    ("BOG", "MIA"),
+]
+
+# (adults, youths, children, infants); the site allows 9 seated passengers and one infant per adult
+PASSENGER_MIXES = [
+    (1, 0, 0, 0),
+    (2, 1, 1, 1),
+    (9, 0, 0, 9),
+]
+
+BOOKING_CASES = [BookingCase(origin, destination, *mix) for origin, destination in ROUTES for mix in PASSENGER_MIXES]
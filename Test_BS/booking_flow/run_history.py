@@ -0,0 +1,217 @@
+"""Run history of the booking flow in SQLite, with step and locator health.
+
+Every test run adds one row to `runs` and its perf recorder's steps and helper
+calls to `records`, so success rates, latency percentiles and retry counts can be
+read across runs. xdist workers write to the same file; WAL mode lets them do so
+while a report is being read.
+
+    python -m booking_flow.run_history --db .run_history.sqlite --last 50
+"""
+import argparse
+import json
+import os
+import sqlite3
+import time
+from collections import Counter, defaultdict
+
+from .loader_stats import percentile
+
+# Seconds a writer waits for another worker's transaction before giving up
+LOCK_TIMEOUT = 30
+# Runs of a step needed before it is reported as flaky
+FLAKY_MIN_RUNS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    test TEXT NOT NULL,
+    case_id TEXT,
+    worker TEXT,
+    started REAL NOT NULL,
+    duration REAL,
+    outcome TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS records (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    step TEXT,
+    method TEXT,
+    locator TEXT,
+    duration REAL,
+    wait REAL,
+    retries INTEGER,
+    commands INTEGER,
+    ok INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS records_run ON records(run_id);
+"""
+RECORD_COLUMNS = ("kind", "step", "method", "locator", "duration", "wait", "retries", "commands", "ok", "error")
+
+
+def _distribution(samples):
+    return {"p50": percentile(samples, 0.5), "p90": percentile(samples, 0.9), "p99": percentile(samples, 0.99),
+            "max": max(samples)}
+
+
+def _flips(outcomes):
+    return sum(a != b for a, b in zip(outcomes, outcomes[1:]))
+
+
+class RunHistory:
+    """SQLite store of past runs: one connection per process, opened on first use."""
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = None
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, timeout=LOCK_TIMEOUT)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA foreign_keys=ON")
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def record_run(self, test, outcome, duration, records, case_id=None, worker=None):
+        """Store one run and its perf records in a single transaction; returns the run id."""
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (test, case_id, worker, started, duration, outcome) VALUES (?, ?, ?, ?, ?, ?)",
+                (test, case_id, worker, time.time() - duration, duration, outcome))
+            run_id = cursor.lastrowid
+            self.connection.executemany(
+                f"INSERT INTO records (run_id, {', '.join(RECORD_COLUMNS)}) "
+                f"VALUES (?, {', '.join('?' * len(RECORD_COLUMNS))})",
+                [(run_id, *(record.get(column) for column in RECORD_COLUMNS)) for record in records])
+        return run_id
+
+    def _run_ids(self, last=None, test=None):
+        # The `last` runs, of one test only if given, as a subquery and its parameters
+        query = "SELECT id FROM runs"
+        params = []
+        if test is not None:
+            query += " WHERE test = ?"
+            params.append(test)
+        return query + " ORDER BY id DESC LIMIT ?", params + [-1 if last is None else last]
+
+    def _records(self, kind, last=None, test=None):
+        # Records of the selected runs with their run's test, oldest run first
+        runs, params = self._run_ids(last, test)
+        query = "SELECT records.run_id, step, method, locator, records.duration, wait, retries, ok, error, test " \
+                "FROM records JOIN runs ON runs.id = records.run_id " \
+                f"WHERE kind = ? AND records.run_id IN ({runs}) ORDER BY records.run_id"
+        return self.connection.execute(query, [kind] + params).fetchall()
+
+    def runs(self, last=None, test=None):
+        runs, params = self._run_ids(last, test)
+        query = "SELECT test, outcome, COUNT(*), AVG(duration) FROM runs " \
+                f"WHERE id IN ({runs}) GROUP BY test, outcome ORDER BY test, outcome"
+        return self.connection.execute(query, params).fetchall()
+
+    def step_stats(self, last=None, test=None):
+        """Per test, then per step: runs, failures, success rate, duration and wait percentiles, retries and errors.
+
+        test_BF and test_SK, and every booking case, number their steps alike, so a
+        step is only compared with the same step of the same test.
+        """
+        grouped = defaultdict(lambda: defaultdict(list))
+        for row in self._records("step", last, test):
+            grouped[row[9]][row[1]].append(row)
+        return {name: {step: self._stats(rows) for step, rows in steps.items()} for name, steps in grouped.items()}
+
+    def locator_stats(self, last=None, test=None):
+        """Per locator, over the helper calls that used it; same fields as step_stats plus the methods."""
+        grouped = defaultdict(list)
+        for row in self._records("action", last, test):
+            if row[3]:
+                grouped[row[3]].append(row)
+        stats = {}
+        for locator, rows in grouped.items():
+            stats[locator] = self._stats(rows)
+            stats[locator]["methods"] = dict(Counter(row[2] for row in rows))
+        return stats
+
+    @staticmethod
+    def _stats(rows):
+        failures = sum(not row[7] for row in rows)
+        return {"runs": len({row[0] for row in rows}), "calls": len(rows), "failures": failures,
+                "success_rate": 1 - failures / len(rows), "duration": _distribution([row[4] for row in rows]),
+                "wait": _distribution([row[5] for row in rows]), "retries": sum(row[6] for row in rows),
+                "errors": dict(Counter(row[8] for row in rows if row[8]))}
+
+    def flaky_steps(self, last=None, test=None, min_runs=FLAKY_MIN_RUNS):
+        """Steps of a test that both passed and failed, by how often their outcome flipped between its runs.
+
+        A step that always fails is broken rather than flaky, and is left out.
+        """
+        outcomes = defaultdict(list)
+        for row in self._records("step", last, test):
+            outcomes[row[9], row[1]].append(bool(row[7]))
+        flaky = []
+        for (name, step), results in outcomes.items():
+            if len(results) >= min_runs and 0 < sum(results) < len(results):
+                flaky.append({"test": name, "step": step, "runs": len(results), "failures": results.count(False),
+                              "flip_rate": _flips(results) / (len(results) - 1)})
+        return sorted(flaky, key=lambda entry: (-entry["flip_rate"], -entry["failures"]))
+
+    def report(self, last=None, test=None, top=10):
+        lines = ["Runs:"]
+        for name, outcome, count, duration in self.runs(last, test):
+            lines.append(f"  {count:5d} {outcome:8} (avg {duration or 0:.1f}s) {name}")
+        lines.append("Flaky steps:")
+        for entry in self.flaky_steps(last, test)[:top]:
+            lines.append(f"  flip rate {entry['flip_rate']:.2f}, {entry['failures']}/{entry['runs']} failed "
+                         f"{entry['step']} in {entry['test']}")
+        lines.append("Slowest steps (p90):")
+        steps = [(name, step, entry) for name, test_steps in self.step_stats(last, test).items()
+                 for step, entry in test_steps.items()]
+        for name, step, entry in sorted(steps, key=lambda s: -s[2]["duration"]["p90"])[:top]:
+            lines.append(f"  p50 {entry['duration']['p50']:6.2f}s p90 {entry['duration']['p90']:6.2f}s "
+                         f"p99 {entry['duration']['p99']:6.2f}s, {entry['success_rate']:.0%} ok of "
+                         f"{entry['runs']}, retries {entry['retries']} {step} in {name}")
+        lines.append("Least healthy locators:")
+        locators = self.locator_stats(last, test)
+        for locator in sorted(locators, key=lambda l: (locators[l]["success_rate"], -locators[l]["retries"],
+                                                       -locators[l]["wait"]["p90"]))[:top]:
+            entry = locators[locator]
+            errors = ", ".join(f"{name} {count}" for name, count in sorted(entry["errors"].items()))
+            lines.append(f"  {entry['success_rate']:.0%} ok of {entry['calls']} calls, retries {entry['retries']}, "
+                         f"wait p90 {entry['wait']['p90']:.2f}s{f' ({errors})' if errors else ''} {locator}")
+        return "\n".join(lines)
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report step and locator health from the booking flow run history")
+    parser.add_argument("--db", default=".run_history.sqlite")
+    parser.add_argument("--last", type=int, default=None, help="Only the most recent N runs")
+    parser.add_argument("--test", default=None,
+                        help="Only runs of this test, by node id, e.g. booking_flow/test_SK.py::test_main[BOG-MGA-9a0y0c9i]")
+    parser.add_argument("--top", type=int, default=10, help="Entries per section (default: 10)")
+    parser.add_argument("--json", action="store_true", help="Print the full statistics as JSON")
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        parser.error(f"no run history at {args.db}")
+
+    history = RunHistory(args.db)
+    try:
+        if args.json:
+            print(json.dumps({"steps": history.step_stats(args.last, args.test),
+                              "locators": history.locator_stats(args.last, args.test),
+                              "flaky": history.flaky_steps(args.last, args.test)}, indent=2))
+        else:
+            print(history.report(args.last, args.test, args.top))
+    finally:
+        history.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import heapq
+import json
+import os
+
+# Durations kept per test, newest last
+HISTORY_LENGTH = 10
+# Estimate for a test never seen before: fixed flow cost plus one passenger form each
+UNKNOWN_BASE_SECONDS = 60
+UNKNOWN_SECONDS_PER_PASSENGER = 15
+
+
+def load_durations(path):
+    try:
+        with open(path) as history:
+            return json.load(history)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_durations(path, durations):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as history:
+        json.dump(durations, history, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def record_duration(durations, key, seconds):
+    samples = durations.setdefault(key, [])
+    samples.append(round(seconds, 3))
+    del samples[:-HISTORY_LENGTH]
+
+
+def estimate_duration(durations, key, passengers=0):
+    samples = durations.get(key)
+    if samples:
+        # Median, so a single hung run does not reshuffle every shard
+        ordered = sorted(samples)
+        return ordered[len(ordered) // 2]
+    return UNKNOWN_BASE_SECONDS + UNKNOWN_SECONDS_PER_PASSENGER * passengers
+
+
+def shard(costs, shard_count):
+    """Assign each key of `costs` to a shard, longest first onto the least loaded shard.
+
+    Returns {key: shard index}. Longest-processing-time-first keeps the heavy
+    passenger cases from all landing at the tail of one worker.
+    """
+    loads = [(0.0, index) for index in range(shard_count)]
+    assignment = {}
+    for key in sorted(costs, key=lambda k: (-costs[k], k)):
+        load, index = heapq.heappop(loads)
+        assignment[key] = index
+        heapq.heappush(loads, (load + costs[key], index))
+    return assignment
@@ -0,0 +1,122 @@
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SESSION_PATH = re.compile(r"^/wd/hub/session/([^/]+)")
+
+
+class StandInHub:
+    """Local stand-in for the BrowserStack hub, to exercise the platform scheduler offline.
+
+    It accepts W3C new-session and delete-session requests, answers every other command
+    with a null value, and refuses new sessions beyond `parallel_limit` the way the real
+    hub does once the plan's parallel sessions are in use. /automate/plan.json reports
+    the slots in use like the BrowserStack REST API.
+    """
+
+    def __init__(self, parallel_limit, startup_delay=0.0, host="127.0.0.1", port=0):
+        self.parallel_limit = parallel_limit
+        self.startup_delay = startup_delay
+        self.sessions = {}
+        self.refused = 0
+        self.peak = 0
+        # (time, sessions running) after every change, to check how full the slots were kept
+        self.timeline = []
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/wd/hub"
+
+    @property
+    def plan_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/automate/plan.json"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _open_session(self, capabilities):
+        with self._lock:
+            if len(self.sessions) >= self.parallel_limit:
+                self.refused += 1
+                return None
+            session_id = uuid.uuid4().hex
+            self.sessions[session_id] = capabilities
+            self.peak = max(self.peak, len(self.sessions))
+            self.timeline.append((time.monotonic(), len(self.sessions)))
+        time.sleep(self.startup_delay)
+        return session_id
+
+    def _close_session(self, session_id):
+        with self._lock:
+            if self.sessions.pop(session_id, None) is not None:
+                self.timeline.append((time.monotonic(), len(self.sessions)))
+
+    def plan(self):
+        with self._lock:
+            return {"parallel_sessions_max_allowed": self.parallel_limit,
+                    "parallel_sessions_running": len(self.sessions), "queued_sessions": 0}
+
+    def _handler(self):
+        hub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, status, body):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                if self.path.startswith("/automate/plan.json"):
+                    self._reply(200, hub.plan())
+                else:
+                    self._reply(200, {"value": None})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if self.path.rstrip("/") != "/wd/hub/session":
+                    self._reply(200, {"value": None})
+                    return
+                capabilities = body.get("capabilities", {}).get("alwaysMatch", {})
+                session_id = hub._open_session(capabilities)
+                if session_id is None:
+                    self._reply(500, {"value": {"error": "session not created", "stacktrace": "",
+                                                "message": "All parallel tests are currently in use"}})
+                else:
+                    self._reply(200, {"value": {"sessionId": session_id, "capabilities": capabilities}})
+
+            def do_DELETE(self):
+                match = SESSION_PATH.match(self.path)
+                if match and self.path.rstrip("/") == match.group(0):
+                    hub._close_session(match.group(1))
+                self._reply(200, {"value": None})
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
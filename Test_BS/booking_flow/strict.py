@@ -0,0 +1,37 @@
+class HelperActionError(Exception):
+    """A helper action that failed, with the step and locator it failed on."""
+
+    def __init__(self, method, locator, step, cause):
+        self.method = method
+        self.locator = locator
+        self.step = step
+        self.cause = cause
+        super().__init__(f"{method} failed in step {step!r} on {locator}: {cause}")
+
+
+class CircuitOpenError(HelperActionError):
+    """Raised when a step starts after a critical step had a failed action."""
+
+    def __init__(self, failure):
+        super().__init__(failure.method, failure.locator, failure.step, failure.cause)
+        self.args = (f"Skipping the remaining steps, critical step {failure.step!r} failed: "
+                     f"{failure.method} on {failure.locator}: {failure.cause}",)
+
+
+class CircuitBreaker:
+    """Opens on the first failed action of a critical step; once open, no further step may start."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.critical = False
+        self.failure = None
+
+    def enter(self, critical):
+        # Called as each step starts
+        if self.enabled and self.failure is not None:
+            raise CircuitOpenError(self.failure)
+        self.critical = critical
+
+    def record(self, failure):
+        if self.critical and self.failure is None:
+            self.failure = failure
@@ -0,0 +1,75 @@
+import gzip
+import json
+import os
+
+from selenium.common import WebDriverException
+
+from .artifacts import ArtifactStore
+
+TEST = "booking_flow/test_SK.py::test_main[BOG-MGA]"
+TEST_DIRECTORY = "booking_flow_test_SK.py_test_main_BOG-MGA"
+STEP = "3. Search for flights"
+
+
+class StubDriver:
+    current_url = "https://booking.example.com/flights"
+    page_source = "<html>flights</html>"
+
+    def __init__(self, screenshot=b"\x89PNG"):
+        self.screenshot = screenshot
+
+    def get_screenshot_as_png(self):
+        if self.screenshot is None:
+            raise WebDriverException("tab crashed")
+        return self.screenshot
+
+    def get_log(self, kind):
+        return [{"level": "SEVERE", "message": "flights.js 12:3 Uncaught TypeError"}]
+
+
+def test_capture_writes_the_browser_state_and_what_failed(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    path = store.capture(StubDriver(), TEST, "action failed", STEP, "click_element", "//button", "TimeoutException")
+    store.close()
+    assert path == str(tmp_path / TEST_DIRECTORY / "01-3._Search_for_flights")
+    assert sorted(os.listdir(path)) == ["console.json.gz", "meta.json", "page.html.gz", "screenshot.png"]
+    with open(os.path.join(path, "meta.json")) as meta_file:
+        meta = json.load(meta_file)
+    assert (meta["step"], meta["method"], meta["locator"], meta["error"], meta["url"]) == (
+        STEP, "click_element", "//button", "TimeoutException", StubDriver.current_url)
+    with gzip.open(os.path.join(path, "page.html.gz"), "rt") as page:
+        assert page.read() == StubDriver.page_source
+
+
+def test_a_failed_read_skips_only_that_artifact(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    path = store.capture(StubDriver(screenshot=None), TEST, "test failed", STEP)
+    store.close()
+    assert "screenshot.png" not in os.listdir(path) and "page.html.gz" in os.listdir(path)
+
+
+def test_failures_and_samples_are_capped_separately_per_test(tmp_path):
+    store = ArtifactStore(str(tmp_path), max_per_test=2, max_samples_per_test=1)
+    driver = StubDriver()
+    failures = [store.capture(driver, TEST, "action failed", STEP) for _ in range(3)]
+    samples = [store.capture(driver, TEST, "sample", STEP, sample=True) for _ in range(2)]
+    other_test = store.capture(driver, f"{TEST}x", "action failed", STEP)
+    store.close()
+    assert failures[2] is None and samples[1] is None and other_test is not None
+    assert [os.path.basename(path) for path in failures[:2] + samples[:1]] == [
+        "01-3._Search_for_flights", "02-3._Search_for_flights", "03-3._Search_for_flights"]
+
+
+def test_helper_captures_failed_actions_outside_the_command_budget(fake_helper, tmp_path, monkeypatch):
+    monkeypatch.setattr(fake_helper.driver, "get_screenshot_as_png", lambda: b"\x89PNG")
+    fake_helper.artifacts = ArtifactStore(str(tmp_path), max_per_test=2)
+    fake_helper.test_name = TEST
+    fake_helper.recorder.step(STEP)
+    # The counter script gave up after clicking, so the helper reports the failure
+    fake_helper.driver.page.answer("var xpath = arguments[0], target", {"error": "plus button disabled", "clicks": 2})
+    for _ in range(3):
+        fake_helper.set_passenger_count(1, 3)
+    fake_helper.artifacts.close()
+    assert sorted(os.listdir(tmp_path / TEST_DIRECTORY)) == ["01-3._Search_for_flights", "02-3._Search_for_flights"]
+    # One counter script per call; the captures' screenshot and page source reads are not counted
+    assert len(fake_helper.command_trace.commands) == 3
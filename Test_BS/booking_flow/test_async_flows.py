@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+from selenium.common import SessionNotCreatedException
+
+from . import async_flows
+from .async_flows import run_flows
+from .driver_pool import DriverPool
+from .fake_webdriver import FakeWebDriver
+from .routes import BOOKING_CASES
+from .test_SK import SeleniumHelper
+
+CASES = BOOKING_CASES[:3]
+
+
+@pytest.fixture
+def browsers(monkeypatch):
+    # Fake browsers, the first of which fails to start
+    started = []
+
+    def create_chrome_driver(headless=False, page_load_strategy="normal"):
+        if not started:
+            started.append(None)
+            raise SessionNotCreatedException("Chrome failed to start")
+        started.append(FakeWebDriver())
+        return started[-1]
+
+    monkeypatch.setattr(async_flows, "create_chrome_driver", create_chrome_driver)
+    # The fake driver has no windows to reset
+    monkeypatch.setattr(DriverPool, "reset", lambda self, driver: None)
+    return started
+
+
+def test_run_flows_returns_a_result_per_case_in_order(browsers):
+    booked = []
+
+    def flow(helper, booking_case, booking_url, booking_data):
+        helper.recorder.step("1. Book")
+        booked.append((booking_case.case_id, booking_url, booking_data["case_id"]))
+        if booking_case is CASES[2]:
+            raise ValueError("no flights")
+
+    results = asyncio.run(run_flows(CASES, "http://mock", SeleniumHelper, flow, concurrency=1))
+    assert [result[0] for result in results] == [booking_case.case_id for booking_case in CASES]
+
+    # The browser that did not start fails only its own case, without a helper
+    case_id, error, seconds, helper = results[0]
+    assert isinstance(error, SessionNotCreatedException) and helper is None
+    assert results[1][1] is None
+    case_id, error, seconds, helper = results[2]
+    assert isinstance(error, ValueError)
+    assert helper.recorder.steps()[0]["error"] == "ValueError"
+    assert booked == [(booking_case.case_id, "http://mock", booking_case.case_id) for booking_case in CASES[1:]]
+
+
+def test_run_flows_configures_each_helper(browsers):
+    configured = []
+
+    def flow(helper, booking_case, booking_url, booking_data):
+        configured.append(helper.batch_form_fill)
+
+    def configure(helper):
+        helper.batch_form_fill = True
+
+    asyncio.run(run_flows(CASES, "http://mock", SeleniumHelper, flow, concurrency=2, configure=configure))
+    assert configured == [True, True]
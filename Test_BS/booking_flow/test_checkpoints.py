@@ -0,0 +1,95 @@
+import time
+
+from selenium.common import WebDriverException
+from selenium.webdriver.common.by import By
+
+from . import locators
+from .checkpoints import MAX_AGE_SECONDS, CheckpointStore, capture_state, prime_state
+
+CASE = "BOG-MGA-1a0y0c0i"
+URL = "https://qa.example.com/booking/passengers"
+STATE = {"url": URL, "cookies": [{"name": "session", "value": "s1"}, {"name": "_ga", "value": "g1"}],
+         "local_storage": {"cart": "1"}, "session_storage": {"flow": "passengers"}, "saved_at": 0}
+
+
+class StubDriver:
+    """Answers the storage scripts and records every cookie and navigation call."""
+
+    current_url = URL
+
+    def __init__(self):
+        self.calls = []
+
+    def execute_script(self, script, *args):
+        if "return location.host;" in script:
+            return "qa.example.com"
+        if args:
+            self.calls.append(("write_storage", *args))
+            return None
+        return {"local": {"cart": "1"}, "session": {"flow": "passengers"}}
+
+    def get_cookies(self):
+        return [{"name": "session", "value": "s1"}]
+
+    def get(self, url):
+        self.calls.append(("get", url))
+
+    def delete_all_cookies(self):
+        self.calls.append(("delete_all_cookies",))
+
+    def add_cookie(self, cookie):
+        if cookie["name"] == "_ga":
+            raise WebDriverException("invalid cookie domain")
+        self.calls.append(("add_cookie", cookie["name"]))
+
+
+def test_capture_reads_url_cookies_and_storage():
+    state = capture_state(StubDriver())
+    assert {key: state[key] for key in STATE if key != "saved_at"} == {
+        "url": URL, "cookies": [{"name": "session", "value": "s1"}], "local_storage": {"cart": "1"},
+        "session_storage": {"flow": "passengers"}}
+    assert time.time() - state["saved_at"] < 5
+
+
+def test_prime_sets_storage_and_cookies_from_the_same_origin():
+    driver = StubDriver()
+    prime_state(driver, STATE)
+    assert driver.calls == [("get", "https://qa.example.com/favicon.ico"),
+                            ("write_storage", {"cart": "1"}, {"flow": "passengers"}),
+                            ("delete_all_cookies",), ("add_cookie", "session")]
+
+
+def test_store_saves_and_loads_per_case_and_checkpoint(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    state = dict(STATE, saved_at=time.time())
+    assert store.save(CASE, "passengers", state) == str(tmp_path / CASE / "passengers.json")
+    assert store.load(CASE, "passengers") == state
+    assert store.load(CASE, "contact") is None
+
+
+def test_store_ignores_expired_checkpoints(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    store.save(CASE, "passengers", dict(STATE, saved_at=time.time() - MAX_AGE_SECONDS - 1))
+    assert store.load(CASE, "passengers") is None
+
+
+def resuming_helper(helper, tmp_path, saved_at):
+    helper.checkpoints = CheckpointStore(str(tmp_path))
+    helper.checkpoints.save(CASE, "passengers", dict(STATE, saved_at=saved_at))
+    helper.resume_from = "passengers"
+    helper.driver.page.answer("return location.host;", "qa.example.com")
+    helper.driver.page.add(By.XPATH, locators.NATIONALITY_DROPDOWN.value)
+    return helper
+
+
+def test_helper_resumes_from_a_fresh_checkpoint(fake_helper, tmp_path):
+    helper = resuming_helper(fake_helper, tmp_path, time.time())
+    assert helper.resume(CASE) == "passengers"
+    assert helper.recorder.current_step == "Resume from the passengers checkpoint"
+
+
+def test_helper_starts_over_without_a_usable_checkpoint(fake_helper, tmp_path):
+    helper = resuming_helper(fake_helper, tmp_path, time.time() - MAX_AGE_SECONDS - 1)
+    assert helper.resume(CASE) is None
+    helper.resume_from = None
+    assert helper.resume(CASE) is None
@@ -0,0 +1,58 @@
+import pytest
+from selenium.webdriver.common.by import By
+
+from .booking import COMMAND_BUDGETS, MOCK_SITE_COMMAND_BUDGETS
+from .command_trace import CommandBudgetExceeded
+from .conftest import _command_budgets
+
+BUTTON = "//button[@id='search']"
+STEP = "3. Search for flights"
+
+
+class Item:
+    def __init__(self, *markers):
+        self.markers = markers
+
+    def get_closest_marker(self, name):
+        return next((marker.mark for marker in self.markers if marker.name == name), None)
+
+
+def test_budgets_hold_on_every_target_unless_the_mock_site_has_its_own():
+    marker = pytest.mark.command_budget(COMMAND_BUDGETS, mock_site=MOCK_SITE_COMMAND_BUDGETS)
+    assert _command_budgets(Item(marker), mock_site=False) is COMMAND_BUDGETS
+    assert _command_budgets(Item(marker), mock_site=True) is MOCK_SITE_COMMAND_BUDGETS
+    assert _command_budgets(Item(pytest.mark.command_budget(COMMAND_BUDGETS)), mock_site=True) is COMMAND_BUDGETS
+    assert _command_budgets(Item(), mock_site=False) == {}
+
+
+def test_commands_are_counted_per_step_and_helper_call(fake_helper):
+    fake_helper.recorder.step(STEP)
+    fake_helper.driver.page.add(By.XPATH, BUTTON)
+    fake_helper.click_element("xpath", BUTTON)
+    traced = fake_helper.command_trace.commands
+    assert traced and {(entry["step"], entry["method"]) for entry in traced} == {(STEP, "click_element")}
+    assert sum(fake_helper.command_trace.counts(STEP).values()) == len(traced)
+
+
+def test_paused_commands_are_not_counted(fake_helper):
+    with fake_helper.command_trace.paused():
+        fake_helper.driver.page.add(By.XPATH, BUTTON)
+        fake_helper.click_element("xpath", BUTTON)
+    assert fake_helper.command_trace.commands == []
+
+
+def test_going_over_a_budget_is_reported_once(fake_helper):
+    fake_helper.command_trace.budgets = {"click_element": 1, STEP: 100}
+    fake_helper.recorder.step(STEP)
+    fake_helper.driver.page.add(By.XPATH, BUTTON)
+    fake_helper.click_element("xpath", BUTTON)
+    fake_helper.recorder.end_step()
+    with pytest.raises(CommandBudgetExceeded, match=r"click_element used \d+ commands \(budget 1\)"):
+        fake_helper.command_trace.check()
+    fake_helper.command_trace.check()
+
+
+def test_detach_gives_the_driver_its_own_execute_back(fake_helper):
+    driver = fake_helper.driver
+    fake_helper.command_trace.detach()
+    assert "execute" not in driver.__dict__
@@ -0,0 +1,55 @@
+import pytest
+from selenium.webdriver.common.by import By
+
+from . import locators
+from .booking import book
+from .counters import COUNTER_TIMEOUT_MS, set_counter
+from .fake_webdriver import FakeWebDriver
+from .routes import BookingCase
+
+# A line only the counter script has
+COUNTER_SCRIPT = "var xpath = arguments[0], target"
+STEP = "7. Increase the number of adults from the default of one"
+
+
+class StubHelper:
+    """Records every helper call of the booking steps; no element is ever visible."""
+
+    LOADER_WAITS = {"long": (60,), "short": (40,)}
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, method):
+        return lambda *args, **kwargs: self.calls.append((method, *args))
+
+
+def test_set_counter_sends_the_counter_target_and_timeout():
+    driver = FakeWebDriver()
+    calls = driver.page.answer(COUNTER_SCRIPT, {"before": 1, "after": 3, "clicks": 2})
+    counter = locators.passenger_counter(1).value
+    assert set_counter(driver, counter, 3) == {"before": 1, "after": 3, "clicks": 2}
+    assert calls == [[counter, 3, COUNTER_TIMEOUT_MS]]
+
+
+def test_helper_returns_the_count_the_counter_shows(fake_helper):
+    fake_helper.recorder.step(STEP)
+    fake_helper.driver.page.answer(COUNTER_SCRIPT, lambda args: {"before": 1, "after": args[1], "clicks": 2})
+    assert fake_helper.set_passenger_count(1, 3) == 3
+
+
+@pytest.mark.parametrize("row, clicks", [(1, 2), (3, 3)], ids=["adults", "children"])
+def test_unreadable_counter_falls_back_to_clicking_plus_from_the_default(fake_helper, row, clicks):
+    fake_helper.recorder.step(STEP)
+    fake_helper.driver.page.answer(COUNTER_SCRIPT, {"error": "counter value not readable", "clicks": 0})
+    plus, = fake_helper.driver.page.add(By.XPATH, locators.passenger_counter_plus(row).value)
+    assert fake_helper.set_passenger_count(row, 3) is None
+    assert plus.clicks == clicks
+
+
+def test_booking_only_sets_the_counters_it_needs():
+    helper = StubHelper()
+    with pytest.raises(AssertionError, match="Week calendar was not visible"):
+        book(helper, BookingCase("BOG", "MGA", 2, 0, 1, 0), "https://booking.example.com", {})
+    assert [call for call in helper.calls if call[0] == "set_passenger_count"] == [
+        ("set_passenger_count", 1, 2), ("set_passenger_count", 3, 1)]
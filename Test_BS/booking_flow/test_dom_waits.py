@@ -0,0 +1,98 @@
+from selenium.webdriver.common.by import By
+
+from .dom_waits import NO_ANGULAR, RECHECK_INTERVAL_MS, SCRIPT_TIMEOUT_MARGIN, ObserverWaits
+from .fake_webdriver import FakeWebDriver, _CommandError
+from .test_SK import SeleniumHelper
+
+BUTTON = "//button[@id='search']"
+# A line only the observer script has
+OBSERVE = "var by = arguments[0], selector"
+ANGULAR = "getAllAngularTestabilities"
+
+
+def script_timeouts(driver, monkeypatch):
+    timeouts = []
+    monkeypatch.setattr(driver, "set_script_timeout", timeouts.append)
+    return timeouts
+
+
+def raise_javascript_error(args):
+    raise _CommandError("javascript error", "Execution context was destroyed")
+
+
+def test_wait_reports_the_page_result_in_one_script_call(monkeypatch):
+    driver = FakeWebDriver()
+    script_timeouts(driver, monkeypatch)
+    calls = driver.page.answer(OBSERVE, lambda args: args[2] == "visible")
+    waits = ObserverWaits(driver)
+    assert waits.wait(By.XPATH, BUTTON, "visible", 2.5) is True
+    assert waits.wait(By.XPATH, BUTTON, "invisible", 2.5) is False
+    assert calls[0] == [By.XPATH, BUTTON, "visible", 2500, RECHECK_INTERVAL_MS]
+
+
+def test_script_timeout_is_only_raised_when_a_wait_needs_more(monkeypatch):
+    driver = FakeWebDriver()
+    timeouts = script_timeouts(driver, monkeypatch)
+    driver.page.answer(OBSERVE, lambda args: True)
+    waits = ObserverWaits(driver)
+    for timeout in (10, 5, 10, 40):
+        waits.wait(By.XPATH, BUTTON, "visible", timeout)
+    assert timeouts == [10 + SCRIPT_TIMEOUT_MARGIN, 40 + SCRIPT_TIMEOUT_MARGIN]
+
+
+def test_an_interrupted_wait_asks_the_caller_to_poll(monkeypatch):
+    driver = FakeWebDriver()
+    script_timeouts(driver, monkeypatch)
+    driver.page.answer(OBSERVE, raise_javascript_error)
+    assert ObserverWaits(driver).wait(By.XPATH, BUTTON, "visible", 1) is None
+
+
+def observer_helper(result):
+    helper = SeleniumHelper(FakeWebDriver())
+    helper.wait_engine = "observer"
+    helper.recorder.step("14. Wait for visibility and click on the filter button")
+    calls = helper.driver.page.answer(OBSERVE, result)
+    return helper, calls
+
+
+def test_helper_waits_return_the_observer_result_without_polling():
+    helper, calls = observer_helper(lambda args: False)
+    # Present and visible, so only the observer's answer makes the wait fail
+    helper.driver.page.add(By.XPATH, BUTTON)
+    assert helper.wait_for_visibility_of_element_located("xpath", BUTTON, 1) is False
+    assert len(calls) == 1
+    helper.command_trace.detach()
+
+
+def test_helper_waits_poll_when_the_observer_is_interrupted():
+    helper, calls = observer_helper(raise_javascript_error)
+    helper.driver.page.add(By.XPATH, BUTTON)
+    assert helper.wait_for_visibility_of_element_located("xpath", BUTTON, 1) is True
+    assert len(calls) == 1
+    helper.command_trace.detach()
+
+
+def test_angular_wait_sends_its_timeout_in_ms(monkeypatch):
+    driver = FakeWebDriver()
+    script_timeouts(driver, monkeypatch)
+    calls = driver.page.answer(ANGULAR, False)
+    assert ObserverWaits(driver).angular_stable(2.5) is False
+    assert calls == [[2500]]
+
+
+def test_wait_for_angular_stops_asking_a_page_without_angular_until_the_next_load(fake_helper):
+    calls = fake_helper.driver.page.answer(ANGULAR, NO_ANGULAR)
+    assert fake_helper.wait_for_angular(1) is None
+    assert fake_helper.wait_for_angular(1) is None
+    assert len(calls) == 1
+    fake_helper.load_url("about:blank")
+    fake_helper.wait_for_angular(1)
+    assert len(calls) == 2
+
+
+def test_wait_for_angular_asks_again_after_an_interrupted_wait(fake_helper):
+    outcomes = [raise_javascript_error, lambda args: True]
+    calls = fake_helper.driver.page.answer(ANGULAR, lambda args: outcomes.pop(0)(args))
+    assert fake_helper.wait_for_angular(1) is None
+    assert fake_helper.wait_for_angular(1) is True
+    assert len(calls) == 2
@@ -0,0 +1,114 @@
+import threading
+
+import pytest
+
+from .driver_pool import DriverPool
+
+
+class StubDriver:
+    def __init__(self, name):
+        self.name = name
+        self.quit_calls = 0
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+class StubPool(DriverPool):
+    """A pool of StubDrivers whose reset can be made to fail."""
+
+    def __init__(self, max_size=1):
+        self.started = []
+        self.reset_error = None
+        super().__init__(factory=self._start, max_size=max_size)
+
+    def _start(self):
+        self.started.append(StubDriver(f"driver-{len(self.started)}"))
+        return self.started[-1]
+
+    def reset(self, driver):
+        if self.reset_error is not None:
+            raise self.reset_error
+
+
+def test_released_drivers_are_reused_before_new_ones_start():
+    pool = StubPool(max_size=2)
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    second = pool.acquire()
+    assert second is not first and len(pool.started) == 2
+
+
+def test_acquire_times_out_when_every_driver_is_leased():
+    pool = StubPool()
+    pool.acquire()
+    with pytest.raises(TimeoutError, match="all 1 are leased"):
+        pool.acquire(timeout=0.05)
+
+
+def test_a_driver_that_fails_to_reset_is_replaced():
+    pool = StubPool()
+    driver = pool.acquire()
+    pool.reset_error = RuntimeError("browser crashed")
+    pool.release(driver)
+    assert driver.quit_calls == 1
+    pool.reset_error = None
+    assert pool.acquire(timeout=0.05) is not driver
+
+
+def test_a_discarded_driver_frees_its_slot_for_a_waiting_acquire():
+    pool = StubPool()
+    driver = pool.acquire()
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire(timeout=5)))
+    waiter.start()
+    pool.discard(driver)
+    waiter.join(5)
+    assert acquired and acquired[0] is not driver
+
+
+def test_close_quits_every_driver():
+    pool = StubPool(max_size=2)
+    leased = pool.acquire()
+    pool.release(pool.acquire())
+    pool.close()
+    assert [driver.quit_calls for driver in pool.started] == [1, 1]
+    assert leased in pool.started
+
+
+def test_drivers_come_back_while_a_new_browser_starts():
+    pool = StubPool(max_size=2)
+    first = pool.acquire()
+    starting, started = threading.Event(), threading.Event()
+    start = pool.factory
+
+    def slow_start():
+        starting.set()
+        started.wait(5)
+        return start()
+
+    pool.factory = slow_start
+    second = []
+    starter = threading.Thread(target=lambda: second.append(pool.acquire()))
+    starter.start()
+    starting.wait(5)
+    # The browser is still starting, yet the pool's lock is free for returning and taking idle drivers
+    pool.release(first)
+    assert pool.acquire(timeout=1) is first
+    started.set()
+    starter.join(5)
+    assert second and second[0] is not first
+
+
+def crashing_start():
+    raise RuntimeError("chromedriver crashed")
+
+
+def test_a_browser_that_fails_to_start_frees_its_slot():
+    pool = StubPool()
+    pool.factory = crashing_start
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+    pool.factory = pool._start
+    assert pool.acquire(timeout=0.05) is pool.started[0]
@@ -0,0 +1,146 @@
+import os
+import platform
+import time
+
+import pytest
+
+from . import driver_resolver
+from .driver_resolver import (LOCK_STALE_AFTER, _any_known_driver, file_lock, manifest_key, read_manifest,
+                              resolve_chromedriver, write_manifest)
+
+
+@pytest.fixture
+def drivers(tmp_path):
+    # Executable stand-ins keyed like the manifest
+    def make(*versions):
+        paths = {}
+        for version in versions:
+            path = tmp_path / f"chromedriver-{version}"
+            path.write_text("")
+            paths[manifest_key(version)] = str(path)
+        return paths
+    return make
+
+
+@pytest.fixture
+def resolver(tmp_path, monkeypatch):
+    manifest = tmp_path / "cache" / "drivers.json"
+    monkeypatch.setenv(driver_resolver.MANIFEST_ENV, str(manifest))
+    monkeypatch.delenv(driver_resolver.PINNED_DRIVER_ENV, raising=False)
+    monkeypatch.setattr(driver_resolver, "_resolved", {})
+    monkeypatch.setattr(driver_resolver, "get_chrome_version", lambda: "131.0.6778.85")
+    return manifest
+
+
+def chrome_driver_manager(install):
+    class Manager:
+        def install(self):
+            return install()
+    return Manager
+
+
+def test_manifest_round_trip(tmp_path):
+    path = str(tmp_path / "drivers.json")
+    assert read_manifest(path) == {}
+    write_manifest(path, {"key": "/drivers/chromedriver"})
+    assert read_manifest(path) == {"key": "/drivers/chromedriver"}
+    assert os.listdir(tmp_path) == ["drivers.json"]
+
+
+def test_manifest_key_names_platform_and_version():
+    assert manifest_key(None) == f"{platform.system()}-{platform.machine()}-chrome-unknown"
+
+
+def test_file_lock_is_exclusive(tmp_path):
+    lock_path = str(tmp_path / "drivers.lock")
+    with file_lock(lock_path):
+        with pytest.raises(TimeoutError):
+            with file_lock(lock_path, timeout=0):
+                pass
+    assert not os.path.exists(lock_path)
+    with file_lock(lock_path, timeout=0):
+        pass
+
+
+def test_file_lock_takes_over_a_stale_lock(tmp_path):
+    lock_path = tmp_path / "drivers.lock"
+    lock_path.write_text("12345")
+    stale = time.time() - LOCK_STALE_AFTER - 1
+    os.utime(lock_path, (stale, stale))
+    with file_lock(str(lock_path), timeout=0):
+        assert lock_path.read_text() == str(os.getpid())
+
+
+def test_file_lock_keeps_a_lock_held_through_a_slow_download(tmp_path):
+    lock_path = tmp_path / "drivers.lock"
+    lock_path.write_text("12345")
+    # Another process has been downloading for five minutes
+    busy = time.time() - 300
+    os.utime(lock_path, (busy, busy))
+    with pytest.raises(TimeoutError):
+        with file_lock(str(lock_path), timeout=0):
+            pass
+    assert lock_path.read_text() == "12345"
+
+
+def test_chrome_version_is_detected_once(monkeypatch):
+    detections = []
+
+    class Manager:
+        def get_browser_version_from_os(self, browser_type):
+            detections.append(browser_type)
+            return "131.0.6778.85"
+
+    monkeypatch.setattr(driver_resolver, "_chrome_version", None)
+    monkeypatch.setattr(driver_resolver, "OperationSystemManager", Manager)
+    assert driver_resolver.get_chrome_version() == "131.0.6778.85"
+    assert driver_resolver.get_chrome_version() == "131.0.6778.85"
+    assert len(detections) == 1
+
+
+def test_any_known_driver_picks_the_newest_existing(drivers):
+    entries = drivers("99.0.1", "131.0.2", "unknown")
+    entries[manifest_key("140.0")] = "/missing/chromedriver"
+    entries["Other-arch-chrome-150.0"] = entries[manifest_key("131.0.2")]
+    assert _any_known_driver(entries) == entries[manifest_key("131.0.2")]
+
+
+def test_pinned_driver_skips_resolution(resolver, drivers, monkeypatch):
+    pinned = drivers("pinned")[manifest_key("pinned")]
+    monkeypatch.setenv(driver_resolver.PINNED_DRIVER_ENV, pinned)
+    monkeypatch.setattr(driver_resolver, "get_chrome_version", lambda: pytest.fail("resolved a pinned driver"))
+    assert resolve_chromedriver() == pinned
+
+
+def test_downloads_once_and_records_it_in_the_manifest(resolver, drivers, monkeypatch):
+    installed = drivers("131.0.6778.85")[manifest_key("131.0.6778.85")]
+    downloads = []
+    monkeypatch.setattr(driver_resolver, "ChromeDriverManager",
+                        chrome_driver_manager(lambda: downloads.append(1) or installed))
+    assert resolve_chromedriver() == installed
+    # A new worker reads it from the manifest
+    monkeypatch.setattr(driver_resolver, "_resolved", {})
+    assert resolve_chromedriver() == installed
+    assert downloads == [1]
+    assert read_manifest(str(resolver)) == {manifest_key("131.0.6778.85"): installed}
+
+
+def test_falls_back_to_a_known_driver_when_offline(resolver, drivers, monkeypatch):
+    entries = drivers("130.0.1")
+    resolver.parent.mkdir()
+    write_manifest(str(resolver), entries)
+
+    def offline():
+        raise ConnectionError("no network")
+
+    monkeypatch.setattr(driver_resolver, "ChromeDriverManager", chrome_driver_manager(offline))
+    assert resolve_chromedriver() == entries[manifest_key("130.0.1")]
+
+
+def test_download_errors_surface_without_a_known_driver(resolver, monkeypatch):
+    def offline():
+        raise ConnectionError("no network")
+
+    monkeypatch.setattr(driver_resolver, "ChromeDriverManager", chrome_driver_manager(offline))
+    with pytest.raises(ConnectionError):
+        resolve_chromedriver()
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+from selenium.webdriver.common.by import By
+
+from . import locators
+from .dropdowns import OPTIONS_TIMEOUT_MS, choose_option, select_option
+from .fake_webdriver import FakeWebDriver, _CommandError
+
+# A line only the dropdown script has
+SELECT_SCRIPT = "var triggerXpath"
+GENDER = locators.GENDER_DROPDOWN.value
+
+
+def raise_javascript_error(args):
+    raise _CommandError("javascript error", "Cannot read properties of null")
+
+
+def test_select_option_sends_trigger_options_value_and_pick():
+    driver = FakeWebDriver()
+    calls = driver.page.answer(SELECT_SCRIPT, {"selected": "Female"})
+    assert select_option(driver, GENDER, value="Female", pick=0.5) == "Female"
+    assert calls == [[GENDER, locators.DROPDOWN_OPTIONS.value, "Female", 0.5, OPTIONS_TIMEOUT_MS]]
+
+
+def test_select_option_draws_its_pick_from_the_seeded_random():
+    driver = FakeWebDriver()
+    calls = driver.page.answer(SELECT_SCRIPT, {"selected": "Male"})
+    random.seed(7)
+    select_option(driver, GENDER)
+    random.seed(7)
+    assert calls[0][3] == random.random()
+
+
+def test_select_option_returns_none_when_nothing_was_selected():
+    driver = FakeWebDriver()
+    driver.page.answer(SELECT_SCRIPT, {"error": "no options rendered"})
+    assert select_option(driver, GENDER, value="Female") is None
+
+
+def test_helper_selects_in_one_script_call(fake_helper):
+    calls = fake_helper.driver.page.answer(SELECT_SCRIPT, lambda args: {"selected": "Option at %.1f" % args[3]})
+    assert fake_helper.select_from_dropdown(GENDER, pick=0.5) == "Option at 0.5"
+    assert len(calls) == 1
+
+
+def option_xpath(text):
+    return f"//li[starts-with(@class,'ui-dropdown_item') and normalize-space(.)='{text}']"
+
+
+@pytest.mark.parametrize("answer", [{"error": "no options"}, raise_javascript_error],
+                         ids=["no-selection", "script-error"])
+def test_helper_falls_back_to_clicking(fake_helper, answer):
+    page = fake_helper.driver.page
+    page.answer(SELECT_SCRIPT, answer)
+    trigger, = page.add(By.XPATH, GENDER)
+    page.add(By.XPATH, locators.DROPDOWN_OPTIONS.value, text="Female")
+    option, = page.add(By.XPATH, option_xpath("Female"))
+    assert fake_helper.select_from_dropdown(GENDER) == "Female"
+    assert (trigger.clicks, option.clicks) == (1, 1)
+
+
+def test_helper_fallback_clicks_the_option_at_the_pick(fake_helper):
+    page = fake_helper.driver.page
+    page.answer(SELECT_SCRIPT, {"error": "no options"})
+    page.add(By.XPATH, locators.BIRTH_MONTH_DROPDOWN.value)
+    for month in ("January", "February", "March", "April"):
+        page.add(By.XPATH, locators.DROPDOWN_OPTIONS.value, text=month)
+    march, = page.add(By.XPATH, option_xpath("March"))
+    assert fake_helper.select_from_dropdown(locators.BIRTH_MONTH_DROPDOWN.value, pick=0.6) == "March"
+    assert march.clicks == 1
+
+
+def test_choose_option_takes_the_option_at_the_pick():
+    assert [choose_option(["Male", "Female"], pick) for pick in (0.0, 0.49, 0.5, 1.0)] == [
+        "Male", "Male", "Female", "Female"]
@@ -0,0 +1,60 @@
+import io
+import json
+import logging
+
+import pytest
+
+from . import flow_log
+from .timing import PerfRecorder
+
+STEP = "3. Search for flights"
+
+
+@pytest.fixture
+def package_logger():
+    # Keeps the session's own flow log level once a test configured another one
+    logger = logging.getLogger(flow_log.PACKAGE)
+    level = logger.level
+    yield logger
+    logger.setLevel(level)
+
+
+def read_lines(path):
+    with open(path) as log_file:
+        return [json.loads(line) for line in log_file]
+
+
+def test_records_are_json_lines_tagged_with_the_step(tmp_path, package_logger, monkeypatch):
+    monkeypatch.setenv("PYTEST_XDIST_WORKER", "gw3")
+    flow_logs = flow_log.configure(str(tmp_path), "INFO")
+    recorder = PerfRecorder()
+    recorder.step(STEP)
+    logger = flow_log.StepLogger(logging.getLogger(f"{flow_log.PACKAGE}.test_SK"), recorder)
+    logger.info("Clicked %s", "//button[@id='search']")
+    logger.debug("Below the level")
+    logging.getLogger(f"{flow_log.PACKAGE}.driver_pool").warning("No step here")
+    flow_logs.stop()
+    first, second = read_lines(tmp_path / "gw3.jsonl")
+    assert (first["worker"], first["level"], first["step"], first["msg"]) == (
+        "gw3", "INFO", STEP, "Clicked //button[@id='search']")
+    assert (second["logger"], second["step"]) == (f"{flow_log.PACKAGE}.driver_pool", "")
+    assert first["mono"] <= second["mono"]
+
+
+def test_stopping_one_flow_log_leaves_the_others_running(tmp_path, package_logger):
+    outer = flow_log.configure(str(tmp_path / "outer"))
+    inner = flow_log.configure(str(tmp_path / "inner"))
+    inner.stop()
+    assert outer.queue_handler in package_logger.handlers and not package_logger.propagate
+    package_logger.info("After the inner log stopped")
+    outer.stop()
+    assert [line["msg"] for line in read_lines(tmp_path / "outer" / "main.jsonl")][-1] == "After the inner log stopped"
+
+
+def test_merge_interleaves_workers_by_time(tmp_path):
+    for worker, times in (("gw0", [1.0, 3.0]), ("gw1", [2.0, 4.0])):
+        (tmp_path / f"{worker}.jsonl").write_text(
+            "".join(json.dumps({"ts": ts, "worker": worker}) + "\n" for ts in times) + "\n")
+    out = io.StringIO()
+    flow_log.merge([str(tmp_path / "gw0.jsonl"), str(tmp_path / "gw1.jsonl")], out)
+    assert [json.loads(line)["ts"] for line in out.getvalue().splitlines()] == [1.0, 2.0, 3.0, 4.0]
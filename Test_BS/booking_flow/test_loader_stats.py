@@ -0,0 +1,92 @@
+import json
+
+from selenium.webdriver.common.by import By
+
+from . import locators
+from .fake_webdriver import FakeWebDriver
+from .loader_stats import FLOOR_SECONDS, HISTORY_LENGTH, MIN_SAMPLES, LoaderStats, percentile
+from .test_SK import SeleniumHelper
+
+LOADER = locators.LOADER.value
+STEP = "11. Wait for the loader to disappear"
+
+
+def stats_with(tmp_path, samples):
+    stats = LoaderStats(str(tmp_path / "loader_stats.json"))
+    for seconds in samples:
+        stats.record("11. Wait for the loader to disappear", "vanish", seconds)
+    return stats
+
+
+def test_percentile():
+    assert percentile([3, 1, 2], 0.5) == 2
+    assert percentile(range(101), 0.99) == 99
+    assert percentile([7], 0.99) == 7
+
+
+def test_fixed_budget_until_enough_samples(tmp_path):
+    stats = stats_with(tmp_path, [1.0] * (MIN_SAMPLES - 1))
+    assert stats.timeout("11. Wait for the loader to disappear", "vanish", 60) == 60
+
+
+def test_learned_budget_is_p99_with_a_margin(tmp_path):
+    stats = stats_with(tmp_path, [4.0] * MIN_SAMPLES)
+    assert stats.timeout("11. Wait for the loader to disappear", "vanish", 60) == 4.0 * 1.5 + 2.0
+
+
+def test_learned_budget_is_floored_and_capped(tmp_path):
+    assert stats_with(tmp_path, [0.0] * MIN_SAMPLES).timeout(
+        "11. Wait for the loader to disappear", "vanish", 60) == FLOOR_SECONDS
+    assert stats_with(tmp_path, [50.0] * MIN_SAMPLES).timeout(
+        "11. Wait for the loader to disappear", "vanish", 60) == 60
+
+
+def test_unknown_steps_keep_the_fixed_budget(tmp_path):
+    stats = stats_with(tmp_path, [1.0] * MIN_SAMPLES)
+    assert stats.timeout("17. Wait for the loader to disappear", "vanish", 40) == 40
+    assert stats.timeout("11. Wait for the loader to disappear", "appear", 20) == 20
+
+
+def test_save_merges_with_samples_other_workers_wrote(tmp_path):
+    path = tmp_path / "loader_stats.json"
+    path.write_text(json.dumps({"step": {"vanish": [1.0] * HISTORY_LENGTH}}))
+    stats = LoaderStats(str(path))
+    stats.record("step", "vanish", 2.0)
+    stats.record("other", "appear", 0.5)
+    # Written by another worker after this one started
+    path.write_text(json.dumps({"step": {"vanish": [3.0]}, "third": {"vanish": [4.0]}}))
+    stats.save()
+    saved = json.loads(path.read_text())
+    assert saved == {"step": {"vanish": [3.0, 2.0]}, "other": {"appear": [0.5]}, "third": {"vanish": [4.0]}}
+
+
+def test_save_keeps_the_newest_samples(tmp_path):
+    stats = stats_with(tmp_path, [float(index) for index in range(HISTORY_LENGTH + 5)])
+    stats.save()
+    saved = json.loads((tmp_path / "loader_stats.json").read_text())
+    assert saved["11. Wait for the loader to disappear"]["vanish"][0] == 5.0
+    assert len(saved["11. Wait for the loader to disappear"]["vanish"]) == HISTORY_LENGTH
+
+
+def loader_helper(tmp_path, **loader):
+    helper = SeleniumHelper(FakeWebDriver())
+    helper.recorder.step(STEP)
+    helper.loader_stats = LoaderStats(str(tmp_path / "loader_stats.json"))
+    helper.driver.page.add(By.XPATH, LOADER, **loader)
+    return helper
+
+
+def test_helper_records_how_long_the_loader_took(tmp_path):
+    helper = loader_helper(tmp_path, vanish_after=0.1)
+    assert helper.wait_for_loader_invisibility(LOADER, 5) is True
+    helper.command_trace.detach()
+    vanish, = helper.loader_stats.samples[STEP]["vanish"]
+    assert 0.1 <= vanish < 5
+
+
+def test_loader_timeout_fails_the_step(tmp_path):
+    helper = loader_helper(tmp_path)
+    assert helper.wait_for_loader_invisibility(LOADER, 0.1) is False
+    helper.command_trace.detach()
+    record, = [record for record in helper.recorder.records if record["kind"] == "action"]
+    assert (record["locator"], record["ok"], record["error"]) == (LOADER, False, "TimeoutException")
@@ -0,0 +1,62 @@
+import pytest
+from selenium.common import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+
+from . import locators
+from .locators import ElementCache, Locator, lookup
+
+SEARCH = locators.SEARCH_BUTTON
+
+
+def finds(helper):
+    return [command for command in helper.command_trace.commands if command["command"].startswith("find")]
+
+
+def test_locators_unpack_to_the_helper_arguments():
+    by_selector, selector_element = SEARCH
+    assert (by_selector, selector_element) == ("css", SEARCH.value)
+    assert SEARCH.strategy == (By.CSS_SELECTOR, SEARCH.value)
+
+
+def test_lookup_returns_the_registered_locator_or_an_uncached_one():
+    assert lookup("css", SEARCH.value) is SEARCH
+    ad_hoc = lookup("xpath", "//div[@id='not-registered']")
+    assert ad_hoc.by == By.XPATH and not ad_hoc.stable
+
+
+def test_cache_only_keeps_stable_locators():
+    cache = ElementCache()
+    unstable = Locator("css", "#results")
+    cache.put(SEARCH, "search")
+    cache.put(unstable, "results")
+    assert (cache.get(SEARCH), cache.get(unstable)) == ("search", None)
+    cache.invalidate()
+    assert cache.get(SEARCH) is None
+
+
+def test_a_cached_handle_skips_the_lookup(fake_helper):
+    fake_helper.driver.page.add(By.CSS_SELECTOR, SEARCH.value)
+    first = fake_helper._locate(*SEARCH, EC.visibility_of_element_located, 1)
+    assert fake_helper._locate(*SEARCH, EC.element_to_be_clickable, 1) == first
+    assert len(finds(fake_helper)) == 1
+
+
+def test_a_cached_handle_must_still_meet_the_callers_condition(fake_helper):
+    button, = fake_helper.driver.page.add(By.CSS_SELECTOR, SEARCH.value)
+    fake_helper._locate(*SEARCH, EC.visibility_of_element_located, 1)
+    # Still displayed, so a visibility wait may reuse it, but no longer clickable
+    button.enabled = False
+    with pytest.raises(TimeoutException):
+        fake_helper._locate(*SEARCH, EC.element_to_be_clickable, 0.2)
+    assert fake_helper.element_cache.get(SEARCH) is None
+
+
+def test_a_stale_cached_handle_is_looked_up_again(fake_helper):
+    page = fake_helper.driver.page
+    page.add(By.CSS_SELECTOR, SEARCH.value)
+    first = fake_helper._locate(*SEARCH, EC.element_to_be_clickable, 1)
+    page.remove(By.CSS_SELECTOR, SEARCH.value)
+    page.add(By.CSS_SELECTOR, SEARCH.value)
+    second = fake_helper._locate(*SEARCH, EC.element_to_be_clickable, 1)
+    assert second != first and fake_helper.element_cache.get(SEARCH) == second
@@ -0,0 +1,70 @@
+import json
+
+from selenium.common import WebDriverException
+
+from .network_filter import FONTS, TRACKERS, ResourceSizes, block_patterns, network_stats
+
+
+class PerformanceLogDriver:
+    """Just enough of a Chrome driver to hand out performance log entries."""
+
+    def __init__(self, events=None, error=None):
+        self.events = events or []
+        self.error = error
+
+    def get_log(self, log_type):
+        assert log_type == "performance"
+        if self.error:
+            raise self.error
+        return [{"message": json.dumps({"message": {"method": method, "params": params}})}
+                for method, params in self.events]
+
+
+def sent(request_id, url):
+    return "Network.requestWillBeSent", {"requestId": request_id, "request": {"url": url}}
+
+
+def test_block_patterns_of_a_profile():
+    assert block_patterns("off") == []
+    assert block_patterns("trackers") == TRACKERS
+
+
+def test_block_patterns_add_block_and_drop_allow():
+    patterns = block_patterns("lean", block=["*chat.example.com*", "*.woff"], allow=["*.woff2"])
+    assert patterns[-1] == "*chat.example.com*"
+    assert "*.woff2" not in patterns
+    assert patterns.count("*.woff") == 1
+    assert set(FONTS) - set(patterns) == {"*.woff2"}
+
+
+def test_network_stats_counts_requests_bytes_and_blocked_urls():
+    driver = PerformanceLogDriver([
+        sent("1", "https://site/app.js"),
+        sent("2", "https://www.google-analytics.com/collect"),
+        sent("3", "https://site/api"),
+        ("Network.loadingFinished", {"requestId": "1", "encodedDataLength": 2048}),
+        ("Network.loadingFailed", {"requestId": "2", "blockedReason": "inspector"}),
+        ("Network.loadingFailed", {"requestId": "3", "errorText": "net::ERR_ABORTED"}),
+        ("Page.loadEventFired", {}),
+    ])
+    stats = network_stats(driver)
+    assert stats == {"requests": 3, "bytes": 2048, "blocked": 1,
+                     "blocked_urls": ["https://www.google-analytics.com/collect"],
+                     "sizes": {"https://site/app.js": 2048}}
+
+
+def test_network_stats_without_a_performance_log():
+    stats = network_stats(PerformanceLogDriver(error=WebDriverException("log type 'performance' not found")))
+    assert stats["requests"] == 0 and stats["bytes"] == 0
+
+
+def test_resource_sizes_estimate_saved_bytes_and_merge_on_save(tmp_path):
+    path = tmp_path / "sizes.json"
+    sizes = ResourceSizes(str(path))
+    sizes.record({"https://a/font.woff": 100, "https://a/logo.png": 50})
+    assert sizes.saved_bytes(["https://a/font.woff", "https://unseen"]) == 100
+    # Written by another worker meanwhile
+    path.write_text(json.dumps({"https://b/video.mp4": 900}))
+    sizes.save()
+    assert json.loads(path.read_text()) == {"https://a/font.woff": 100, "https://a/logo.png": 50,
+                                            "https://b/video.mp4": 900}
@@ -0,0 +1,65 @@
+from datetime import date, timedelta
+
+import pytest
+
+from .dropdowns import choose_option
+from .passenger_data import (AGE_RANGES, DOCUMENT_TYPE, FIRST_NAMES, MIN_DOCUMENT_DAYS, MIN_INFANT_DAYS,
+                             TRAVEL_WINDOW_DAYS, generate_booking, load_bookings, save_bookings)
+from .routes import BOOKING_CASES, DEFAULT_CASE
+
+TRAVEL_DATE = date(2024, 2, 29)
+
+
+def field_date(passenger, prefix):
+    # The month the pick selects from a rendered January to December list
+    month = choose_option(list(range(1, 13)), passenger["picks"][f"{prefix}_month"])
+    return date(int(passenger[f"{prefix}_year"]), month, int(passenger[f"{prefix}_day"]))
+
+
+def age_on(birth, day):
+    return day.year - birth.year - ((day.month, day.day) < (birth.month, birth.day))
+
+
+def test_same_seed_and_run_give_the_same_booking():
+    assert generate_booking(DEFAULT_CASE, 7, 3, TRAVEL_DATE) == generate_booking(DEFAULT_CASE, 7, 3, TRAVEL_DATE)
+
+
+def test_seed_and_run_change_the_booking():
+    booking = generate_booking(DEFAULT_CASE, 7, 0, TRAVEL_DATE)
+    assert booking["passengers"] != generate_booking(DEFAULT_CASE, 8, 0, TRAVEL_DATE)["passengers"]
+    assert booking["passengers"] != generate_booking(DEFAULT_CASE, 7, 1, TRAVEL_DATE)["passengers"]
+
+
+def test_passengers_follow_the_case_in_page_order():
+    booking = generate_booking(DEFAULT_CASE, 0, 0, TRAVEL_DATE)
+    assert [passenger["type"] for passenger in booking["passengers"]] == ["adult"] * 9 + ["infant"] * 9
+    assert booking["case_id"] == DEFAULT_CASE.case_id
+
+
+def test_gender_and_document_are_exact_option_texts_and_months_are_picks():
+    for passenger in generate_booking(DEFAULT_CASE, 0, 0, TRAVEL_DATE)["passengers"]:
+        assert passenger["first_name"] in FIRST_NAMES[passenger["gender"]]
+        assert passenger["document_type"] == DOCUMENT_TYPE
+        assert "birth_month" not in passenger and "exp_month" not in passenger
+        assert 0 < passenger["picks"]["birth_month"] < 1 and 0 < passenger["picks"]["exp_month"] < 1
+
+
+@pytest.mark.parametrize("case", BOOKING_CASES, ids=lambda case: case.case_id)
+def test_ages_and_documents_hold_over_the_travel_window(case):
+    for run in range(20):
+        for passenger in generate_booking(case, 0, run, TRAVEL_DATE)["passengers"]:
+            birth = field_date(passenger, "birth")
+            youngest, oldest = AGE_RANGES[passenger["type"]]
+            for offset in (0, TRAVEL_WINDOW_DAYS):
+                assert youngest <= age_on(birth, TRAVEL_DATE + timedelta(days=offset)) <= oldest
+            if passenger["type"] == "infant":
+                assert birth <= TRAVEL_DATE - timedelta(days=MIN_INFANT_DAYS)
+            last_day = TRAVEL_DATE + timedelta(days=TRAVEL_WINDOW_DAYS)
+            assert field_date(passenger, "exp") >= last_day + timedelta(days=MIN_DOCUMENT_DAYS)
+
+
+def test_bookings_round_trip_by_case(tmp_path):
+    path = str(tmp_path / "passengers.jsonl")
+    bookings = [generate_booking(DEFAULT_CASE, 0, run, TRAVEL_DATE) for run in range(3)]
+    save_bookings(path, bookings)
+    assert load_bookings(path) == {DEFAULT_CASE.case_id: bookings}
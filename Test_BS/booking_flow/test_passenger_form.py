@@ -0,0 +1,62 @@
+import logging
+
+from .fake_webdriver import FakeWebDriver
+from .passenger_form import FILL_PASSENGER_SCRIPT, PASSENGER_FIELDS, fill_passenger
+from .test_SK import SeleniumHelper
+
+PASSENGER = {"gender": "Female", "first_name": "Lucia", "last_name": "Rojas", "birth_year": "1990",
+             "document_number": "123456789", "picks": {"nationality": 0.25}}
+# A line only the batch fill script has
+BATCH_SCRIPT = "var fields = arguments[0], passenger"
+
+
+class StubHelper:
+    """Records the per-field helper calls a batch fill falls back to."""
+
+    def __init__(self, result):
+        self.driver = FakeWebDriver()
+        self.log = logging.getLogger(__name__)
+        self.calls = []
+        self.scripts = []
+
+        def answer(args):
+            self.scripts.append(args)
+            return result
+
+        self.driver.page.scripts.append((BATCH_SCRIPT, answer))
+
+    def __getattr__(self, method):
+        return lambda *args: self.calls.append((method, *args))
+
+
+def test_the_whole_block_goes_in_one_script_call():
+    helper = StubHelper({"filled": {"first_name": "Lucia"}, "pending": [], "missing": ["exp_day"]})
+    fill_passenger(helper, PASSENGER, native_fields=("birth_year",))
+    (fields, passenger, native), = helper.scripts
+    assert [field[0] for field in fields] == [field[0] for field in PASSENGER_FIELDS]
+    assert fields[0] == ["gender", "dropdown", PASSENGER_FIELDS[0][2].value, PASSENGER_FIELDS[0][3].value, False]
+    assert fields[1][3] is None
+    assert passenger == PASSENGER and native == ["birth_year"]
+    assert helper.calls == []
+
+
+def test_pending_fields_fall_back_to_their_helper_methods():
+    helper = StubHelper({"filled": {}, "pending": ["last_name", "birth_year", "nationality", "document_number"],
+                         "missing": []})
+    fill_passenger(helper, {key: value for key, value in PASSENGER.items() if key != "document_number"})
+    assert helper.calls == [("type_last_name", "Rojas"), ("select_year", "1990", None),
+                            ("select_nationality", None, 0.25), ("type_document_number", "")]
+
+
+def test_selenium_helper_fills_in_batch_and_falls_back_per_field():
+    helper = SeleniumHelper(FakeWebDriver())
+    helper.recorder.step("Passenger forms")
+    helper.driver.page.scripts.append((BATCH_SCRIPT, {"filled": {}, "pending": ["nationality"], "missing": []}))
+    selected = []
+    helper.driver.page.scripts.append(("var triggerXpath", lambda args: selected.append(args[3]) or {"selected": "Peru"}))
+    helper.fill_passenger(PASSENGER)
+    helper.command_trace.detach()
+    assert selected == [0.25]
+    methods = [record["method"] for record in helper.recorder.records if record["kind"] == "action"]
+    assert methods == ["select_from_dropdown", "select_nationality", "fill_passenger"]
+    assert FILL_PASSENGER_SCRIPT.count(BATCH_SCRIPT) == 1
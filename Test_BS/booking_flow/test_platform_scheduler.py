@@ -0,0 +1,94 @@
+import logging
+import threading
+import time
+
+from selenium.common import SessionNotCreatedException
+
+from .platform_scheduler import MAX_REQUEUES, Job, PlatformScheduler, expand, free_slots
+from .routes import BOOKING_CASES
+
+PLATFORMS = [{"os": "Windows", "osVersion": 11, "browserName": "chrome", "browserVersion": "latest"}]
+JOBS = expand(PLATFORMS, BOOKING_CASES[:4])
+
+
+def costs(*seconds):
+    return {job.key: cost for job, cost in zip(JOBS, seconds)}
+
+
+def test_free_slots_counts_other_builds():
+    assert free_slots({"parallel_sessions_max_allowed": 5, "parallel_sessions_running": 2, "queued_sessions": 1}) == 2
+
+
+def test_job_key_names_platform_and_case():
+    assert JOBS[0].key == f"platform::Windows 11 chrome latest::{BOOKING_CASES[0].case_id}"
+    assert isinstance(JOBS[0], Job)
+
+
+def test_runs_longest_first():
+    order = []
+
+    def run_job(job, session_started):
+        order.append(job)
+
+    results = PlatformScheduler(run_job, 1).run(JOBS, costs(1, 30, 2, 20))
+    assert order == [JOBS[1], JOBS[3], JOBS[2], JOBS[0]]
+    assert [error for _, error, _ in results] == [None] * 4
+
+
+def test_starting_sessions_hold_their_slot():
+    lock = threading.Lock()
+    starting = []
+    most_starting = []
+
+    def run_job(job, session_started):
+        with lock:
+            starting.append(job)
+            most_starting.append(len(starting))
+        time.sleep(0.02)
+        with lock:
+            starting.remove(job)
+        session_started()
+
+    # The plan has one free slot and does not see this scheduler's sessions until they exist
+    PlatformScheduler(run_job, 4, free_slots=lambda: 1, poll_interval=0.001).run(JOBS, costs(1, 1, 1, 1))
+    assert max(most_starting) == 1
+
+
+def test_unreadable_plan_does_not_stop_the_run():
+    def broken_plan():
+        raise KeyError("parallel_sessions_max_allowed")
+
+    results = PlatformScheduler(lambda job, session_started: None, 2, free_slots=broken_plan).run(
+        JOBS, costs(1, 1, 1, 1))
+    assert len(results) == 4
+
+
+def test_refused_sessions_are_requeued_then_failed():
+    attempts = []
+
+    def run_job(job, session_started):
+        attempts.append(job)
+        if job == JOBS[0]:
+            raise SessionNotCreatedException("All parallel sessions are in use")
+
+    results = PlatformScheduler(run_job, 1, poll_interval=0).run(JOBS[:2], costs(2, 1))
+    assert attempts.count(JOBS[0]) == MAX_REQUEUES + 1
+    failed, = [(job, error) for job, error, _ in results if error is not None]
+    assert failed[0] == JOBS[0] and isinstance(failed[1], SessionNotCreatedException)
+
+
+def test_job_outcomes_are_logged(caplog):
+    # The package logger does not propagate once flow_log is configured, so listen on it directly
+    logger = logging.getLogger("booking_flow.platform_scheduler")
+    logger.addHandler(caplog.handler)
+    try:
+        def run_job(job, session_started):
+            if job is JOBS[1]:
+                raise RuntimeError("Booking failed")
+
+        PlatformScheduler(run_job, 1).run(JOBS[:2], costs(2, 1))
+    finally:
+        logger.removeHandler(caplog.handler)
+    messages = [record.getMessage() for record in caplog.records]
+    assert f"[slot-0] Windows 11 chrome latest {JOBS[0].case.case_id}: ok" in messages
+    assert f"[slot-0] Windows 11 chrome latest {JOBS[1].case.case_id}: FAILED: Booking failed" in messages
@@ -0,0 +1,79 @@
+import pytest
+from selenium.common import (ElementClickInterceptedException, ElementNotInteractableException,
+                             NoSuchElementException, StaleElementReferenceException, TimeoutException)
+
+from . import retry_policy
+from .retry_policy import INTERCEPTED, STALE, TIMEOUT, RetryPolicy, classify
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    # Delays the policy asked for; a fake clock advances by them instead of sleeping
+    slept = []
+    monkeypatch.setattr(retry_policy.time, "monotonic", lambda: sum(slept))
+    monkeypatch.setattr(retry_policy.time, "sleep", slept.append)
+    return slept
+
+
+def failing(*errors, result="done"):
+    errors = list(errors)
+
+    def action():
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    return action
+
+
+@pytest.mark.parametrize("error, kind", [
+    (StaleElementReferenceException(), STALE),
+    (ElementClickInterceptedException(), INTERCEPTED),
+    (ElementNotInteractableException(), INTERCEPTED),
+    (TimeoutException(), TIMEOUT),
+    (NoSuchElementException(), None),
+    (ValueError(), None),
+])
+def test_classify(error, kind):
+    assert classify(error) == kind
+
+
+def test_retries_stale_elements_until_the_action_succeeds(sleeps):
+    retries = []
+    policy = RetryPolicy(max_attempts=3)
+    result = policy.run(failing(StaleElementReferenceException(), ElementClickInterceptedException()),
+                        lambda kind, attempt, error: retries.append((kind, attempt)))
+    assert result == "done"
+    assert retries == [(STALE, 1), (INTERCEPTED, 2)]
+    assert len(sleeps) == 2
+
+
+def test_raises_the_last_error_after_max_attempts(sleeps):
+    policy = RetryPolicy(max_attempts=2)
+    with pytest.raises(StaleElementReferenceException):
+        policy.run(failing(*[StaleElementReferenceException() for _ in range(3)]))
+    assert len(sleeps) == 1
+
+
+def test_timeouts_are_not_retried(sleeps):
+    with pytest.raises(TimeoutException):
+        RetryPolicy().run(failing(TimeoutException()))
+    assert sleeps == []
+
+
+def test_gives_up_when_the_next_delay_exceeds_the_budget(sleeps):
+    policy = RetryPolicy(max_attempts=10, backoff=1.0, jitter=0.0, max_backoff=8.0, budget=3.5)
+    with pytest.raises(StaleElementReferenceException):
+        policy.run(failing(*[StaleElementReferenceException() for _ in range(10)]))
+    # 1 s and 2 s fit, 4 s more would end past the budget
+    assert sleeps == [1.0, 2.0]
+
+
+def test_delay_backs_off_exponentially_up_to_the_cap():
+    policy = RetryPolicy(backoff=0.25, max_backoff=1.0, jitter=0.0)
+    assert [policy.delay(attempt) for attempt in range(1, 5)] == [0.25, 0.5, 1.0, 1.0]
+
+
+def test_jitter_only_shortens_the_delay():
+    policy = RetryPolicy(backoff=1.0, max_backoff=1.0, jitter=0.5)
+    assert all(0.5 <= policy.delay(1) <= 1.0 for _ in range(100))
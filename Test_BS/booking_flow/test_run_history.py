@@ -0,0 +1,83 @@
+import pytest
+
+from .run_history import RunHistory
+
+STEP = "4. Select the passengers"
+
+
+def step(name, ok, duration=1.0, wait=0.5, retries=0, error=None):
+    return {"kind": "step", "step": name, "duration": duration, "wait": wait, "retries": retries, "ok": ok,
+            "error": error}
+
+
+def action(locator, ok, method="click_element", retries=0, error=None):
+    return {"kind": "action", "step": STEP, "method": method, "locator": locator, "duration": 0.2, "wait": 0.1,
+            "retries": retries, "commands": 2, "ok": ok, "error": error}
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = RunHistory(str(tmp_path / "history" / "runs.sqlite"))
+    yield history
+    history.close()
+
+
+def record(history, outcomes, name=STEP, test="test_main[a]"):
+    for ok in outcomes:
+        history.record_run(test, "passed" if ok else "failed", 2.0, [step(name, ok)])
+
+
+def test_flaky_steps_rank_by_flip_rate(history):
+    record(history, [True, False, True, False], "flips every run")
+    record(history, [True, True, False, False], "flipped once")
+    record(history, [False, False, False], "always fails")
+    record(history, [True, False], "too few runs")
+    flaky = history.flaky_steps()
+    assert [entry["step"] for entry in flaky] == ["flips every run", "flipped once"]
+    assert flaky[0]["flip_rate"] == 1.0
+    assert flaky[1] == {"test": "test_main[a]", "step": "flipped once", "runs": 4, "failures": 2, "flip_rate": 1 / 3}
+
+
+def test_steps_are_grouped_per_test(history):
+    # Interleaved runs of two tests: one always passes the step, the other always fails it
+    for _ in range(3):
+        record(history, [True], test="test_main[a]")
+        record(history, [False], test="test_main[b]")
+    assert history.flaky_steps() == []
+    stats = history.step_stats()
+    assert (stats["test_main[a]"][STEP]["success_rate"], stats["test_main[b]"][STEP]["success_rate"]) == (1.0, 0.0)
+    record(history, [True], test="test_main[b]")
+    flaky, = history.flaky_steps()
+    assert (flaky["test"], flaky["runs"], flaky["flip_rate"]) == ("test_main[b]", 4, 1 / 3)
+
+
+def test_flaky_steps_of_the_last_runs_of_one_test(history):
+    record(history, [True, False, True], test="test_main[a]")
+    record(history, [True, True, True], test="test_main[b]")
+    assert history.flaky_steps(test="test_main[b]") == []
+    assert len(history.flaky_steps(test="test_main[a]")) == 1
+    # The last three runs are all of test_main[b]
+    assert history.flaky_steps(last=3) == []
+
+
+def test_step_and_locator_stats(history):
+    history.record_run("test_main[a]", "passed", 3.0, [step(STEP, True, retries=1), action("//li", True, retries=1)])
+    history.record_run("test_main[a]", "failed", 3.0, [
+        step(STEP, False, error="TimeoutException"), action("//li", True, method="select_from_dropdown"),
+        action("//li", False, error="TimeoutException"), action(None, True)])
+    stats = history.step_stats()["test_main[a]"][STEP]
+    assert (stats["runs"], stats["failures"], stats["success_rate"], stats["retries"]) == (2, 1, 0.5, 1)
+    assert stats["errors"] == {"TimeoutException": 1}
+    locators = history.locator_stats()
+    assert list(locators) == ["//li"]
+    assert locators["//li"]["calls"] == 3
+    assert locators["//li"]["methods"] == {"click_element": 2, "select_from_dropdown": 1}
+
+
+def test_report_lists_runs_flaky_steps_and_locators(history):
+    record(history, [True, False, True])
+    history.record_run("test_main[a]", "failed", 1.0, [action("//button", False, error="StaleElementReferenceException")])
+    report = history.report()
+    assert "    2 failed   (avg 1.5s) test_main[a]" in report
+    assert f"flip rate 1.00, 1/3 failed {STEP} in test_main[a]" in report
+    assert "0% ok of 1 calls, retries 0, wait p90 0.10s (StaleElementReferenceException 1) //button" in report
@@ -0,0 +1,48 @@
+from .sharding import (HISTORY_LENGTH, UNKNOWN_BASE_SECONDS, UNKNOWN_SECONDS_PER_PASSENGER, estimate_duration,
+                       load_durations, record_duration, save_durations, shard)
+
+
+def test_shard_puts_longest_first_onto_least_loaded():
+    costs = {"a": 10, "b": 8, "c": 6, "d": 5, "e": 1}
+    assignment = shard(costs, 2)
+    loads = [sum(cost for key, cost in costs.items() if assignment[key] == index) for index in range(2)]
+    assert assignment["a"] != assignment["b"]
+    assert loads == [15, 15]
+
+
+def test_shard_is_deterministic_on_ties():
+    costs = {f"test{index}": 1.0 for index in range(6)}
+    assert shard(costs, 3) == shard(dict(reversed(list(costs.items()))), 3)
+    assert sorted(shard(costs, 3).values()) == [0, 0, 1, 1, 2, 2]
+
+
+def test_shard_with_more_shards_than_tests():
+    assert sorted(shard({"a": 3, "b": 1}, 4).values()) == [0, 1]
+
+
+def test_estimate_duration_is_the_median():
+    assert estimate_duration({"t": [5, 100, 7]}, "t") == 7
+
+
+def test_estimate_duration_of_an_unknown_test_grows_with_passengers():
+    assert estimate_duration({}, "t", 3) == UNKNOWN_BASE_SECONDS + 3 * UNKNOWN_SECONDS_PER_PASSENGER
+
+
+def test_record_duration_keeps_the_newest():
+    durations = {}
+    for seconds in range(HISTORY_LENGTH + 3):
+        record_duration(durations, "t", seconds)
+    assert durations["t"] == list(range(3, HISTORY_LENGTH + 3))
+
+
+def test_durations_round_trip(tmp_path):
+    path = str(tmp_path / "durations.json")
+    assert load_durations(path) == {}
+    save_durations(path, {"t": [1.5]})
+    assert load_durations(path) == {"t": [1.5]}
+
+
+def test_load_durations_ignores_a_corrupt_file(tmp_path):
+    path = tmp_path / "durations.json"
+    path.write_text("{not json")
+    assert load_durations(str(path)) == {}
@@ -0,0 +1,67 @@
+import pytest
+
+from .strict import CircuitBreaker, CircuitOpenError, HelperActionError
+
+
+def failure(step="1. Click on the origin field"):
+    return HelperActionError("click_element", "//button", step, TimeoutError("not clickable"))
+
+
+def test_failure_in_a_critical_step_opens_the_breaker():
+    breaker = CircuitBreaker()
+    breaker.enter(critical=True)
+    breaker.record(failure())
+    with pytest.raises(CircuitOpenError, match="critical step '1. Click on the origin field' failed"):
+        breaker.enter(critical=False)
+
+
+def test_failure_in_a_normal_step_does_not():
+    breaker = CircuitBreaker()
+    breaker.enter(critical=False)
+    breaker.record(failure())
+    breaker.enter(critical=True)
+    assert breaker.failure is None
+
+
+def test_the_first_critical_failure_is_kept():
+    breaker = CircuitBreaker()
+    breaker.enter(critical=True)
+    first = failure("first")
+    breaker.record(first)
+    breaker.record(failure("second"))
+    assert breaker.failure is first
+
+
+def test_a_disabled_breaker_never_raises():
+    breaker = CircuitBreaker(enabled=False)
+    breaker.enter(critical=True)
+    breaker.record(failure())
+    breaker.enter(critical=True)
+
+
+def test_helper_action_error_names_method_step_and_locator():
+    error = failure()
+    assert str(error) == "click_element failed in step '1. Click on the origin field' on //button: not clickable"
+    assert isinstance(CircuitOpenError(error), HelperActionError)
+
+
+def fail_counter_script(helper):
+    # The counter script gave up after clicking, so the helper cannot fall back to clicking itself
+    helper.driver.page.answer("var xpath = arguments[0], target", {"error": "plus button disabled", "clicks": 2})
+
+
+def test_strict_helper_raises_the_failure(fake_helper):
+    fake_helper.strict = True
+    fake_helper.step("7. Increase the number of adults from the default of one")
+    fail_counter_script(fake_helper)
+    with pytest.raises(HelperActionError, match="set_passenger_count failed in step '7. Increase the number"):
+        fake_helper.set_passenger_count(1, 3)
+
+
+def test_helper_stops_at_the_step_after_a_failed_critical_one(fake_helper):
+    fake_helper.breaker.enabled = True
+    fake_helper.step("6. Click on the passenger selector", critical=True)
+    fail_counter_script(fake_helper)
+    assert fake_helper.set_passenger_count(1, 3) is None
+    with pytest.raises(CircuitOpenError):
+        fake_helper.step("7. Increase the number of adults from the default of one")
@@ -0,0 +1,92 @@
+import csv
+import json
+
+import pytest
+from selenium.webdriver.common.by import By
+
+from . import locators
+from .timing import PerfRecorder, timed
+
+BUTTON = "//button[@id='search']"
+STEP = "3. Search for flights"
+# A line only the counter script has
+COUNTER_SCRIPT = "var xpath = arguments[0], target"
+
+
+class Flow:
+    def __init__(self):
+        self.recorder = PerfRecorder()
+
+    @timed
+    def click(self, by_selector, selector_element):
+        self.recorder.add_command()
+
+    @timed(xpath_argument=True)
+    def select(self, xpath, value):
+        self.recorder.add_wait(0.5)
+        self.click("xpath", f"{xpath}/li")
+        raise ValueError(value)
+
+
+def actions(helper, method):
+    return [record for record in helper.recorder.records if record["kind"] == "action" and record["method"] == method]
+
+
+def test_nested_calls_count_their_commands_and_failure_on_the_step():
+    flow = Flow()
+    flow.recorder.step(STEP)
+    with pytest.raises(ValueError):
+        flow.select("//ul", "Female")
+    flow.recorder.end_step()
+    click, select, step = flow.recorder.records
+    assert (click["locator"], click["depth"], click["commands"], click["ok"]) == ("//ul/li", 1, 1, True)
+    assert (select["locator"], select["commands"], select["wait"]) == ("//ul", 1, 0.5)
+    assert (select["error"], step["error"], step["commands"], step["wait"]) == ("ValueError", "ValueError", 1, 0.5)
+
+
+def test_calls_with_values_record_no_locator():
+    flow = Flow()
+    flow.click("Bogota", "MGA")
+    assert flow.recorder.records[0]["locator"] is None
+
+
+def test_report_has_every_record_and_the_locator_totals(tmp_path):
+    flow = Flow()
+    flow.recorder.step(STEP)
+    flow.click("xpath", BUTTON)
+    flow.click("xpath", BUTTON)
+    path = flow.recorder.write_report(str(tmp_path), "test_main")
+    with open(path) as report:
+        data = json.load(report)
+    assert data["locators"][BUTTON]["calls"] == 2
+    with open(tmp_path / "test_main.csv") as report:
+        assert [row["kind"] for row in csv.DictReader(report)] == ["action", "action", "step"]
+    assert "Slowest locators:" in flow.recorder.summary()
+
+
+def test_helper_calls_record_their_locator_and_commands(fake_helper):
+    fake_helper.recorder.step(STEP)
+    element, = fake_helper.driver.page.add(By.XPATH, BUTTON)
+    fake_helper.click_element("xpath", BUTTON)
+    record, = actions(fake_helper, "click_element")
+    assert element.clicks == 1
+    assert (record["step"], record["locator"], record["ok"]) == (STEP, BUTTON, True)
+    assert record["commands"] > 0
+
+
+def test_helper_wrappers_do_not_take_values_for_locators(fake_helper):
+    fake_helper.recorder.step(STEP)
+    fake_helper.driver.page.answer("var triggerXpath", lambda args: {"selected": args[2]})
+    fake_helper.select_gender(value="Female")
+    assert actions(fake_helper, "select_gender")[0]["locator"] is None
+    assert actions(fake_helper, "select_from_dropdown")[0]["locator"] == locators.GENDER_DROPDOWN.value
+
+
+def test_a_failed_helper_action_is_recorded_with_its_error(fake_helper):
+    fake_helper.recorder.step(STEP)
+    fake_helper.driver.page.answer(COUNTER_SCRIPT, {"error": "plus button disabled", "clicks": 2})
+    assert fake_helper.set_passenger_count(1, 3) is None
+    record, = actions(fake_helper, "set_passenger_count")
+    assert (record["ok"], record["error"]) == (False, "WebDriverException")
+    fake_helper.recorder.end_step()
+    assert fake_helper.recorder.steps()[0]["error"] == "WebDriverException"
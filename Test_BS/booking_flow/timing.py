@@ -0,0 +1,184 @@
+import csv
+import functools
+import json
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from .locators import SELECTOR_MAPPING
+
+REPORT_FIELDS = ["kind", "step", "method", "locator", "start", "duration", "wait", "action", "retries", "commands", "ok", "error", "depth"]
+
+
+class PerfRecorder:
+    """Times each logical step and every helper call inside it.
+
+    Wait time is what the helper spent blocked in WebDriverWait or an observer wait;
+    action time is the rest of the call. Commands counts the WebDriver round trips of
+    the call, nested helper calls included.
+    """
+
+    def __init__(self):
+        self.records = []
+        self._origin = time.monotonic()
+        self._step = None
+        self._actions = []
+
+    def _now(self):
+        return time.monotonic() - self._origin
+
+    @property
+    def current_step(self):
+        return self._step["step"] if self._step else None
+
+    @property
+    def current_method(self):
+        return self._actions[-1]["method"] if self._actions else None
+
+        # Close the running step and start a new one; steps run back to back like the numbered comments
+
+    def step(self, name):
+        self.end_step()
+        self._step = {"kind": "step", "step": name, "method": None, "locator": None, "start": self._now(),
+                      "duration": 0.0, "wait": 0.0, "action": 0.0, "retries": 0, "commands": 0, "ok": True,
+                      "error": None, "depth": 0}
+
+    def end_step(self):
+        if self._step is None:
+            return
+        step, self._step = self._step, None
+        step["duration"] = self._now() - step["start"]
+        step["action"] = max(step["duration"] - step["wait"], 0.0)
+        self.records.append(step)
+
+        # Record a step measured outside the flow, such as leasing the driver
+
+    def add_step(self, name, duration):
+        self.records.append({"kind": "step", "step": name, "method": None, "locator": None,
+                             "start": self._now() - duration, "duration": duration, "wait": 0.0,
+                             "action": duration, "retries": 0, "commands": 0, "ok": True, "error": None,
+                             "depth": 0})
+
+    @contextmanager
+    def action(self, method, locator=None):
+        record = {"kind": "action", "step": self._step["step"] if self._step else None, "method": method,
+                  "locator": locator, "start": self._now(), "duration": 0.0, "wait": 0.0, "action": 0.0,
+                  "retries": 0, "commands": 0, "ok": True, "error": None, "depth": len(self._actions)}
+        self._actions.append(record)
+        try:
+            yield record
+        except BaseException as e:
+            self._failed(record, e)
+            if self._step is not None:
+                self._failed(self._step, e)
+            raise
+        finally:
+            self._actions.pop()
+            record["duration"] = self._now() - record["start"]
+            record["action"] = max(record["duration"] - record["wait"], 0.0)
+            self.records.append(record)
+
+    def add_wait(self, seconds):
+        # Counted once on the innermost action and once on the step
+        if self._actions:
+            self._actions[-1]["wait"] += seconds
+        if self._step is not None:
+            self._step["wait"] += seconds
+
+    def add_retry(self):
+        if self._actions:
+            self._actions[-1]["retries"] += 1
+        if self._step is not None:
+            self._step["retries"] += 1
+
+    def fail(self, error=None):
+        # A failure the helper handled itself, so no exception reaches action()
+        if self._actions:
+            self._failed(self._actions[-1], error)
+        if self._step is not None:
+            self._failed(self._step, error)
+
+    @staticmethod
+    def _failed(record, error):
+        # The first error of a record names its failure, e.g. TimeoutException
+        record["ok"] = False
+        if record["error"] is None and error is not None:
+            record["error"] = type(error).__name__
+
+    def add_command(self):
+        # Counted on every open action, so a call's count includes the calls it makes
+        for record in self._actions:
+            record["commands"] += 1
+        if self._step is not None:
+            self._step["commands"] += 1
+
+    def steps(self):
+        return [record for record in self.records if record["kind"] == "step"]
+
+    def locator_stats(self):
+        stats = defaultdict(lambda: {"calls": 0, "duration": 0.0, "wait": 0.0, "retries": 0, "commands": 0,
+                                     "failures": 0})
+        for record in self.records:
+            if record["kind"] == "action" and record["locator"]:
+                entry = stats[record["locator"]]
+                entry["calls"] += 1
+                entry["duration"] += record["duration"]
+                entry["wait"] += record["wait"]
+                entry["retries"] += record["retries"]
+                entry["commands"] += record["commands"]
+                entry["failures"] += not record["ok"]
+        return dict(stats)
+
+    def summary(self, top=5):
+        self.end_step()
+        lines = ["Slowest steps:"]
+        for step in sorted(self.steps(), key=lambda s: -s["duration"])[:top]:
+            lines.append(f"  {step['duration']:8.2f}s (wait {step['wait']:.2f}s, retries {step['retries']}, "
+                         f"commands {step['commands']}) {step['step']}")
+        lines.append("Slowest locators:")
+        stats = self.locator_stats()
+        for locator in sorted(stats, key=lambda l: -stats[l]["duration"])[:top]:
+            entry = stats[locator]
+            lines.append(f"  {entry['duration']:8.2f}s over {entry['calls']} calls "
+                         f"(wait {entry['wait']:.2f}s, retries {entry['retries']}, commands {entry['commands']}) "
+                         f"{locator}")
+        return "\n".join(lines)
+
+    def write_report(self, directory, name):
+        """Write <name>.json and <name>.csv into `directory` and return the JSON path."""
+        self.end_step()
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, name)
+        with open(f"{base}.json", "w") as report:
+            json.dump({"records": self.records, "locators": self.locator_stats()}, report, indent=2)
+        with open(f"{base}.csv", "w", newline="") as report:
+            writer = csv.DictWriter(report, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.records)
+        return f"{base}.json"
+
+
+def _locator_argument(args):
+    # Only (by_selector, selector_element, ...) arguments name a locator; values and URLs do not
+    if len(args) > 1 and isinstance(args[0], str) and args[0] in SELECTOR_MAPPING:
+        return args[1]
+    return None
+
+
+def timed(method=None, xpath_argument=False):
+    """Record a SeleniumHelper method call on the helper's recorder.
+
+    The call's locator is its (by_selector, selector_element) arguments, or with
+    `xpath_argument` its first argument, for methods that take a bare XPath.
+    """
+    if method is None:
+        return functools.partial(timed, xpath_argument=xpath_argument)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        locator = args[0] if xpath_argument and args else _locator_argument(args)
+        with self.recorder.action(method.__name__, locator):
+            return method(self, *args, **kwargs)
+
+    return wrapper